@@ -0,0 +1,240 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import List, Optional
+import duckdb
+import pandas as pd
+from ..modules.database import get_database_instance
+from .synthetic_data import TABLES, load_database
+
+FILE_EXTENSIONS = {"sqlite": ".db", "duckdb": ".duckdb"}
+
+# Queries run by the execute_sql and export cases
+QUERIES = {
+    "scan": "SELECT * FROM OrderDetails",
+    "join_aggregate": """
+        SELECT u.State, c.CategoryName, count(*) AS Orders, sum(d.Quantity * p.Price) AS Revenue
+        FROM OrderDetails d
+        JOIN Orders o ON d.OrderID = o.OrderID
+        JOIN Users u ON o.UserID = u.UserID
+        JOIN Products p ON d.ProductID = p.ProductID
+        JOIN Categories c ON p.CategoryID = c.CategoryID
+        GROUP BY u.State, c.CategoryName
+    """,
+    "export": """
+        SELECT d.OrderDetailID, o.OrderDate, o.UserID, p.ProductName, d.Quantity, p.Price
+        FROM OrderDetails d
+        JOIN Orders o ON d.OrderID = o.OrderID
+        JOIN Products p ON d.ProductID = p.ProductID
+    """,
+}
+EXPORT_FORMATS = [".csv", ".jsonl", ".json", ".parquet"]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def benchmark_cases() -> List[dict]:
+    cases = [{"case": "read_tables"}]
+    cases += [{"case": "execute_sql", "query": name} for name in ("scan", "join_aggregate")]
+    cases += [{"case": "export_sql", "query": "export", "format": f} for f in EXPORT_FORMATS]
+    return cases
+
+
+def run_case(sql_dialect: str, url: str, case: dict, work_dir: str) -> dict:
+    """Connect and time one benchmark case. Runs in a fresh process when isolated."""
+    database = get_database_instance(sql_dialect)
+    database.connect(url)
+    try:
+        start_time = time.perf_counter()
+        if case["case"] == "read_tables":
+            database.read_tables()
+            rows = len(database.describe_tables())
+        elif case["case"] == "execute_sql":
+            rows = len(database.execute_sql(QUERIES[case["query"]]))
+        else:
+            file_path = os.path.join(work_dir, f"export_{sql_dialect}{case['format']}")
+            export = database.export_sql(QUERIES[case["query"]], file_path, case["format"])
+            rows = export["rows"]
+            os.remove(file_path)
+        wall_time = time.perf_counter() - start_time
+    finally:
+        database.connection.close()
+    return {"wall_time": wall_time, "rows": rows, "peak_rss_mb": peak_rss_mb()}
+
+
+def run_case_isolated(sql_dialect: str, url: str, case: dict, work_dir: str) -> dict:
+    """Run a case in a spawned process so its peak RSS isn't inflated by earlier cases."""
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(run_case, (sql_dialect, url, case, work_dir))
+
+
+def prepare_database(sql_dialect: str, url: Optional[str], rows: int, seed: int, work_dir: str) -> str:
+    """Generate the benchmark database for a scale, reusing files from earlier runs."""
+    if sql_dialect == "postgres":
+        database = get_database_instance("postgres")
+        database.connect(url)
+        cursor = database.connection.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {', '.join(reversed(TABLES))} CASCADE")
+        database.connection.commit()
+        database.connection.close()
+        load_database("postgres", url, rows, seed)
+        return url
+
+    path = os.path.join(work_dir, f"bench_{rows}_{seed}{FILE_EXTENSIONS[sql_dialect]}")
+    if not os.path.exists(path):
+        # Generated under a temporary name, so an interrupted run never leaves a truncated
+        # database behind to be reused
+        temp_path = os.path.join(
+            work_dir, f".bench_{rows}_{seed}.{os.getpid()}{FILE_EXTENSIONS[sql_dialect]}"
+        )
+        try:
+            load_database(sql_dialect, temp_path, rows, seed)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    return path
+
+
+def run_benchmarks(
+    dialects: List[str],
+    scales: List[int],
+    work_dir: str,
+    seed: int = 42,
+    repeat: int = 3,
+    postgres_url: Optional[str] = None,
+    isolate: bool = True,
+) -> dict:
+    """
+    Benchmark read_tables, execute_sql and export_sql for every dialect and scale.
+
+    Returns:
+        dict: Run metadata and one result per (dialect, scale, case) with the median and
+        minimum wall time, peak RSS and rows per second.
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    results = []
+    for sql_dialect in dialects:
+        for rows in scales:
+            url = prepare_database(sql_dialect, postgres_url, rows, seed, work_dir)
+            for case in benchmark_cases():
+                runs = [
+                    (run_case_isolated if isolate else run_case)(sql_dialect, url, case, work_dir)
+                    for _ in range(repeat)
+                ]
+                wall_times = [run["wall_time"] for run in runs]
+                median = statistics.median(wall_times)
+                results.append(
+                    {
+                        "dialect": sql_dialect,
+                        "scale": rows,
+                        **case,
+                        "rows": runs[0]["rows"],
+                        "wall_time": round(median, 4),
+                        "wall_time_min": round(min(wall_times), 4),
+                        "peak_rss_mb": max(run["peak_rss_mb"] for run in runs),
+                        "rows_per_second": round(runs[0]["rows"] / median, 1) if median > 0 else None,
+                    }
+                )
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "duckdb": duckdb.__version__,
+            "pandas": pd.__version__,
+            "seed": seed,
+            "repeat": repeat,
+            "isolated": isolate,
+        },
+        "results": results,
+    }
+
+
+def result_key(result: dict) -> tuple:
+    return (
+        result["dialect"],
+        result["scale"],
+        result["case"],
+        result.get("query"),
+        result.get("format"),
+    )
+
+
+def compare_results(baseline: dict, current: dict, tolerance: float = 0.2) -> List[dict]:
+    """Cases whose median wall time grew by more than `tolerance` relative to the baseline."""
+    baseline_times = {result_key(r): r["wall_time"] for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        previous = baseline_times.get(result_key(result))
+        if previous and result["wall_time"] > previous * (1 + tolerance):
+            regressions.append(
+                {
+                    "key": list(result_key(result)),
+                    "baseline": previous,
+                    "current": result["wall_time"],
+                    "ratio": round(result["wall_time"] / previous, 2),
+                }
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the database layer and report JSON timings."
+    )
+    parser.add_argument("--dialects", type=str, default="sqlite,duckdb", help="Comma-separated dialects")
+    parser.add_argument("--scales", type=str, default="1e3,1e4,1e5", help="Comma-separated OrderDetails row counts")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--work-dir", type=str, default="./scratchpad/.cache/benchmarks")
+    parser.add_argument("--postgres-url", type=str, help="Local Postgres to benchmark, e.g. a throwaway container")
+    parser.add_argument("--output", type=str, help="Write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", type=str, help="Earlier JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before a case counts as a regression")
+    parser.add_argument("--no-isolate", action="store_true", help="Run cases in-process (peak RSS becomes cumulative)")
+    args = parser.parse_args()
+
+    dialects = [d.strip() for d in args.dialects.split(",") if d.strip()]
+    if "postgres" in dialects and not args.postgres_url:
+        parser.error("--postgres-url is required to benchmark postgres")
+
+    report = run_benchmarks(
+        dialects,
+        [int(float(scale)) for scale in args.scales.split(",")],
+        args.work_dir,
+        seed=args.seed,
+        repeat=args.repeat,
+        postgres_url=args.postgres_url,
+        isolate=not args.no_isolate,
+    )
+
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            report["regressions"] = compare_results(json.load(file), report, args.tolerance)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    else:
+        print(output)
+
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
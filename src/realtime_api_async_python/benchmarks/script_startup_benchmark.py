@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import time
+from datetime import datetime
+from typing import List
+from ..modules.script_pool import ScriptWorkerPool, SCRIPT_WORKER_PRELOAD
+from ..modules.script_runner import run_uv_script
+
+# Scripts timed by the benchmark, from bare interpreter startup to a typical chart
+SCRIPTS = {
+    "hello": "print('hello')",
+    "pandas": "import pandas as pd\nprint(pd.DataFrame({'a': [1, 2, 3]})['a'].sum())",
+    "chart": (
+        "import os, tempfile\n"
+        "import matplotlib\n"
+        "matplotlib.use('Agg')\n"
+        "import matplotlib.pyplot as plt\n"
+        "plt.bar(['a', 'b', 'c'], [1, 3, 2])\n"
+        "plt.savefig(os.path.join(tempfile.gettempdir(), 'script_startup_benchmark.png'))\n"
+    ),
+}
+RUNNERS = ["uv", "pool"]
+
+
+async def time_runner(runner: str, python_code: str, repeat: int, pool: ScriptWorkerPool) -> List[float]:
+    durations = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        if runner == "uv":
+            result = await run_uv_script(python_code)
+        else:
+            result = await pool.run_code(python_code)
+        durations.append(time.perf_counter() - start_time)
+        if not result.success:
+            raise RuntimeError(f"{runner} run failed:\n{result.output}")
+    return durations
+
+
+async def run_benchmarks(runners: List[str], repeat: int = 5, preload: List[str] = SCRIPT_WORKER_PRELOAD) -> dict:
+    """
+    Time every script with `uv run` and on a warm worker pool.
+
+    Returns:
+        dict: Run metadata, the time to warm the pool, and one result per (runner, script)
+        with the median and minimum latency in seconds.
+    """
+    pool = ScriptWorkerPool(size=1, max_runs=repeat * len(SCRIPTS) + 1, preload=preload)
+    warm_up_time = None
+    if "pool" in runners:
+        start_time = time.perf_counter()
+        await pool.start()
+        warm_up_time = round(time.perf_counter() - start_time, 4)
+
+    results = []
+    try:
+        for runner in runners:
+            for name, python_code in SCRIPTS.items():
+                durations = await time_runner(runner, python_code, repeat, pool)
+                results.append(
+                    {
+                        "runner": runner,
+                        "script": name,
+                        "latency": round(statistics.median(durations), 4),
+                        "latency_min": round(min(durations), 4),
+                    }
+                )
+    finally:
+        pool.close()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "preload": preload,
+        },
+        "pool_warm_up": warm_up_time,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare script startup latency of `uv run` and the warm worker pool."
+    )
+    parser.add_argument("--runners", type=str, default="uv,pool", help="Comma-separated runners")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=str, help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    runners = [r.strip() for r in args.runners.split(",") if r.strip()]
+    report = asyncio.run(run_benchmarks(runners, args.repeat))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
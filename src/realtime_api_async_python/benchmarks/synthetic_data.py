@@ -0,0 +1,347 @@
+import argparse
+import functools
+import io
+import json
+import time
+from typing import Dict, Iterator, Tuple
+import numpy as np
+import pandas as pd
+from ..modules.database import Database, get_database_instance
+
+# Same tables as db/mock_data_for_duckdb.sql; the DDL is portable across SQLite, DuckDB and Postgres
+SCHEMA = """
+CREATE TABLE Users (
+    UserID INTEGER NOT NULL PRIMARY KEY,
+    FirstName VARCHAR(100) NOT NULL,
+    LastName VARCHAR(100) NOT NULL,
+    Email VARCHAR(255) NOT NULL UNIQUE,
+    Address VARCHAR(255),
+    City VARCHAR(100),
+    State VARCHAR(50),
+    ZipCode VARCHAR(20),
+    Country VARCHAR(100),
+    PhoneNumber VARCHAR(20),
+    RegistrationDate DATE
+);
+CREATE TABLE Categories (
+    CategoryID INTEGER NOT NULL PRIMARY KEY,
+    CategoryName VARCHAR(255) NOT NULL
+);
+CREATE TABLE Products (
+    ProductID INTEGER NOT NULL PRIMARY KEY,
+    ProductName VARCHAR(255) NOT NULL,
+    Price DECIMAL(10, 2) NOT NULL,
+    CategoryID INTEGER REFERENCES Categories(CategoryID)
+);
+CREATE TABLE Orders (
+    OrderID INTEGER NOT NULL PRIMARY KEY,
+    OrderDate DATE NOT NULL,
+    UserID INTEGER NOT NULL REFERENCES Users(UserID)
+);
+CREATE TABLE OrderDetails (
+    OrderDetailID INTEGER NOT NULL PRIMARY KEY,
+    OrderID INTEGER NOT NULL REFERENCES Orders(OrderID),
+    ProductID INTEGER NOT NULL REFERENCES Products(ProductID),
+    Quantity INTEGER NOT NULL
+);
+CREATE TABLE Reviews (
+    ReviewID INTEGER NOT NULL PRIMARY KEY,
+    UserID INTEGER NOT NULL REFERENCES Users(UserID),
+    ProductID INTEGER NOT NULL REFERENCES Products(ProductID),
+    Rating INTEGER NOT NULL CHECK (Rating >= 1 AND Rating <= 5),
+    ReviewText VARCHAR(1000),
+    ReviewDate DATE NOT NULL
+);
+"""
+
+# Parents before children so foreign keys always resolve while loading
+TABLES = ["Users", "Categories", "Products", "Orders", "OrderDetails", "Reviews"]
+
+FIRST_NAMES = [
+    "John", "Jane", "Alice", "Bob", "Carol", "David", "Eve", "Frank", "Grace", "Hank",
+    "Ivy", "Jack", "Karen", "Leo", "Mia", "Nick", "Olivia", "Paul", "Quincy", "Rachel",
+    "Sam", "Tina", "Uma", "Victor", "Wendy", "Xavier", "Yara", "Zack", "Amy", "Brian",
+]
+LAST_NAMES = [
+    "Doe", "Roe", "Smith", "Johnson", "Williams", "Brown", "Davis", "Miller", "Wilson",
+    "Moore", "Taylor", "Anderson", "Thomas", "Jackson", "White", "Harris", "Martin",
+    "Thompson", "Garcia", "Martinez", "Robinson", "Clark", "Lewis", "Lee", "Walker",
+]
+STREETS = ["Main", "Elm", "Oak", "Maple", "Pine", "Cedar", "Birch", "Walnut", "Cherry", "Ash"]
+# (City, State, ZipCode prefix), ordered by population so the Zipf draw favours big cities
+CITIES = [
+    ("New York", "NY", "100"), ("Los Angeles", "CA", "900"), ("Chicago", "IL", "606"),
+    ("Houston", "TX", "770"), ("Phoenix", "AZ", "850"), ("Philadelphia", "PA", "191"),
+    ("San Antonio", "TX", "782"), ("San Diego", "CA", "921"), ("Dallas", "TX", "752"),
+    ("San Jose", "CA", "951"), ("Austin", "TX", "733"), ("Columbus", "OH", "430"),
+    ("Charlotte", "NC", "282"), ("San Francisco", "CA", "941"), ("Seattle", "WA", "981"),
+    ("Denver", "CO", "802"), ("Boston", "MA", "021"), ("Nashville", "TN", "372"),
+    ("Detroit", "MI", "482"), ("Portland", "OR", "972"),
+]
+CATEGORIES = [
+    "Laptops", "Desktops", "Graphics Cards", "Storage", "Monitors", "Keyboards", "Mice",
+    "Networking", "Audio", "Accessories", "Tablets", "Phones", "Cameras", "Printers",
+    "Memory", "Processors", "Motherboards", "Power Supplies", "Cases", "Software",
+]
+PRODUCT_ADJECTIVES = ["Pro", "Air", "Max", "Mini", "Ultra", "Plus", "Lite", "Studio"]
+REVIEW_TEXTS = {
+    1: ["Stopped working after a week.", "Would not buy again."],
+    2: ["Disappointing quality.", "Not worth the price."],
+    3: ["It's okay for the price.", "Does the job, nothing special."],
+    4: ["Works well, minor issues.", "Good value overall."],
+    5: ["Excellent, highly recommend!", "Exactly what I needed."],
+}
+
+START_DATE = np.datetime64("2019-01-01")
+DAYS = int((np.datetime64("2025-01-01") - START_DATE).astype(int))
+
+
+def table_sizes(rows: int) -> Dict[str, int]:
+    """
+    Row counts per table for a given scale. `rows` is the size of the largest table
+    (OrderDetails); the others keep the proportions of a typical store.
+    """
+    rows = max(int(rows), 100)
+    return {
+        "Users": max(rows // 10, 10),
+        "Categories": len(CATEGORIES),
+        "Products": max(rows // 1000, 50),
+        "Orders": max(rows // 3, 10),
+        "OrderDetails": rows,
+        "Reviews": max(rows // 5, 10),
+    }
+
+
+@functools.lru_cache(maxsize=32)
+def zipf_cdf(size: int, exponent: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, size + 1) ** exponent
+    cdf = np.cumsum(weights)
+    return cdf / cdf[-1]
+
+
+def zipf_choice(rng: np.random.Generator, size: int, count: int, exponent: float = 1.2) -> np.ndarray:
+    """Draw `count` indexes in [0, size) with a Zipf-like skew, so a few values are very common."""
+    return np.minimum(np.searchsorted(zipf_cdf(size, exponent), rng.random(count)), size - 1)
+
+
+def scatter_ids(indexes: np.ndarray, size: int) -> np.ndarray:
+    """
+    Map skewed indexes onto ids 1..size with a fixed bijection, so the most popular
+    entities are spread across the id range instead of being the lowest ids.
+    """
+    return (indexes.astype(np.int64) * 2654435761) % size + 1
+
+
+def random_dates(rng: np.random.Generator, count: int) -> np.ndarray:
+    return START_DATE + rng.integers(0, DAYS, size=count).astype("timedelta64[D]")
+
+
+def generate_users(rng: np.random.Generator, ids: np.ndarray) -> pd.DataFrame:
+    count = len(ids)
+    first = np.array(FIRST_NAMES)[rng.integers(0, len(FIRST_NAMES), count)]
+    last = np.array(LAST_NAMES)[rng.integers(0, len(LAST_NAMES), count)]
+    cities = zipf_choice(rng, len(CITIES), count, exponent=0.8)
+    city, state, zip_prefix = (np.array([c[i] for c in CITIES])[cities] for i in range(3))
+    id_strings = ids.astype(str)
+    address = pd.Series(
+        rng.integers(1, 9999, count).astype(str)
+        + " "
+        + np.array(STREETS)[rng.integers(0, len(STREETS), count)]
+        + " St"
+    )
+    # A few percent of users never filled in their address
+    address[rng.random(count) < 0.02] = None
+    return pd.DataFrame(
+        {
+            "UserID": ids,
+            "FirstName": first,
+            "LastName": last,
+            "Email": np.char.lower(first + "." + last + id_strings + "@example.com"),
+            "Address": address,
+            "City": city,
+            "State": state,
+            "ZipCode": np.char.add(zip_prefix, np.char.zfill(rng.integers(0, 100, count).astype(str), 2)),
+            "Country": "USA",
+            "PhoneNumber": [f"555-{a:03d}-{b:04d}" for a, b in zip(rng.integers(0, 1000, count), rng.integers(0, 10000, count))],
+            "RegistrationDate": random_dates(rng, count),
+        }
+    )
+
+
+def generate_categories(rng: np.random.Generator, ids: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame({"CategoryID": ids, "CategoryName": [CATEGORIES[i - 1] for i in ids]})
+
+
+def generate_products(rng: np.random.Generator, ids: np.ndarray) -> pd.DataFrame:
+    count = len(ids)
+    category_ids = zipf_choice(rng, len(CATEGORIES), count, exponent=0.7) + 1
+    names = [
+        f"{CATEGORIES[c - 1].rstrip('s')} {PRODUCT_ADJECTIVES[a]} {i}"
+        for c, a, i in zip(category_ids, rng.integers(0, len(PRODUCT_ADJECTIVES), count), ids)
+    ]
+    # Prices are log-normally distributed around ~$80 with a long tail
+    prices = np.round(np.clip(rng.lognormal(4.4, 1.0, count), 1.0, 9999.0), 2)
+    return pd.DataFrame(
+        {"ProductID": ids, "ProductName": names, "Price": prices, "CategoryID": category_ids}
+    )
+
+
+def generate_orders(rng: np.random.Generator, ids: np.ndarray, sizes: Dict[str, int]) -> pd.DataFrame:
+    # A minority of users places most of the orders
+    user_ids = scatter_ids(zipf_choice(rng, sizes["Users"], len(ids), 0.9), sizes["Users"])
+    return pd.DataFrame({"OrderID": ids, "OrderDate": random_dates(rng, len(ids)), "UserID": user_ids})
+
+
+def generate_order_details(rng: np.random.Generator, ids: np.ndarray, sizes: Dict[str, int]) -> pd.DataFrame:
+    count = len(ids)
+    return pd.DataFrame(
+        {
+            "OrderDetailID": ids,
+            "OrderID": rng.integers(1, sizes["Orders"] + 1, count),
+            "ProductID": zipf_choice(rng, sizes["Products"], count) + 1,
+            "Quantity": np.minimum(rng.geometric(0.6, count), 20),
+        }
+    )
+
+
+def generate_reviews(rng: np.random.Generator, ids: np.ndarray, sizes: Dict[str, int]) -> pd.DataFrame:
+    count = len(ids)
+    ratings = rng.choice([1, 2, 3, 4, 5], size=count, p=[0.05, 0.07, 0.13, 0.35, 0.40])
+    texts = [REVIEW_TEXTS[r][i] for r, i in zip(ratings, rng.integers(0, 2, count))]
+    return pd.DataFrame(
+        {
+            "ReviewID": ids,
+            "UserID": rng.integers(1, sizes["Users"] + 1, count),
+            "ProductID": zipf_choice(rng, sizes["Products"], count) + 1,
+            "Rating": ratings,
+            "ReviewText": texts,
+            "ReviewDate": random_dates(rng, count),
+        }
+    )
+
+
+def generate_chunks(
+    rows: int, seed: int = 42, chunk_size: int = 100_000
+) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """
+    Yield (table, DataFrame) chunks for every table at the given scale, parents first.
+
+    Each chunk has its own generator seeded from (seed, table, chunk index), so the data
+    is identical across runs and loaders for the same seed and chunk size, and memory
+    stays bounded by chunk_size regardless of scale.
+    """
+    sizes = table_sizes(rows)
+    for table_index, table in enumerate(TABLES):
+        for chunk_index, start in enumerate(range(0, sizes[table], chunk_size)):
+            rng = np.random.default_rng([seed, table_index, chunk_index])
+            ids = np.arange(start + 1, min(start + chunk_size, sizes[table]) + 1)
+            if table == "Users":
+                yield table, generate_users(rng, ids)
+            elif table == "Categories":
+                yield table, generate_categories(rng, ids)
+            elif table == "Products":
+                yield table, generate_products(rng, ids)
+            elif table == "Orders":
+                yield table, generate_orders(rng, ids, sizes)
+            elif table == "OrderDetails":
+                yield table, generate_order_details(rng, ids, sizes)
+            else:
+                yield table, generate_reviews(rng, ids, sizes)
+
+
+def date_columns_to_text(df: pd.DataFrame) -> pd.DataFrame:
+    """SQLite and CSV have no date type, so dates are written as ISO strings."""
+    df = df.copy()
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = df[column].dt.strftime("%Y-%m-%d")
+    return df
+
+
+def load_chunk(database: Database, sql_dialect: str, table: str, df: pd.DataFrame):
+    if sql_dialect == "duckdb":
+        # DuckDB scans the DataFrame's columns in place, no per-row conversion
+        database.connection.register("chunk", df)
+        database.connection.execute(f"INSERT INTO {table} SELECT * FROM chunk")
+        database.connection.unregister("chunk")
+    elif sql_dialect == "sqlite":
+        df = date_columns_to_text(df).astype(object).where(df.notna(), None)
+        placeholders = ", ".join("?" for _ in df.columns)
+        with database.connection:
+            database.connection.executemany(
+                f"INSERT INTO {table} VALUES ({placeholders})", df.itertuples(index=False, name=None)
+            )
+    elif sql_dialect == "postgres":
+        buffer = io.StringIO()
+        date_columns_to_text(df).to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        cursor = database.connection.cursor()
+        cursor.copy_expert(f"COPY {table} FROM STDIN WITH (FORMAT CSV)", buffer)
+        cursor.close()
+        database.connection.commit()
+    else:
+        raise ValueError(f"Unsupported SQL dialect: {sql_dialect}")
+
+
+def load_database(
+    sql_dialect: str, url: str, rows: int, seed: int = 42, chunk_size: int = 100_000
+) -> dict:
+    """
+    Create the schema at url and bulk-load synthetic data at the given scale:
+    SQLite with executemany inside one transaction per chunk, DuckDB by scanning each
+    DataFrame chunk, and Postgres with COPY FROM STDIN.
+
+    Returns:
+        dict: Rows loaded per table, total rows, and load duration.
+    """
+    database = get_database_instance(sql_dialect)
+    database.connect(url)
+    start_time = time.perf_counter()
+    loaded = {table: 0 for table in TABLES}
+    try:
+        if sql_dialect == "sqlite":
+            database.connection.execute("PRAGMA journal_mode = OFF;")
+            database.connection.execute("PRAGMA synchronous = OFF;")
+            database.connection.executescript(SCHEMA)
+        else:
+            cursor = database.connection.cursor()
+            cursor.execute(SCHEMA)
+            cursor.close()
+            if sql_dialect == "postgres":
+                database.connection.commit()
+
+        for table, df in generate_chunks(rows, seed, chunk_size):
+            load_chunk(database, sql_dialect, table, df)
+            loaded[table] += len(df)
+    finally:
+        database.connection.close()
+
+    duration = time.perf_counter() - start_time
+    return {
+        "dialect": sql_dialect,
+        "url": url,
+        "seed": seed,
+        "tables": loaded,
+        "rows": sum(loaded.values()),
+        "duration": round(duration, 4),
+        "rows_per_second": round(sum(loaded.values()) / duration, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate seeded synthetic store data and bulk-load it into a database."
+    )
+    parser.add_argument("--dialect", choices=["sqlite", "duckdb", "postgres"], required=True)
+    parser.add_argument("--url", type=str, required=True, help="Database file path or Postgres URL")
+    parser.add_argument("--rows", type=float, default=1e4, help="Rows in the largest table (OrderDetails)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    result = load_database(args.dialect, args.url, int(args.rows), args.seed, args.chunk_size)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
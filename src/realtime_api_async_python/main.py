@@ -17,6 +17,7 @@ from .modules.tools import (
     function_map,
     tools,
 )
+from .modules.script_pool import script_pool
 from .modules.utils import (
     RUN_TIME_TABLE_LOG_JSON,
     SESSION_INSTRUCTIONS,
@@ -85,6 +86,8 @@ class RealtimeAPI:
         self.response_start_time = None
 
     async def run(self):
+        # Warm the script workers in the background so the first chart doesn't pay for imports
+        self.script_pool_task = asyncio.create_task(script_pool.start())
         while True:
             try:
                 url = "wss://api.openai.com/v1/realtime?model=gpt-4o-realtime-preview-2024-10-01"
@@ -0,0 +1,99 @@
+import asyncio
+import functools
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+from .database import Database
+from .logging import log_info
+
+# Single-threaded executors ("lanes") per backend. Each connection is pinned to one lane, so
+# every call on it runs on the thread that opened it (sqlite3 connections require this),
+# while the number of threads per backend stays bounded.
+database_lanes: Dict[str, List[ThreadPoolExecutor]] = {}
+lane_counters: Dict[str, itertools.count] = {}
+lanes_lock = threading.Lock()
+
+DATABASE_WORKERS = int(os.getenv("DATABASE_WORKERS", "4"))
+
+
+def lane_for(backend: str) -> ThreadPoolExecutor:
+    """Pick the next lane for backend round-robin, creating the backend's pool on first use."""
+    with lanes_lock:
+        if backend not in database_lanes:
+            database_lanes[backend] = [
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{backend}-db-{i}")
+                for i in range(max(1, DATABASE_WORKERS))
+            ]
+            lane_counters[backend] = itertools.count()
+        lanes = database_lanes[backend]
+        return lanes[next(lane_counters[backend]) % len(lanes)]
+
+
+class AsyncDatabase:
+    """
+    Async facade over a Database that runs every call on the backend's worker pool instead
+    of the event loop. If the awaiting task is cancelled, a queued call is dropped and a
+    running one is interrupted on the driver. Every call is recorded as a timing span.
+    """
+
+    def __init__(self, database: Database, backend: str):
+        self.database = database
+        self.backend = backend
+        self.lane = lane_for(backend)
+        self.spans = []
+
+    async def run(self, function: Callable, *args, **kwargs):
+        """Run function(*args, **kwargs) on this connection's worker thread."""
+        future = self.lane.submit(functools.partial(function, *args, **kwargs))
+        result = asyncio.wrap_future(future)
+        start_time = time.perf_counter()
+        status = "ok"
+        try:
+            return await asyncio.shield(result)
+        except asyncio.CancelledError:
+            status = "cancelled"
+            if not future.cancel():
+                # Already running: interrupt the statement, then wait so the connection is idle again
+                self.database.interrupt()
+                try:
+                    await result
+                except Exception:
+                    pass
+            raise
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            span = {
+                "operation": function.__name__,
+                "backend": self.backend,
+                "duration": round(time.perf_counter() - start_time, 4),
+                "status": status,
+            }
+            self.spans.append(span)
+            log_info(
+                f"⏱️ {self.backend}:{span['operation']}() {span['duration']}s {status}",
+                style="dim",
+            )
+
+    async def connect(self, url: str):
+        await self.run(self.database.connect, url)
+
+    async def execute_sql(self, sql: str):
+        return await self.run(self.database.execute_sql, sql)
+
+    async def read_tables(self) -> str:
+        return await self.run(self.database.read_tables)
+
+    async def data_version(self):
+        return await self.run(self.database.data_version)
+
+    async def export_sql(self, sql: str, file_path: str, output_format: str) -> dict:
+        return await self.run(self.database.export_sql, sql, file_path, output_format)
+
+    async def close(self):
+        if self.database.connection is not None:
+            await self.run(self.database.connection.close)
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Set
+
+INGEST_MAX_FILE_KB = int(os.getenv("INGEST_MAX_FILE_KB", "1024"))
+INGEST_MAX_TOTAL_MB = float(os.getenv("INGEST_MAX_TOTAL_MB", "20"))
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "8"))
+
+SNIFF_BYTES = 8192
+# File signatures of common binaries that can pass as text in their first bytes
+BINARY_SIGNATURES = (
+    b"\x89PNG",
+    b"GIF8",
+    b"\xff\xd8\xff",
+    b"%PDF",
+    b"PK\x03\x04",
+    b"\x1f\x8b",
+    b"SQLite format 3",
+    b"PAR1",
+    b"DUCK",
+)
+TEXT_CONTROL_BYTES = {7, 8, 9, 10, 12, 13, 27}
+
+
+def looks_binary(head: bytes) -> bool:
+    """Sniff the first bytes of a file: known binary signatures, NUL bytes or mostly control bytes."""
+    if head.startswith(BINARY_SIGNATURES) or b"\x00" in head:
+        return True
+    if not head:
+        return False
+    control = sum(byte < 32 and byte not in TEXT_CONTROL_BYTES for byte in head)
+    if control / len(head) > 0.1:
+        return True
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off at the end of the sniffed bytes is still text
+        return not (e.start >= len(head) - 3 and e.reason == "unexpected end of data")
+    return False
+
+
+def load_ingest_index(index_path: str) -> dict:
+    if not os.path.exists(index_path):
+        return {}
+    with open(index_path, "r") as file:
+        return json.load(file)
+
+
+def save_ingest_index(index_path: str, index: dict):
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    with open(f"{index_path}.tmp", "w") as file:
+        json.dump(index, file, indent=2)
+    os.replace(f"{index_path}.tmp", index_path)
+
+
+def read_text_file(file_path: str) -> dict:
+    """Read a file as UTF-8 text unless it sniffs as binary; content is None for binaries."""
+    with open(file_path, "rb") as file:
+        head = file.read(SNIFF_BYTES)
+        if looks_binary(head):
+            return {"content": None, "reason": "binary", "bytes_read": len(head), "sha256": None}
+        data = head + file.read()
+    return {
+        "content": data.decode("utf-8", errors="replace"),
+        "reason": None,
+        "bytes_read": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+
+
+def ingest_directory(
+    directory: str,
+    index: dict,
+    known_keys: Set[str],
+    max_file_bytes: int = INGEST_MAX_FILE_KB * 1024,
+    max_total_bytes: int = int(INGEST_MAX_TOTAL_MB * 1024 * 1024),
+    workers: int = INGEST_WORKERS,
+) -> dict:
+    """
+    Read the text files at the top of directory concurrently, for loading into memory.
+
+    Files whose size and mtime match index, and that are already in memory (known_keys), are
+    skipped without being read; files that were read but hash the same as before are reported
+    unchanged. Binaries, hidden files, files over max_file_bytes and files past the
+    max_total_bytes budget (in name order) are skipped.
+
+    Returns:
+        dict: contents (file name -> text) to upsert, unchanged and skipped files, the updated
+        index to save after the upsert, bytes_read and duration in seconds.
+    """
+    start_time = time.perf_counter()
+    skipped = []
+    unchanged = []
+    to_read = []
+    new_index = {}
+    planned_bytes = 0
+
+    for file_name in sorted(os.listdir(directory)):
+        file_path = os.path.join(directory, file_name)
+        if not os.path.isfile(file_path):
+            continue
+        if file_name.startswith("."):
+            skipped.append({"file": file_name, "reason": "hidden"})
+            continue
+        stat = os.stat(file_path)
+        previous = index.get(file_name)
+        if (
+            previous
+            and file_name in known_keys
+            and previous["size"] == stat.st_size
+            and previous["mtime_ns"] == stat.st_mtime_ns
+        ):
+            unchanged.append(file_name)
+            new_index[file_name] = previous
+            continue
+        if stat.st_size > max_file_bytes:
+            skipped.append({"file": file_name, "reason": "too_large", "size": stat.st_size})
+            continue
+        if planned_bytes + stat.st_size > max_total_bytes:
+            skipped.append({"file": file_name, "reason": "total_limit", "size": stat.st_size})
+            continue
+        planned_bytes += stat.st_size
+        to_read.append((file_name, file_path, stat))
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="ingest") as executor:
+        results = list(executor.map(lambda item: read_text_file(item[1]), to_read))
+
+    contents = {}
+    bytes_read = 0
+    for (file_name, _, stat), result in zip(to_read, results):
+        bytes_read += result["bytes_read"]
+        if result["content"] is None:
+            skipped.append({"file": file_name, "reason": result["reason"]})
+            continue
+        entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": result["sha256"]}
+        new_index[file_name] = entry
+        previous = index.get(file_name)
+        if previous and previous.get("sha256") == result["sha256"] and file_name in known_keys:
+            unchanged.append(file_name)
+            continue
+        contents[file_name] = result["content"]
+
+    return {
+        "contents": contents,
+        "unchanged": sorted(unchanged),
+        "skipped": skipped,
+        "index": new_index,
+        "bytes_read": bytes_read,
+        "duration": round(time.perf_counter() - start_time, 4),
+    }
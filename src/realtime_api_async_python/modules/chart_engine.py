@@ -0,0 +1,153 @@
+import pprint
+from enum import Enum
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class ChartType(str, Enum):
+    HISTOGRAM = "histogram"
+    PIE = "pie"
+    SCATTER = "scatter"
+    BAR = "bar"
+    LINE = "line"
+
+
+class ChartAggregation(str, Enum):
+    NONE = "none"
+    SUM = "sum"
+    MEAN = "mean"
+    COUNT = "count"
+    MIN = "min"
+    MAX = "max"
+
+
+class ChartSort(str, Enum):
+    NONE = "none"
+    ASCENDING = "ascending"
+    DESCENDING = "descending"
+
+
+class ChartTimeUnit(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    QUARTER = "quarter"
+    YEAR = "year"
+
+
+class ChartSpec(BaseModel):
+    """What to plot, picked by the LLM; the chart template does the rest."""
+
+    supported: bool
+    x_column: Optional[str]
+    y_columns: List[str]
+    aggregation: ChartAggregation
+    x_time_unit: Optional[ChartTimeUnit]
+    filter_expression: Optional[str]
+    sort: ChartSort
+    top_n: Optional[int]
+    bins: Optional[int]
+    title: str
+    x_label: Optional[str]
+    y_label: Optional[str]
+
+
+PERIOD_CODES = {
+    ChartTimeUnit.DAY: "D",
+    ChartTimeUnit.WEEK: "W",
+    ChartTimeUnit.MONTH: "M",
+    ChartTimeUnit.QUARTER: "Q",
+    ChartTimeUnit.YEAR: "Y",
+}
+
+# Standalone matplotlib script for every ChartType. The spec is inserted as a dict literal,
+# so the script saved next to the chart can be re-run or edited by hand.
+CHART_SCRIPT_TEMPLATE = '''import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import pandas as pd
+
+SPEC = __SPEC__
+
+x, ys = SPEC["x_column"], SPEC["y_columns"]
+chart_type = SPEC["chart_type"]
+df = pd.read_csv(SPEC["csv_path"])
+if SPEC["filter_expression"]:
+    df = df.query(SPEC["filter_expression"])
+if x and SPEC["period"]:
+    df[x] = pd.to_datetime(df[x]).dt.to_period(SPEC["period"]).dt.to_timestamp()
+
+fig, ax = plt.subplots(figsize=(10, 6))
+if chart_type == "histogram":
+    for column in ys or [x]:
+        ax.hist(df[column].dropna(), bins=SPEC["bins"] or "auto", alpha=0.6 if len(ys) > 1 else 1, label=column)
+    if len(ys) > 1:
+        ax.legend()
+elif chart_type == "scatter":
+    for column in ys:
+        ax.scatter(df[x], df[column], s=12, alpha=0.7, label=column)
+    if len(ys) > 1:
+        ax.legend()
+else:
+    if not ys:
+        data = df[x].value_counts().to_frame("count")
+    elif x and SPEC["aggregation"] != "none":
+        data = df.groupby(x)[ys].agg(SPEC["aggregation"])
+    else:
+        data = df.set_index(x)[ys] if x else df[ys]
+    if SPEC["sort"] != "none":
+        data = data.sort_values(data.columns[0], ascending=SPEC["sort"] == "ascending")
+    elif chart_type == "line" or SPEC["period"]:
+        data = data.sort_index()
+    if SPEC["top_n"]:
+        data = data.head(SPEC["top_n"])
+    if SPEC["period"]:
+        data.index = data.index.strftime("%Y-%m-%d")
+
+    if chart_type == "pie":
+        ax.pie(data.iloc[:, 0], labels=data.index.astype(str), autopct="%1.1f%%", startangle=90)
+        ax.axis("equal")
+    elif chart_type == "bar":
+        data.plot.bar(ax=ax, legend=len(data.columns) > 1)
+    else:
+        data.plot.line(ax=ax, marker="o" if len(data) <= 50 else None, legend=len(data.columns) > 1)
+
+ax.set_title(SPEC["title"])
+if chart_type != "pie":
+    ax.set_xlabel(SPEC["x_label"] or x or "")
+    ax.set_ylabel(SPEC["y_label"] or (", ".join(ys) if chart_type != "histogram" else "count"))
+fig.tight_layout()
+fig.savefig(SPEC["image_path"], dpi=150)
+print(SPEC["image_path"])
+'''
+
+
+def spec_problems(spec: ChartSpec, chart_type: ChartType, columns: List[str]) -> List[str]:
+    """Reasons the template can't draw spec; empty if it can."""
+    if not spec.supported:
+        return ["The chart needs more than the template options."]
+    problems = [
+        f"Unknown column '{column}'."
+        for column in [spec.x_column, *spec.y_columns]
+        if column and column not in columns
+    ]
+    if chart_type in (ChartType.SCATTER, ChartType.LINE) and not (spec.x_column and spec.y_columns):
+        problems.append(f"A {chart_type.value} chart needs an x column and at least one y column.")
+    if chart_type in (ChartType.BAR, ChartType.PIE) and not spec.x_column:
+        problems.append(f"A {chart_type.value} chart needs an x column for its categories.")
+    if chart_type == ChartType.HISTOGRAM and not (spec.y_columns or spec.x_column):
+        problems.append("A histogram needs a column to bin.")
+    return problems
+
+
+def chart_script(spec: ChartSpec, chart_type: ChartType, csv_path: str, image_path: str) -> str:
+    """The template script that draws spec from csv_path and saves it to image_path."""
+    values = {
+        **spec.model_dump(mode="json"),
+        "chart_type": chart_type.value,
+        "csv_path": csv_path,
+        "image_path": image_path,
+        "period": PERIOD_CODES.get(spec.x_time_unit),
+    }
+    return CHART_SCRIPT_TEMPLATE.replace("__SPEC__", pprint.pformat(values, sort_dicts=False))
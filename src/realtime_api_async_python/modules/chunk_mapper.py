@@ -0,0 +1,205 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from typing import Callable, Iterable, Iterator, List
+from .logging import log_info, log_warning
+
+# Files bigger than a page are discussed chunk by chunk; see discuss_file
+DISCUSS_CHUNK_KB = int(os.getenv("DISCUSS_CHUNK_KB", "24"))
+DISCUSS_MAP_CONCURRENCY = int(os.getenv("DISCUSS_MAP_CONCURRENCY", "8"))
+# Files needing more chunks than this are refused (each chunk is one model call), and notes
+# longer than DISCUSS_NOTES_MAX_KB are condensed in groups before the final answer
+DISCUSS_MAX_CHUNKS = int(os.getenv("DISCUSS_MAX_CHUNKS", "200"))
+DISCUSS_NOTES_MAX_KB = int(os.getenv("DISCUSS_NOTES_MAX_KB", "64"))
+
+# Lines that start a new section: markdown headings, top-level definitions and their decorators
+SECTION_START_PATTERN = re.compile(r"^(#{1,6}\s|(async\s+def|def|class)\s|@\w)")
+
+
+def cut_rank(lines: List[str], index: int) -> int:
+    """How good a place it is to cut before lines[index]: a new section, after a blank line, or anywhere."""
+    if SECTION_START_PATTERN.match(lines[index]):
+        return 2
+    if not lines[index - 1].strip():
+        return 1
+    return 0
+
+
+def best_cut(lines: List[str], max_chars: int) -> int:
+    """Index to cut lines at: the best-ranked boundary that leaves a chunk of at least half max_chars."""
+    best_index = None
+    best_rank = -1
+    size = 0
+    for index in range(1, len(lines)):
+        size += len(lines[index - 1])
+        if size > max_chars:
+            break
+        if size >= max_chars // 2:
+            rank = cut_rank(lines, index)
+            if rank >= best_rank:
+                best_index = index
+                best_rank = rank
+    if best_index is not None:
+        return best_index
+    # No room for a boundary: cut before the line that overflows, or after it if it's alone
+    size = 0
+    for index, line in enumerate(lines):
+        size += len(line)
+        if size > max_chars:
+            return max(index, 1)
+    return len(lines)
+
+
+def iter_chunks(lines: Iterable[str], max_chars: int = DISCUSS_CHUNK_KB * 1024) -> Iterator[dict]:
+    """
+    Split text, given as lines with their line endings, into chunks of at most about max_chars,
+    preferring to cut before headings and top-level definitions, then at blank lines. Chunks are
+    yielded as soon as they're cut, so only about one chunk of the text is held at a time.
+
+    Yields:
+        dict: text, start_line and end_line (1-based, inclusive) and sha256 of each chunk.
+    """
+    buffer = []
+    size = 0
+    start_line = 1
+
+    def cut(count: int) -> dict:
+        nonlocal buffer, size, start_line
+        text = "".join(buffer[:count])
+        chunk = {
+            "text": text,
+            "start_line": start_line,
+            "end_line": start_line + count - 1,
+            "sha256": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        }
+        start_line += count
+        buffer = buffer[count:]
+        size -= len(text)
+        return chunk
+
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        while size > max_chars and buffer:
+            yield cut(best_cut(buffer, max_chars))
+    if buffer:
+        yield cut(len(buffer))
+
+
+def split_into_chunks(lines: Iterable[str], max_chars: int = DISCUSS_CHUNK_KB * 1024) -> List[dict]:
+    """All of iter_chunks(lines, max_chars) as a list."""
+    return list(iter_chunks(lines, max_chars))
+
+
+def group_notes(notes: List[dict], max_chars: int) -> List[dict]:
+    """
+    Group consecutive notes (text, start_line, end_line) into chunks of about max_chars for
+    the next level of a hierarchical reduce. Each group but a trailing one holds at least two
+    notes, so every level shrinks the number of notes.
+    """
+    groups = []
+    members = []
+    size = 0
+    for note in notes:
+        if len(members) >= 2 and size + len(note["text"]) > max_chars:
+            groups.append(members)
+            members, size = [], 0
+        members.append(note)
+        size += len(note["text"])
+    if members:
+        groups.append(members)
+
+    chunks = []
+    for members in groups:
+        text = "\n".join(note["text"] for note in members)
+        chunks.append(
+            {
+                "text": text,
+                "start_line": members[0]["start_line"],
+                "end_line": members[-1]["end_line"],
+                "sha256": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            }
+        )
+    return chunks
+
+
+class ChunkMapper:
+    """
+    Runs a per-chunk LLM step (the map of a map-reduce) concurrently, at most `concurrency` calls
+    at a time, and caches each chunk's result on disk by a hash of the step's namespace and the
+    chunk's content, so unchanged chunks are never sent twice.
+    """
+
+    def __init__(self, cache_dir: str, concurrency: int = DISCUSS_MAP_CONCURRENCY):
+        self.cache_dir = cache_dir
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    def cache_path(self, namespace: str, chunk: dict) -> str:
+        digest = hashlib.sha256(f"{namespace}\n{chunk['sha256']}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def cached(self, namespace: str, chunk: dict):
+        cache_path = self.cache_path(namespace, chunk)
+        if not os.path.exists(cache_path):
+            return None
+        with open(cache_path, "r") as file:
+            return json.load(file)["result"]
+
+    def store(self, namespace: str, chunk: dict, result: str):
+        cache_path = self.cache_path(namespace, chunk)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump({"result": result, "created_at": time.time()}, file)
+            os.replace(temp_path, cache_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    async def map_chunk(self, chunk: dict, step: Callable[[dict], str], namespace: str) -> dict:
+        result = self.cached(namespace, chunk)
+        if result is not None:
+            return {"result": result, "cached": True}
+        async with self.semaphore:
+            result = await asyncio.to_thread(step, chunk)
+        self.store(namespace, chunk, result)
+        return {"result": result, "cached": False}
+
+    async def map_all(self, chunks: List[dict], step: Callable[[dict], str], namespace: str) -> dict:
+        """
+        Run step on every chunk not already cached under namespace.
+
+        Returns:
+            dict: results (one per chunk, None where step failed), the counts of cached, mapped and
+            failed chunks, and duration in seconds.
+        """
+        start_time = time.perf_counter()
+        outcomes = await asyncio.gather(
+            *(self.map_chunk(chunk, step, namespace) for chunk in chunks), return_exceptions=True
+        )
+        results = []
+        counts = {"cached": 0, "mapped": 0, "failed": 0}
+        for chunk, outcome in zip(chunks, outcomes):
+            if isinstance(outcome, Exception):
+                log_warning(f"Chunk at lines {chunk['start_line']}-{chunk['end_line']} failed: {outcome}")
+                results.append(None)
+                counts["failed"] += 1
+                continue
+            results.append(outcome["result"])
+            counts["cached" if outcome["cached"] else "mapped"] += 1
+        duration = round(time.perf_counter() - start_time, 4)
+        log_info(
+            f"Mapped {len(chunks)} chunks ({counts['cached']} cached, {counts['failed']} failed) in {duration}s",
+            style="dim",
+        )
+        return {"results": results, **counts, "duration": duration}
+
+
+chunk_mapper = ChunkMapper(
+    os.path.join(os.getenv("SCRATCH_PAD_DIR", "./scratchpad"), ".cache", "chunk_notes")
+)
@@ -0,0 +1,220 @@
+import ast
+import builtins
+import importlib.util
+import os
+import symtable
+import sys
+import tempfile
+import tomllib
+from typing import List, Optional, Set
+from .script_environments import script_metadata
+from .script_runner import run_command
+
+# Names every module has without defining them
+MODULE_ATTRIBUTES = {
+    "__name__",
+    "__file__",
+    "__doc__",
+    "__builtins__",
+    "__spec__",
+    "__loader__",
+    "__package__",
+    "__annotations__",
+    "__path__",
+    "__cached__",
+}
+
+# Names a class body has without defining them (`__class__` in methods is a closure cell)
+CLASS_ATTRIBUTES = {"__qualname__", "__module__"}
+
+# Imports the module without running its `if __name__ == "__main__":` block
+DRY_IMPORT_CODE = (
+    "import os, runpy, sys; sys.path.insert(0, os.path.dirname(sys.argv[1])); "
+    "runpy.run_path(sys.argv[1], run_name='__dry_import__')"
+)
+
+
+def optional_imports(tree: ast.Module) -> Set[int]:
+    """Line numbers of imports guarded by `try: ... except ImportError`."""
+    lines = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Try):
+            continue
+        handled = set()
+        for handler in node.handlers:
+            names = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+            handled.update(n.id for n in names if isinstance(n, ast.Name))
+        if handled & {"ImportError", "ModuleNotFoundError", "Exception", "BaseException"} or any(
+            handler.type is None for handler in node.handlers
+        ):
+            for statement in node.body:
+                for child in ast.walk(statement):
+                    if isinstance(child, (ast.Import, ast.ImportFrom)):
+                        lines.add(child.lineno)
+    return lines
+
+
+def imported_modules(tree: ast.Module) -> List[tuple]:
+    """(top-level module name, line) for every absolute, unguarded import."""
+    guarded = optional_imports(tree)
+    modules = []
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.Import, ast.ImportFrom)) or node.lineno in guarded:
+            continue
+        if isinstance(node, ast.Import):
+            modules += [(alias.name.split(".")[0], node.lineno) for alias in node.names]
+        elif node.level == 0 and node.module:
+            modules.append((node.module.split(".")[0], node.lineno))
+    return modules
+
+
+def module_is_resolvable(name: str, script_dir: Optional[str]) -> bool:
+    if name in sys.stdlib_module_names or name in sys.builtin_module_names:
+        return True
+    if script_dir and (
+        os.path.exists(os.path.join(script_dir, f"{name}.py"))
+        or os.path.isdir(os.path.join(script_dir, name))
+    ):
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def undefined_names(source: str, file_name: str) -> List[tuple]:
+    """
+    Globals that are read somewhere but never bound at module level, nor declared global
+    and assigned in a function. Returns (name, scope) pairs.
+    """
+    module = symtable.symtable(source, file_name, "exec")
+    defined = set(MODULE_ATTRIBUTES) | set(dir(builtins))
+    references = []
+
+    def visit(table: symtable.SymbolTable, is_module: bool):
+        for symbol in table.get_symbols():
+            name = symbol.get_name()
+            if is_module:
+                if symbol.is_assigned() or symbol.is_imported() or symbol.is_namespace():
+                    defined.add(name)
+                elif symbol.is_referenced():
+                    references.append((name, "module"))
+            elif symbol.is_global():
+                if table.get_type() == "class" and name in CLASS_ATTRIBUTES:
+                    continue
+                if symbol.is_declared_global() and symbol.is_assigned():
+                    defined.add(name)
+                elif symbol.is_referenced():
+                    references.append((name, table.get_name()))
+        for child in table.get_children():
+            visit(child, False)
+
+    visit(module, True)
+    seen = set()
+    undefined = []
+    for name, scope in references:
+        if name not in defined and name not in seen:
+            seen.add(name)
+            undefined.append((name, scope))
+    return undefined
+
+
+def static_check(source: str, file_path: str) -> dict:
+    """
+    Check Python source without running it: syntax, imports that can't be resolved in
+    this environment, and names that are never defined.
+
+    Returns:
+        dict: 'runnable' is True when every check passed, False when one found a
+        definite error, and None when the checks can't decide (star imports, or
+        dependencies declared for another environment). 'issues' lists the errors
+        found and 'checks' the checks that ran.
+    """
+    checks = ["syntax"]
+    try:
+        compile(source, file_path, "exec", dont_inherit=True)
+    except SyntaxError as e:
+        location = f"line {e.lineno}" + (f", column {e.offset}" if e.offset else "")
+        return {
+            "runnable": False,
+            "issues": [f"SyntaxError at {location}: {e.msg}"],
+            "checks": checks,
+        }
+
+    tree = ast.parse(source, file_path)
+    issues = []
+    conclusive = True
+
+    # Scripts with inline metadata run in their own environment, so their imports can't be checked here
+    checks.append("imports")
+    try:
+        metadata = script_metadata(source)
+    except tomllib.TOMLDecodeError as e:
+        return {
+            "runnable": False,
+            "issues": [f"Invalid `# /// script` metadata block: {e}"],
+            "checks": checks,
+        }
+    script_dir = os.path.dirname(os.path.abspath(file_path))
+    reported = set()
+    for name, line in imported_modules(tree):
+        if name in reported or module_is_resolvable(name, script_dir):
+            continue
+        reported.add(name)
+        if metadata and metadata.get("dependencies"):
+            conclusive = False
+        else:
+            issues.append(f"ModuleNotFoundError at line {line}: No module named '{name}'")
+
+    if any(
+        isinstance(node, ast.ImportFrom) and any(alias.name == "*" for alias in node.names)
+        for node in ast.walk(tree)
+    ):
+        # A star import can define any name
+        conclusive = False
+    else:
+        checks.append("names")
+        for name, scope in undefined_names(source, file_path):
+            where = "at module level" if scope == "module" else f"in {scope}()"
+            issues.append(f"NameError {where}: name '{name}' is not defined")
+
+    if issues:
+        return {"runnable": False, "issues": issues, "checks": checks}
+    return {"runnable": True if conclusive else None, "issues": [], "checks": checks}
+
+
+async def dry_import(file_path: str, timeout: float = 15) -> dict:
+    """
+    Import the script in a sandboxed subprocess (own temporary working directory, CPU and
+    memory limits) without running its __main__ block. Top-level code still runs.
+    """
+    with tempfile.TemporaryDirectory(prefix="code_check_") as run_dir:
+        result = await run_command(
+            [sys.executable, "-c", DRY_IMPORT_CODE, os.path.abspath(file_path)],
+            cwd=run_dir,
+            timeout=timeout,
+        )
+    if result.success:
+        return {"runnable": True, "issues": []}
+    if result.timed_out:
+        # Long-running top-level code isn't an error
+        return {"runnable": None, "issues": []}
+    return {"runnable": False, "issues": [result.stderr.strip()[-2000:]]}
+
+
+async def check_code(source: str, file_path: str, run_dry_import: bool = False) -> dict:
+    """
+    static_check, followed by a dry import when that is enabled and nothing was found.
+    Scripts with inline dependencies are never dry imported, since this interpreter
+    doesn't have them.
+    """
+    result = static_check(source, file_path)
+    if result["runnable"] is False:
+        return result
+    metadata = script_metadata(source) or {}
+    if run_dry_import and not metadata.get("dependencies"):
+        imported = await dry_import(file_path)
+        result["checks"].append("dry_import")
+        if imported["runnable"] is not None:
+            result = {**result, "runnable": imported["runnable"], "issues": imported["issues"]}
+    return result
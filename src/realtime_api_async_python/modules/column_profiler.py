@@ -0,0 +1,161 @@
+import json
+import os
+import threading
+import time
+from typing import Optional
+import pandas as pd
+from .database import Database, get_database_instance
+from .schema_index import schema_cache_path
+
+# Backends without a data version (Postgres) have their profiles refreshed after this long
+PROFILE_TTL_SECONDS = float(os.getenv("PROFILE_TTL_SECONDS", "3600"))
+# After a failed profiling run, wait this long before trying the namespace again
+PROFILE_RETRY_SECONDS = float(os.getenv("PROFILE_RETRY_SECONDS", "300"))
+
+# Namespaces with a profiling run in flight, so repeated prompts don't start duplicate runs
+profiling_in_progress = set()
+# When each namespace's last profiling run failed, so a broken database isn't re-profiled on every prompt
+profiling_failed_at = {}
+profiling_lock = threading.Lock()
+
+
+def profile_column(series: pd.Series, top_k: int) -> dict:
+    """Summarize a sampled column: distinct count, null rate, min/max and the most common values."""
+    non_null = series.dropna()
+    profile = {
+        "distinct": int(non_null.nunique()),
+        "null_rate": round(float(series.isna().mean()), 4) if len(series) else 0.0,
+    }
+    if non_null.empty:
+        return profile
+
+    if pd.api.types.is_numeric_dtype(non_null) or pd.api.types.is_datetime64_any_dtype(non_null):
+        profile["min"] = str(non_null.min())
+        profile["max"] = str(non_null.max())
+    else:
+        values = non_null.astype(str)
+        profile["min"] = min(values)[:40]
+        profile["max"] = max(values)[:40]
+
+    # Only low-cardinality columns get their common values; for near-unique columns they're noise
+    if profile["distinct"] <= min(50, len(non_null) // 2):
+        top_values = non_null.astype(str).value_counts().head(top_k)
+        profile["top_values"] = [value[:40] for value in top_values.index]
+    return profile
+
+
+def profile_database(database: Database, sample_rows: int = 10000, top_k: int = 5) -> dict:
+    """Profile every column of every table from a bounded sample of each table."""
+    profiles = {}
+    for table in database.describe_tables():
+        df = database.execute_sql(database.sample_sql(table["name"], sample_rows))
+        profiles[table["name"]] = {
+            "sampled_rows": len(df),
+            "columns": {
+                column: profile_column(df[column], top_k) for column in df.columns
+            },
+        }
+    return profiles
+
+
+def load_profiles(
+    namespace: str,
+    data_version: Optional[str],
+    cache_dir: str,
+    ttl_seconds: float = PROFILE_TTL_SECONDS,
+) -> Optional[dict]:
+    """
+    Return cached profiles if they were computed for this data version, otherwise None.
+    Without a data version, profiles are reused for ttl_seconds after they were computed.
+    """
+    cache_path = schema_cache_path(cache_dir, namespace, "profiles")
+    if not os.path.exists(cache_path):
+        return None
+    with open(cache_path, "r") as file:
+        cached = json.load(file)
+    if cached.get("data_version") != data_version:
+        return None
+    if data_version is None and time.time() - cached.get("profiled_at", 0) >= ttl_seconds:
+        return None
+    return cached["tables"]
+
+
+def refresh_profiles(
+    sql_dialect: str, database_url: str, namespace: str, cache_dir: str, sample_rows: int = 10000
+):
+    """Profile the database on a dedicated connection and persist the result next to the schema cache."""
+    database = get_database_instance(sql_dialect)
+    try:
+        database.connect(database_url)
+        data_version = database.data_version()
+        profiles = profile_database(database, sample_rows)
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_path = schema_cache_path(cache_dir, namespace, "profiles")
+        with open(f"{cache_path}.tmp", "w") as file:
+            json.dump(
+                {"data_version": data_version, "profiled_at": time.time(), "tables": profiles},
+                file,
+                indent=2,
+            )
+        os.replace(f"{cache_path}.tmp", cache_path)
+    except Exception:
+        with profiling_lock:
+            profiling_failed_at[namespace] = time.time()
+        raise
+    else:
+        with profiling_lock:
+            profiling_failed_at.pop(namespace, None)
+    finally:
+        if database.connection is not None:
+            database.connection.close()
+        with profiling_lock:
+            profiling_in_progress.discard(namespace)
+
+
+def profile_in_background(
+    sql_dialect: str,
+    database_url: str,
+    namespace: str,
+    cache_dir: str,
+    sample_rows: int = 10000,
+    retry_seconds: float = PROFILE_RETRY_SECONDS,
+) -> bool:
+    """
+    Start refreshing the profiles on a background thread unless a run for this namespace
+    is already in flight or failed less than retry_seconds ago. Returns True if a new run was started.
+    """
+    with profiling_lock:
+        if namespace in profiling_in_progress:
+            return False
+        if time.time() - profiling_failed_at.get(namespace, 0) < retry_seconds:
+            return False
+        profiling_in_progress.add(namespace)
+
+    thread = threading.Thread(
+        target=refresh_profiles,
+        args=(sql_dialect, database_url, namespace, cache_dir, sample_rows),
+        daemon=True,
+    )
+    thread.start()
+    return True
+
+
+def format_profiles(profiles: dict, table_names: list) -> str:
+    """Render compact one-line-per-column profiles as SQL comments for the prompt."""
+    lines = []
+    for table_name in table_names:
+        table_profile = profiles.get(table_name)
+        if not table_profile:
+            continue
+        for column, profile in table_profile["columns"].items():
+            line = f"-- {table_name}.{column}: {profile['distinct']} distinct"
+            if profile["null_rate"]:
+                line += f", {profile['null_rate']:.0%} null"
+            if "min" in profile:
+                line += f", range {profile['min']} .. {profile['max']}"
+            if profile.get("top_values"):
+                line += f", values {', '.join(profile['top_values'])}"
+            lines.append(line)
+    if not lines:
+        return ""
+    return "-- Column profiles (sampled)\n" + "\n".join(lines) + "\n"
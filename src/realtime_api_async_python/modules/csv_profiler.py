@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import warnings
+from typing import Optional
+import numpy as np
+import pandas as pd
+from .column_profiler import profile_column
+
+SAMPLE_KEY = "__sample_key__"
+
+# Profiles of files seen in this process, keyed like the on-disk cache
+profile_memo = {}
+profile_memo_lock = threading.Lock()
+
+
+def file_signature(file_path: str) -> dict:
+    stat = os.stat(file_path)
+    return {"path": os.path.abspath(file_path), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def infer_type(series: pd.Series) -> str:
+    """Coarse column type for prompts: integer, float, boolean, datetime or text."""
+    if pd.api.types.is_bool_dtype(series):
+        return "boolean"
+    if pd.api.types.is_integer_dtype(series):
+        return "integer"
+    if pd.api.types.is_numeric_dtype(series):
+        return "float"
+    non_null = series.dropna()
+    if non_null.empty:
+        return "text"
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        parsed = pd.to_datetime(non_null.astype(str), errors="coerce", format="mixed")
+    return "datetime" if parsed.notna().mean() >= 0.95 else "text"
+
+
+def profile_csv(
+    file_path: str,
+    sample_rows: int = 10000,
+    chunk_size: int = 100000,
+    preview_rows: int = 10,
+    top_k: int = 5,
+    seed: int = 0,
+) -> dict:
+    """
+    Profile a CSV in constant memory: the file is streamed in chunks while a uniform
+    sample of sample_rows rows is kept (bottom-k of random keys). Row and null counts,
+    numeric min/max and means are exact; distinct counts and common values come from the
+    sample.
+    """
+    rng = np.random.default_rng(seed)
+    sample = None
+    preview = None
+    rows = 0
+    exact = {}
+    for chunk in pd.read_csv(file_path, chunksize=chunk_size):
+        if preview is None:
+            preview = chunk.head(preview_rows)
+        rows += len(chunk)
+        for column in chunk.columns:
+            stats = exact.setdefault(
+                column, {"nulls": 0, "numeric": True, "min": None, "max": None, "sum": 0.0, "count": 0}
+            )
+            values = chunk[column]
+            stats["nulls"] += int(values.isna().sum())
+            numeric = pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
+            stats["numeric"] = stats["numeric"] and numeric
+            if stats["numeric"] and values.notna().any():
+                chunk_min, chunk_max = values.min(), values.max()
+                stats["min"] = chunk_min if stats["min"] is None else min(stats["min"], chunk_min)
+                stats["max"] = chunk_max if stats["max"] is None else max(stats["max"], chunk_max)
+                stats["sum"] += float(values.sum())
+                stats["count"] += int(values.notna().sum())
+
+        chunk = chunk.assign(**{SAMPLE_KEY: rng.random(len(chunk))})
+        sample = chunk if sample is None else pd.concat([sample, chunk], ignore_index=True)
+        if len(sample) > sample_rows:
+            sample = sample.nsmallest(sample_rows, SAMPLE_KEY)
+
+    if sample is None:
+        # Header only
+        sample = pd.read_csv(file_path, nrows=0)
+        preview = sample
+    sample = sample.drop(columns=[SAMPLE_KEY], errors="ignore").sort_index()
+
+    columns = {}
+    for column in sample.columns:
+        profile = {"type": infer_type(sample[column]), **profile_column(sample[column], top_k)}
+        stats = exact.get(column)
+        if stats:
+            profile["null_rate"] = round(stats["nulls"] / rows, 4) if rows else 0.0
+            if stats["numeric"] and stats["count"]:
+                profile["min"] = str(stats["min"])
+                profile["max"] = str(stats["max"])
+                profile["mean"] = round(stats["sum"] / stats["count"], 4)
+        columns[column] = profile
+
+    return {
+        "rows": rows,
+        "sampled_rows": len(sample),
+        "columns": columns,
+        "preview": preview.to_string(index=False),
+    }
+
+
+def profile_cache_path(cache_dir: str, file_path: str) -> str:
+    digest = hashlib.sha256(os.path.abspath(file_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{digest}.json")
+
+
+def load_csv_profile(file_path: str, cache_dir: Optional[str] = None, **options) -> dict:
+    """
+    Profile of file_path, reused while its path, mtime and size are unchanged. Profiles are
+    memoized in-process and, when cache_dir is given, persisted there.
+    """
+    signature = file_signature(file_path)
+    memo_key = json.dumps({**signature, **options}, sort_keys=True)
+    with profile_memo_lock:
+        if memo_key in profile_memo:
+            return profile_memo[memo_key]
+
+    cache_path = profile_cache_path(cache_dir, file_path) if cache_dir else None
+    profile = None
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path, "r") as file:
+            cached = json.load(file)
+        if cached.get("signature") == signature and cached.get("options") == options:
+            profile = cached["profile"]
+
+    if profile is None:
+        profile = profile_csv(file_path, **options)
+        if cache_path:
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as file:
+                    json.dump({"signature": signature, "options": options, "profile": profile}, file, indent=2)
+                os.replace(temp_path, cache_path)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+
+    with profile_memo_lock:
+        profile_memo[memo_key] = profile
+    return profile
+
+
+def format_csv_profile(profile: dict) -> str:
+    """One line per column, for chart prompts."""
+    lines = [f"{profile['rows']} rows, {len(profile['columns'])} columns (stats from a {profile['sampled_rows']}-row sample)"]
+    for column, stats in profile["columns"].items():
+        line = f"{column} ({stats['type']}): {stats['distinct']} distinct"
+        if stats["null_rate"]:
+            line += f", {stats['null_rate']:.0%} null"
+        if "min" in stats:
+            line += f", range {stats['min']} .. {stats['max']}"
+        if "mean" in stats:
+            line += f", mean {stats['mean']}"
+        if stats.get("top_values"):
+            line += f", values {', '.join(stats['top_values'])}"
+        lines.append(line)
+    return "\n".join(lines)
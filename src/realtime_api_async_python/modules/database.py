@@ -1,26 +1,204 @@
+import os
+import json
+import random
+import time
+import threading
+import uuid
+from contextlib import contextmanager
 import psycopg2
 import pandas as pd
 import sqlite3
 import duckdb
 
+
+def strip_sql(sql: str) -> str:
+    """Remove surrounding whitespace and trailing semicolons so the query can be nested."""
+    return sql.strip().rstrip(";").strip()
+
+
+def is_query(sql: str) -> bool:
+    """Whether sql is a single read query that can be nested in COPY or a cursor declaration."""
+    stripped = strip_sql(sql)
+    first_word = stripped.split(None, 1)[0].lower() if stripped else ""
+    return first_word in ("select", "with", "values", "table") and ";" not in stripped
+
+
+def write_dataframe(df: pd.DataFrame, file_path: str, output_format: str):
+    """Write a DataFrame to file_path in one of the supported output formats ('.csv', '.jsonl', '.json', '.parquet')."""
+    if output_format == ".csv":
+        df.to_csv(file_path, index=False)
+    elif output_format == ".jsonl":
+        df.to_json(file_path, orient="records", lines=True)
+    elif output_format == ".json":
+        df.to_json(file_path, orient="records")
+    elif output_format == ".parquet":
+        # DuckDB writes parquet without requiring pyarrow
+        duckdb.from_df(df).write_parquet(file_path)
+    else:
+        raise ValueError(f"Invalid output format: {output_format}")
+
+
+def export_stats(engine: str, rows: int, start_time: float) -> dict:
+    duration = time.perf_counter() - start_time
+    return {
+        "engine": engine,
+        "rows": rows,
+        "duration": round(duration, 4),
+        "rows_per_second": round(rows / duration, 1) if duration > 0 else None,
+    }
+
+
+def file_version(path: str) -> str:
+    """Version token for a file-backed database based on its modification time and size."""
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def duckdb_plan_estimate(node: dict) -> int:
+    """Estimate the output cardinality of a DuckDB JSON plan node."""
+    estimate = node.get("extra_info", {}).get("Estimated Cardinality")
+    if estimate is not None:
+        return int(estimate)
+    child_estimates = [duckdb_plan_estimate(child) for child in node.get("children", [])]
+    if not child_estimates:
+        return 0
+    if "CROSS_PRODUCT" in node.get("name", ""):
+        product = 1
+        for child_estimate in child_estimates:
+            product *= child_estimate
+        return product
+    return max(child_estimates)
+
+
+def duckdb_plan_cost(node: dict) -> int:
+    """Approximate the cost of a DuckDB JSON plan as the rows produced by every operator."""
+    return duckdb_plan_estimate(node) + sum(
+        duckdb_plan_cost(child) for child in node.get("children", [])
+    )
+
+
+def export_parquet(parquet_path: str, file_path: str, output_format: str) -> dict:
+    """Export a parquet file (e.g. a cached result) to file_path using an in-memory DuckDB session."""
+    database = DuckDBDatabase()
+    database.connect(":memory:")
+    escaped_path = parquet_path.replace("'", "''")
+    try:
+        return database.export_sql(
+            f"SELECT * FROM read_parquet('{escaped_path}')", file_path, output_format
+        )
+    finally:
+        database.connection.close()
+
+
 class Database:
+    # Seconds a single statement may run before it is interrupted; None disables the limit
+    statement_timeout = None
+
     def connect(self, url: str):
         raise NotImplementedError("Subclasses must implement this method.")
 
+    def explain(self, sql: str) -> dict:
+        """
+        Dry-run sql through the planner without executing it.
+
+        Raises the driver's error for statements that fail to parse or bind.
+
+        Returns:
+            dict: The plan text plus 'estimated_rows' and 'estimated_cost' (None when unavailable).
+        """
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def interrupt(self):
+        """Cancel the statement currently running on this connection. Safe to call from another thread."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def sample_sql(self, table_name: str, rows: int) -> str:
+        """SQL selecting a sample of roughly `rows` rows from table_name."""
+        return f"SELECT * FROM {table_name} LIMIT {rows}"
+
+    @contextmanager
+    def time_limit(self):
+        """Interrupt statements run inside this block once statement_timeout seconds have passed."""
+        if not self.statement_timeout:
+            yield
+            return
+
+        timed_out = threading.Event()
+
+        def on_timeout():
+            timed_out.set()
+            self.interrupt()
+
+        timer = threading.Timer(self.statement_timeout, on_timeout)
+        timer.daemon = True
+        timer.start()
+        try:
+            yield
+        except Exception as e:
+            if timed_out.is_set():
+                raise TimeoutError(
+                    f"Query exceeded the statement timeout of {self.statement_timeout} seconds"
+                ) from e
+            raise
+        finally:
+            timer.cancel()
+
+    def data_version(self):
+        """
+        Token that changes whenever the underlying data changes, or None when
+        the backend can't provide one cheaply.
+        """
+        return None
+
+    def query_version(self, sql: str):
+        """
+        Data version for the results of sql. Backends that can tell which tables a query
+        reads may scope it to those, so unrelated writes don't invalidate cached results.
+        """
+        return self.data_version()
+
     def read_tables(self, schema: str = None) -> str:
+        return "".join(table["definition"] for table in self.describe_tables(schema))
+
+    def describe_tables(self, schema: str = None) -> list:
+        """
+        Describe every table as a dict with its 'name', 'columns' (name, type and optional comment),
+        'foreign_keys' (column, referenced table and column), optional 'comment', and the
+        CREATE TABLE 'definition' used by read_tables.
+        """
         raise NotImplementedError("Subclasses must implement this method.")
 
     def execute_sql(self, sql: str) -> pd.DataFrame:
         raise NotImplementedError("Subclasses must implement this method.")
 
+    def export_sql(self, sql: str, file_path: str, output_format: str) -> dict:
+        """
+        Execute sql and write the results to file_path.
+
+        The default path loads the results into pandas and serializes them from there.
+        Dialects with a native export mechanism override this.
+
+        Returns:
+            dict: Export stats with the engine used, row count, duration and rows per second.
+        """
+        start_time = time.perf_counter()
+        df = self.execute_sql(sql)
+        write_dataframe(df, file_path, output_format)
+        return export_stats("pandas", len(df), start_time)
+
 class PostgresDatabase(Database):
+    # Rows fetched per round trip from server-side cursors
+    itersize = int(os.getenv("POSTGRES_ITERSIZE", "10000"))
+
     def __init__(self):
+        self.url = None
         self.connection = None
 
     def connect(self, url: str):
+        self.url = url
         self.connection = psycopg2.connect(url)
 
-    def read_tables(self, schema: str = None) -> str:
+    def describe_tables(self, schema: str = None) -> list:
         cursor = self.connection.cursor()
         if schema:
             cursor.execute(
@@ -41,7 +219,7 @@ class PostgresDatabase(Database):
             )
         tables = cursor.fetchall()
 
-        table_defs = ""
+        table_descriptions = []
         for table in tables:
             if schema:
                 table_schema = schema
@@ -50,14 +228,35 @@ class PostgresDatabase(Database):
                 table_schema, table_name = table
             cursor.execute(
                 """
-                SELECT column_name, data_type, is_nullable, column_default
-                FROM information_schema.columns
-                WHERE table_schema = %s AND table_name = %s
+                SELECT c.column_name, c.data_type, c.is_nullable, c.column_default,
+                       col_description(format('%%I.%%I', c.table_schema, c.table_name)::regclass, c.ordinal_position)
+                FROM information_schema.columns c
+                WHERE c.table_schema = %s AND c.table_name = %s
+                ORDER BY c.ordinal_position
                 """,
                 (table_schema, table_name)
             )
             columns = cursor.fetchall()
-            table_defs += f"CREATE TABLE {table_schema}.{table_name} (\n"
+            cursor.execute(
+                """
+                SELECT kcu.column_name, ccu.table_schema, ccu.table_name, ccu.column_name
+                FROM information_schema.table_constraints tc
+                JOIN information_schema.key_column_usage kcu
+                  ON tc.constraint_name = kcu.constraint_name AND tc.table_schema = kcu.table_schema
+                JOIN information_schema.constraint_column_usage ccu
+                  ON tc.constraint_name = ccu.constraint_name AND tc.table_schema = ccu.table_schema
+                WHERE tc.constraint_type = 'FOREIGN KEY' AND tc.table_schema = %s AND tc.table_name = %s
+                """,
+                (table_schema, table_name)
+            )
+            foreign_keys = cursor.fetchall()
+            cursor.execute(
+                "SELECT obj_description(format('%%I.%%I', %s, %s)::regclass, 'pg_class')",
+                (table_schema, table_name)
+            )
+            (table_comment,) = cursor.fetchone()
+
+            table_def = f"CREATE TABLE {table_schema}.{table_name} (\n"
             col_defs = []
             for col in columns:
                 col_def = f"    {col[0]} {col[1]}"
@@ -66,32 +265,160 @@ class PostgresDatabase(Database):
                 if col[2] == 'NO':
                     col_def += " NOT NULL"
                 col_defs.append(col_def)
-            table_defs += ",\n".join(col_defs)
-            table_defs += "\n);\n\n"
+            table_def += ",\n".join(col_defs)
+            table_def += "\n);\n\n"
+
+            table_descriptions.append(
+                {
+                    "name": f"{table_schema}.{table_name}",
+                    "columns": [
+                        {"name": col[0], "type": col[1], "comment": col[4]}
+                        for col in columns
+                    ],
+                    "foreign_keys": [
+                        {
+                            "column": fk[0],
+                            "references_table": f"{fk[1]}.{fk[2]}",
+                            "references_column": fk[3],
+                        }
+                        for fk in foreign_keys
+                    ],
+                    "comment": table_comment,
+                    "definition": table_def,
+                }
+            )
+        cursor.close()
+        return table_descriptions
+
+    def explain(self, sql: str) -> dict:
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {strip_sql(sql)}")
+            (plan,) = cursor.fetchone()
+        except psycopg2.Error:
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        root = plan[0]["Plan"]
+        return {
+            "plan": json.dumps(plan, indent=2),
+            "estimated_rows": int(root["Plan Rows"]),
+            "estimated_cost": float(root["Total Cost"]),
+        }
+
+    def interrupt(self):
+        self.connection.cancel()
+
+    def sample_sql(self, table_name: str, rows: int) -> str:
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "SELECT reltuples FROM pg_class WHERE oid = %s::regclass", (table_name,)
+        )
+        (estimated_rows,) = cursor.fetchone()
         cursor.close()
-        return table_defs
+        if estimated_rows <= rows:
+            return f"SELECT * FROM {table_name} LIMIT {rows}"
+        percent = min(100.0, 100.0 * rows / estimated_rows)
+        return f"SELECT * FROM {table_name} TABLESAMPLE BERNOULLI ({percent:.6f}) LIMIT {rows}"
+
+    def iter_sql(self, sql: str):
+        """
+        Stream the results of a query as DataFrame chunks of `itersize` rows through a
+        named server-side cursor, so the client never buffers the full result set.
+        """
+        cursor = self.connection.cursor(name=f"realtime_cursor_{uuid.uuid4().hex}")
+        cursor.itersize = self.itersize
+        chunks = 0
+        try:
+            with self.time_limit():
+                cursor.execute(strip_sql(sql))
+                rows = cursor.fetchmany(self.itersize)
+                # Named cursors only describe their columns after the first fetch
+                columns = [column.name for column in cursor.description]
+                while rows:
+                    yield pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+                    chunks += 1
+                    rows = cursor.fetchmany(self.itersize)
+            cursor.close()
+            self.connection.commit()
+        except BaseException:
+            # Also covers a consumer that stops early; the rollback closes the server-side cursor
+            self.connection.rollback()
+            raise
+        if chunks == 0:
+            yield pd.DataFrame(columns=columns)
 
     def execute_sql(self, sql: str) -> pd.DataFrame:
-        df = pd.read_sql_query(sql, self.connection)
-        return df
+        if not is_query(sql):
+            # Server-side cursors only accept a single query; other statements use a client cursor
+            try:
+                with self.time_limit():
+                    df = pd.read_sql_query(sql, self.connection)
+            except Exception:
+                self.connection.rollback()
+                raise
+            return df
+        return pd.concat(list(self.iter_sql(sql)), ignore_index=True)
+
+    def export_sql(self, sql: str, file_path: str, output_format: str) -> dict:
+        """
+        Stream CSV exports straight from the server into the file with COPY ... TO STDOUT.
+        Other formats go through the server-side cursor.
+        """
+        if output_format != ".csv" or not is_query(sql):
+            return super().export_sql(sql, file_path, output_format)
+
+        start_time = time.perf_counter()
+        cursor = self.connection.cursor()
+        try:
+            with self.time_limit(), open(file_path, "w", newline="") as file:
+                cursor.copy_expert(
+                    f"COPY ({strip_sql(sql)}) TO STDOUT WITH (FORMAT CSV, HEADER)", file
+                )
+            rows = cursor.rowcount
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        self.connection.commit()
+        return export_stats("postgres_copy", rows, start_time)
 
 class SQLiteDatabase(Database):
     def __init__(self):
+        self.url = None
         self.connection = None
 
     def connect(self, url: str):
+        self.url = url
         self.connection = sqlite3.connect(url)
 
-    def read_tables(self, schema: str = None) -> str:
+    def data_version(self):
+        if self.url == ":memory:":
+            return None
+        (pragma_version,) = self.connection.execute("PRAGMA data_version;").fetchone()
+        version = f"{file_version(self.url)}:{pragma_version}"
+        wal_path = f"{self.url}-wal"
+        if os.path.exists(wal_path):
+            version += f":{file_version(wal_path)}"
+        return version
+
+    def describe_tables(self, schema: str = None) -> list:
         cursor = self.connection.cursor()
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
         tables = cursor.fetchall()
 
-        table_defs = ""
+        table_descriptions = []
         for (table_name,) in tables:
             cursor.execute(f"PRAGMA table_info('{table_name}');")
             columns = cursor.fetchall()
-            table_defs += f"CREATE TABLE {table_name} (\n"
+            cursor.execute(f"PRAGMA foreign_key_list('{table_name}');")
+            foreign_keys = cursor.fetchall()
+
+            table_def = f"CREATE TABLE {table_name} (\n"
             col_defs = []
             for col in columns:
                 col_def = f"    {col[1]} {col[2]}"
@@ -102,47 +429,374 @@ class SQLiteDatabase(Database):
                 if col[5]:
                     col_def += " PRIMARY KEY"
                 col_defs.append(col_def)
-            table_defs += ",\n".join(col_defs)
-            table_defs += "\n);\n\n"
+            table_def += ",\n".join(col_defs)
+            table_def += "\n);\n\n"
+
+            table_descriptions.append(
+                {
+                    "name": table_name,
+                    "columns": [
+                        {"name": col[1], "type": col[2], "comment": None}
+                        for col in columns
+                    ],
+                    "foreign_keys": [
+                        {
+                            "column": fk[3],
+                            "references_table": fk[2],
+                            "references_column": fk[4],
+                        }
+                        for fk in foreign_keys
+                    ],
+                    "comment": None,
+                    "definition": table_def,
+                }
+            )
         cursor.close()
-        return table_defs
+        return table_descriptions
+
+    def explain(self, sql: str) -> dict:
+        # SQLite's planner doesn't expose row or cost estimates, only the plan steps
+        rows = self.connection.execute(f"EXPLAIN QUERY PLAN {strip_sql(sql)}").fetchall()
+        return {
+            "plan": "\n".join(row[-1] for row in rows),
+            "estimated_rows": None,
+            "estimated_cost": None,
+        }
+
+    def interrupt(self):
+        self.connection.interrupt()
+
+    SAMPLE_BLOCKS = 20
+
+    def sample_sql(self, table_name: str, rows: int) -> str:
+        """
+        SQLite has no TABLESAMPLE, and ORDER BY random() scans and sorts the whole table.
+        Instead read SAMPLE_BLOCKS runs of consecutive rowids, one from a random point in
+        each stretch of the rowid range, so every block is an index seek.
+        """
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"SELECT min(rowid), max(rowid) FROM {table_name}")
+            low, high = cursor.fetchone()
+        except sqlite3.Error:
+            # WITHOUT ROWID tables
+            return f"SELECT * FROM {table_name} LIMIT {rows}"
+        finally:
+            cursor.close()
+        if low is None or high - low + 1 <= rows:
+            return f"SELECT * FROM {table_name} LIMIT {rows}"
+
+        blocks = min(self.SAMPLE_BLOCKS, rows)
+        block_rows = rows // blocks
+        stretch = (high - low + 1) // blocks
+        selects = []
+        for block in range(blocks):
+            start = low + block * stretch + random.randint(0, max(stretch - block_rows, 0))
+            selects.append(
+                f"SELECT * FROM (SELECT * FROM {table_name} WHERE rowid >= {start} "
+                f"ORDER BY rowid LIMIT {block_rows})"
+            )
+        return " UNION ALL ".join(selects)
 
     def execute_sql(self, sql: str) -> pd.DataFrame:
-        df = pd.read_sql_query(sql, self.connection)
+        with self.time_limit():
+            df = pd.read_sql_query(sql, self.connection)
         return df
 
 class DuckDBDatabase(Database):
     def __init__(self):
+        self.url = None
         self.connection = None
 
     def connect(self, url: str):
+        self.url = url
         self.connection = duckdb.connect(database=url)
 
-    def read_tables(self, schema: str = None) -> str:
+    def data_version(self):
+        if self.url == ":memory:":
+            return None
+        version = file_version(self.url)
+        wal_path = f"{self.url}.wal"
+        if os.path.exists(wal_path):
+            version += f":{file_version(wal_path)}"
+        return version
+
+    def describe_tables(self, schema: str = None) -> list:
         cursor = self.connection.cursor()
         cursor.execute("SHOW TABLES;")
         tables = cursor.fetchall()
 
-        table_defs = ""
+        cursor.execute(
+            """
+            SELECT table_name, constraint_column_names, referenced_table, referenced_column_names
+            FROM duckdb_constraints()
+            WHERE constraint_type = 'FOREIGN KEY'
+              AND database_name = current_database() AND schema_name = current_schema()
+            """
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(
+            """
+            SELECT table_name, column_name, comment
+            FROM duckdb_columns()
+            WHERE comment IS NOT NULL
+              AND database_name = current_database() AND schema_name = current_schema()
+            """
+        )
+        column_comments = {(row[0], row[1]): row[2] for row in cursor.fetchall()}
+        cursor.execute(
+            """
+            SELECT table_name, comment
+            FROM duckdb_tables()
+            WHERE database_name = current_database() AND schema_name = current_schema()
+            """
+        )
+        table_comments = dict(cursor.fetchall())
+
+        table_descriptions = []
         for (table_name,) in tables:
             cursor.execute(f"DESCRIBE {table_name};")
             columns = cursor.fetchall()
-            table_defs += f"CREATE TABLE {table_name} (\n"
+            table_def = f"CREATE TABLE {table_name} (\n"
             col_defs = []
             for col in columns:
                 col_def = f"    {col[0]} {col[1]}"
                 if col[3] == 'NO':
                     col_def += " NOT NULL"
                 col_defs.append(col_def)
-            table_defs += ",\n".join(col_defs)
-            table_defs += "\n);\n\n"
+            table_def += ",\n".join(col_defs)
+            table_def += "\n);\n\n"
+
+            table_descriptions.append(
+                {
+                    "name": table_name,
+                    "columns": [
+                        {
+                            "name": col[0],
+                            "type": col[1],
+                            "comment": column_comments.get((table_name, col[0])),
+                        }
+                        for col in columns
+                    ],
+                    "foreign_keys": [
+                        {
+                            "column": fk_columns[0],
+                            "references_table": referenced_table,
+                            "references_column": referenced_columns[0],
+                        }
+                        for fk_table, fk_columns, referenced_table, referenced_columns in foreign_keys
+                        if fk_table == table_name
+                    ],
+                    "comment": table_comments.get(table_name),
+                    "definition": table_def,
+                }
+            )
         cursor.close()
-        return table_defs
+        return table_descriptions
+
+    def explain(self, sql: str) -> dict:
+        rows = self.connection.execute(f"EXPLAIN (FORMAT JSON) {strip_sql(sql)}").fetchall()
+        plan = json.loads(rows[0][1])
+        return {
+            "plan": rows[0][1],
+            "estimated_rows": sum(duckdb_plan_estimate(node) for node in plan),
+            "estimated_cost": sum(duckdb_plan_cost(node) for node in plan),
+        }
+
+    def interrupt(self):
+        self.connection.interrupt()
+
+    def sample_sql(self, table_name: str, rows: int) -> str:
+        return f"SELECT * FROM {table_name} USING SAMPLE {rows} ROWS"
 
     def execute_sql(self, sql: str) -> pd.DataFrame:
-        df = self.connection.execute(sql).fetchdf()
+        with self.time_limit():
+            df = self.connection.execute(sql).fetchdf()
         return df
 
+    COPY_FORMAT_OPTIONS = {
+        ".csv": "FORMAT CSV, HEADER",
+        ".jsonl": "FORMAT JSON",
+        ".json": "FORMAT JSON, ARRAY true",
+        ".parquet": "FORMAT PARQUET",
+    }
+
+    def export_sql(self, sql: str, file_path: str, output_format: str) -> dict:
+        """
+        Export results with DuckDB's native COPY so its parallel writer does the
+        serialization instead of round-tripping through pandas.
+        """
+        options = self.COPY_FORMAT_OPTIONS.get(output_format)
+        if options is None:
+            raise ValueError(f"Invalid output format: {output_format}")
+
+        escaped_path = file_path.replace("'", "''")
+        copy_sql = f"COPY ({strip_sql(sql)}) TO '{escaped_path}' ({options})"
+
+        start_time = time.perf_counter()
+        try:
+            with self.time_limit():
+                (rows,) = self.connection.execute(copy_sql).fetchone()
+        except duckdb.ParserException:
+            # Statements that can't be nested inside COPY (e.g. multiple statements) use the pandas path
+            return super().export_sql(sql, file_path, output_format)
+        return export_stats("duckdb_copy", rows, start_time)
+
+def parse_federated_url(url: str) -> list:
+    """
+    Parse a federated URL like 'lite=./db/mock_sqlite.db,duck=./db/mock_duck.duckdb'
+    into (alias, type, location) sources. The type is inferred from each location:
+    postgres connection strings, SQLite files (.db, .sqlite, .sqlite3), otherwise DuckDB.
+    """
+    sources = []
+    for entry in url.split(","):
+        if not entry.strip():
+            continue
+        alias, separator, location = entry.partition("=")
+        if not separator or not alias.strip() or not location.strip():
+            raise ValueError(f"Invalid federated source '{entry}', expected alias=location")
+        alias, location = alias.strip(), location.strip()
+        if location.startswith(("postgres://", "postgresql://")):
+            source_type = "postgres"
+        elif os.path.splitext(location)[1].lower() in (".db", ".sqlite", ".sqlite3"):
+            source_type = "sqlite"
+        else:
+            source_type = "duckdb"
+        sources.append((alias, source_type, location))
+    if not sources:
+        raise ValueError("No sources in federated URL")
+    return sources
+
+class FederatedDatabase(DuckDBDatabase):
+    """
+    A single DuckDB session with several databases ATTACHed read-only under their own
+    alias (SQLite through the sqlite extension, Postgres through the postgres extension),
+    so queries can join across sources in one engine. Tables are named alias.table.
+    """
+
+    ATTACH_OPTIONS = {
+        "duckdb": "READ_ONLY",
+        "sqlite": "TYPE SQLITE, READ_ONLY",
+        "postgres": "TYPE POSTGRES, READ_ONLY",
+    }
+
+    def __init__(self):
+        super().__init__()
+        self.sources = []
+
+    def connect(self, url: str):
+        self.url = url
+        self.sources = parse_federated_url(url)
+        self.connection = duckdb.connect(database=":memory:")
+        for alias, source_type, location in self.sources:
+            escaped_location = location.replace("'", "''")
+            try:
+                self.connection.execute(
+                    f"ATTACH '{escaped_location}' AS \"{alias}\" ({self.ATTACH_OPTIONS[source_type]})"
+                )
+            except duckdb.Error as e:
+                self.connection.close()
+                raise ConnectionError(f"Failed to attach {source_type} source '{alias}': {e}") from e
+
+    def data_version(self):
+        # A remote Postgres source has no cheap version token, so the whole federation has none
+        if any(source_type == "postgres" for _, source_type, _ in self.sources):
+            return None
+        versions = []
+        for alias, source_type, location in self.sources:
+            version = file_version(location)
+            wal_path = f"{location}-wal" if source_type == "sqlite" else f"{location}.wal"
+            if os.path.exists(wal_path):
+                version += f":{file_version(wal_path)}"
+            versions.append(f"{alias}={version}")
+        return ",".join(versions)
+
+    def describe_tables(self, schema: str = None) -> list:
+        aliases = [alias for alias, _, _ in self.sources]
+        if schema:
+            aliases = [alias for alias in aliases if alias == schema]
+        cursor = self.connection.cursor()
+        placeholders = ", ".join("?" for _ in aliases)
+
+        cursor.execute(
+            f"""
+            SELECT database_name, schema_name, table_name, comment
+            FROM duckdb_tables()
+            WHERE database_name IN ({placeholders})
+            ORDER BY database_name, schema_name, table_name
+            """,
+            aliases,
+        )
+        tables = cursor.fetchall()
+        cursor.execute(
+            f"""
+            SELECT database_name, schema_name, table_name, constraint_column_names,
+                   referenced_table, referenced_column_names
+            FROM duckdb_constraints()
+            WHERE constraint_type = 'FOREIGN KEY' AND database_name IN ({placeholders})
+            """,
+            aliases,
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(
+            f"""
+            SELECT database_name, schema_name, table_name, column_name, comment
+            FROM duckdb_columns()
+            WHERE comment IS NOT NULL AND database_name IN ({placeholders})
+            """,
+            aliases,
+        )
+        column_comments = {tuple(row[:4]): row[4] for row in cursor.fetchall()}
+
+        def qualified_name(database_name, schema_name, table_name):
+            if schema_name == "main":
+                return f"{database_name}.{table_name}"
+            return f"{database_name}.{schema_name}.{table_name}"
+
+        table_descriptions = []
+        for database_name, schema_name, table_name, table_comment in tables:
+            name = qualified_name(database_name, schema_name, table_name)
+            cursor.execute(f'DESCRIBE "{database_name}"."{schema_name}"."{table_name}";')
+            columns = cursor.fetchall()
+            table_def = f"CREATE TABLE {name} (\n"
+            col_defs = []
+            for col in columns:
+                col_def = f"    {col[0]} {col[1]}"
+                if col[3] == 'NO':
+                    col_def += " NOT NULL"
+                col_defs.append(col_def)
+            table_def += ",\n".join(col_defs)
+            table_def += "\n);\n\n"
+
+            table_descriptions.append(
+                {
+                    "name": name,
+                    "columns": [
+                        {
+                            "name": col[0],
+                            "type": col[1],
+                            "comment": column_comments.get(
+                                (database_name, schema_name, table_name, col[0])
+                            ),
+                        }
+                        for col in columns
+                    ],
+                    "foreign_keys": [
+                        {
+                            "column": fk[3][0],
+                            "references_table": qualified_name(fk[0], fk[1], fk[4]),
+                            "references_column": fk[5][0],
+                        }
+                        for fk in foreign_keys
+                        if fk[:3] == (database_name, schema_name, table_name)
+                    ],
+                    "comment": table_comment,
+                    "definition": table_def,
+                }
+            )
+        cursor.close()
+        return table_descriptions
+
 def get_database_instance(sql_dialect: str) -> Database:
     if sql_dialect == 'postgres':
         return PostgresDatabase()
@@ -150,5 +804,7 @@ def get_database_instance(sql_dialect: str) -> Database:
         return SQLiteDatabase()
     elif sql_dialect == 'duckdb':
         return DuckDBDatabase()
+    elif sql_dialect == 'federated':
+        return FederatedDatabase()
     else:
         raise ValueError(f"Unsupported SQL dialect: {sql_dialect}")
@@ -0,0 +1,46 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, List
+from .logging import log_warning
+
+# Blocking requests made for fan-outs run here. Cancelling a request that has already started
+# can't stop its thread (the API call still completes and is billed), so the pool bounds how
+# many requests are in flight, stragglers included; requests still queued are dropped instead.
+FAN_OUT_WORKERS = int(os.getenv("FAN_OUT_WORKERS", "4"))
+fan_out_executor = ThreadPoolExecutor(max_workers=max(1, FAN_OUT_WORKERS), thread_name_prefix="fan-out")
+
+
+async def run_blocking(function: Callable, *args, **kwargs):
+    """Run a blocking request on the fan-out pool; cancelling drops it if it hasn't started yet."""
+    return await asyncio.get_running_loop().run_in_executor(
+        fan_out_executor, functools.partial(function, *args, **kwargs)
+    )
+
+
+async def first_successful(awaitables: List[Awaitable[Any]], count: int) -> List[Any]:
+    """
+    Run awaitables concurrently and return the first `count` results that aren't None, in
+    completion order. The rest are cancelled as soon as enough have succeeded; ones that raise
+    count as failures. Returns fewer results if not enough succeed. A cancelled awaitable that
+    is waiting on a thread (see run_blocking) returns at once, but its thread runs to the end.
+    """
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    results = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                result = await next_done
+            except Exception as e:
+                log_warning(f"Fan-out task failed: {e}")
+                continue
+            if result is not None:
+                results.append(result)
+                if len(results) >= count:
+                    break
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return results
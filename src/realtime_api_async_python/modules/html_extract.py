@@ -0,0 +1,369 @@
+import re
+from html import unescape
+from html.parser import HTMLParser
+from typing import List, Optional
+from urllib.parse import urljoin
+
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+DROPPED_TAGS = {
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "form", "button",
+    "select", "nav", "footer", "aside", "dialog",
+}
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "header", "ul", "ol", "li", "pre", "blockquote",
+    "table", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "hr", "figure", "figcaption", "dl", "dt", "dd",
+}
+# Opening any of these implicitly closes an open <p>, as browsers do
+P_CLOSERS = BLOCK_TAGS - {"li"}
+# Start tags that implicitly close an open element of the listed kinds, looking no further up
+# than the scope elements: a new <td> ends the open cell, a new <tr> the open row, and so on
+IMPLICIT_CLOSES = {
+    "li": ({"li"}, {"ul", "ol"}),
+    "td": ({"td", "th"}, {"tr", "table"}),
+    "th": ({"td", "th"}, {"tr", "table"}),
+    "tr": ({"tr", "td", "th"}, {"table", "tbody", "thead", "tfoot"}),
+    "tbody": ({"tbody", "thead", "tfoot", "tr", "td", "th"}, {"table"}),
+    "thead": ({"tbody", "thead", "tfoot", "tr", "td", "th"}, {"table"}),
+    "tfoot": ({"tbody", "thead", "tfoot", "tr", "td", "th"}, {"table"}),
+    "option": ({"option"}, {"select", "optgroup", "datalist"}),
+    "dt": ({"dt", "dd"}, {"dl"}),
+    "dd": ({"dt", "dd"}, {"dl"}),
+}
+# Deeper elements are flattened into their ancestor at this depth, so the tree walks, some of
+# which recurse, stay bounded on pathological pages
+MAX_DEPTH = 200
+
+# Readability's class/id heuristics
+UNLIKELY_PATTERN = re.compile(
+    r"comment|sidebar|footer|footnote|menu|nav|advert|\bad-|promo|share|social|cookie|consent"
+    r"|banner|related|popup|modal|subscribe|newsletter|breadcrumb|pagination|masthead",
+    re.IGNORECASE,
+)
+POSITIVE_PATTERN = re.compile(r"article|content|main|post|body|entry|text|story|blog", re.IGNORECASE)
+SCRIPT_REQUIRED_PATTERN = re.compile(
+    r"enable javascript|javascript is (disabled|required)|requires javascript|checking your browser",
+    re.IGNORECASE,
+)
+META_CHARSET_PATTERN = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.IGNORECASE)
+
+
+class Node:
+    __slots__ = ("tag", "attrs", "children", "parent", "depth")
+
+    def __init__(self, tag: str, attrs: dict, parent: Optional["Node"] = None):
+        self.tag = tag
+        self.attrs = attrs
+        self.children = []
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else 0
+
+    def text(self) -> str:
+        parts = []
+        stack = [self]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                parts.append(item)
+            else:
+                stack.extend(reversed(item.children))
+        return "".join(parts)
+
+    def find_all(self, tags: set) -> List["Node"]:
+        """Descendants with one of tags, in document order."""
+        found = []
+        stack = list(reversed(self.children))
+        while stack:
+            child = stack.pop()
+            if isinstance(child, Node):
+                if child.tag in tags:
+                    found.append(child)
+                stack.extend(reversed(child.children))
+        return found
+
+
+class TreeBuilder(HTMLParser):
+    """Lenient HTML to Node tree: unknown end tags are ignored, unclosed tags are closed by their parents."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("document", {})
+        self.current = self.root
+        self.title = ""
+        self.in_title = False
+        self.opened = False
+
+    def handle_starttag(self, tag, attrs):
+        self.opened = False
+        if tag == "title":
+            self.in_title = True
+            return
+        if self.current.tag == "p" and tag in P_CLOSERS:
+            self.current = self.current.parent
+        if tag in IMPLICIT_CLOSES:
+            closes, scope = IMPLICIT_CLOSES[tag]
+            node = self.current
+            closed = None
+            while node is not self.root and node.tag not in scope:
+                if node.tag in closes:
+                    closed = node
+                node = node.parent
+            if closed is not None:
+                self.current = closed.parent
+        node = Node(tag, {name: value or "" for name, value in attrs}, self.current)
+        self.current.children.append(node)
+        self.opened = tag not in VOID_TAGS and node.depth < MAX_DEPTH
+        if self.opened:
+            self.current = node
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if self.opened:
+            self.current = self.current.parent
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self.in_title = False
+            return
+        node = self.current
+        while node is not self.root and node.tag != tag:
+            node = node.parent
+        if node is not self.root:
+            self.current = node.parent
+
+    def handle_data(self, data):
+        if self.in_title:
+            self.title += data
+        else:
+            self.current.children.append(data)
+
+
+def declared_charset(content: bytes) -> Optional[str]:
+    """The charset from a <meta> tag near the start of an HTML document."""
+    match = META_CHARSET_PATTERN.search(content[:4096])
+    return match.group(1).decode("ascii") if match else None
+
+
+def prune(root: Node):
+    """Drop scripts, navigation and elements whose class or id looks like boilerplate."""
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        kept = []
+        for child in node.children:
+            if isinstance(child, Node):
+                if child.tag in DROPPED_TAGS:
+                    continue
+                hints = f"{child.attrs.get('class', '')} {child.attrs.get('id', '')}"
+                if (
+                    child.tag not in ("body", "html", "article", "main")
+                    and UNLIKELY_PATTERN.search(hints)
+                    and not POSITIVE_PATTERN.search(hints)
+                ):
+                    continue
+                if child.attrs.get("hidden") is not None or child.attrs.get("aria-hidden") == "true":
+                    continue
+                stack.append(child)
+            kept.append(child)
+        node.children = kept
+
+
+def link_density(node: Node) -> float:
+    text_length = len(node.text().strip())
+    if not text_length:
+        return 1.0
+    link_length = sum(len(link.text().strip()) for link in node.find_all({"a"}))
+    return min(link_length / text_length, 1.0)
+
+
+def main_content(root: Node) -> Node:
+    """
+    The node most likely to hold the article, scored like Readability: every paragraph adds
+    points for its length and commas to its parent and half as much to its grandparent, class
+    and id hints adjust the score, and link-heavy nodes are penalised.
+    """
+    scores = {}
+    nodes = {}
+    for paragraph in root.find_all({"p", "pre", "td", "blockquote"}):
+        text = paragraph.text().strip()
+        if len(text) < 25:
+            continue
+        points = 1 + text.count(",") + min(len(text) // 100, 3)
+        for ancestor, share in ((paragraph.parent, 1.0), (paragraph.parent and paragraph.parent.parent, 0.5)):
+            if ancestor is None or ancestor is root:
+                continue
+            if id(ancestor) not in scores:
+                hints = f"{ancestor.attrs.get('class', '')} {ancestor.attrs.get('id', '')}"
+                scores[id(ancestor)] = 25 * bool(POSITIVE_PATTERN.search(hints)) + 10 * (
+                    ancestor.tag in ("article", "main")
+                )
+                nodes[id(ancestor)] = ancestor
+            scores[id(ancestor)] += points * share
+
+    if not scores:
+        body = root.find_all({"body"})
+        return body[0] if body else root
+    best = max(nodes.values(), key=lambda node: scores[id(node)] * (1 - link_density(node)))
+    return best
+
+
+def collapse(text: str) -> str:
+    return re.sub(r"\s+", " ", text)
+
+
+class MarkdownWriter:
+    """Converts a Node tree to markdown."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+
+    def inline(self, node: Node) -> str:
+        parts = []
+        for child in node.children:
+            if isinstance(child, str):
+                parts.append(collapse(child))
+                continue
+            tag = child.tag
+            if tag == "br":
+                parts.append(" ")
+            elif tag == "img":
+                if child.attrs.get("src"):
+                    parts.append(f"![{child.attrs.get('alt', '')}]({urljoin(self.base_url, child.attrs['src'])})")
+            elif tag == "a":
+                text = self.inline(child).strip()
+                href = child.attrs.get("href", "")
+                if text and href and not href.startswith(("javascript:", "#")):
+                    parts.append(f"[{text}]({urljoin(self.base_url, href)})")
+                else:
+                    parts.append(text)
+            elif tag in ("strong", "b"):
+                text = self.inline(child).strip()
+                parts.append(f"**{text}**" if text else "")
+            elif tag in ("em", "i"):
+                text = self.inline(child).strip()
+                parts.append(f"*{text}*" if text else "")
+            elif tag == "code":
+                parts.append(f"`{child.text()}`")
+            elif tag in BLOCK_TAGS:
+                parts.append(f"\n\n{self.block(child)}\n\n")
+            else:
+                parts.append(self.inline(child))
+        return "".join(parts)
+
+    def list_items(self, node: Node, ordered: bool, depth: int) -> str:
+        lines = []
+        number = 1
+        for child in node.children:
+            if not isinstance(child, Node) or child.tag != "li":
+                continue
+            marker = f"{number}." if ordered else "-"
+            number += 1
+            nested = [c for c in child.children if isinstance(c, Node) and c.tag in ("ul", "ol")]
+            item = Node("li", {})
+            item.children = [c for c in child.children if c not in nested]
+            lines.append(f"{'  ' * depth}{marker} {collapse(self.inline(item)).strip()}")
+            for sublist in nested:
+                lines.append(self.list_items(sublist, sublist.tag == "ol", depth + 1))
+        return "\n".join(lines)
+
+    def table(self, node: Node) -> str:
+        rows = []
+        for row in node.find_all({"tr"}):
+            cells = [
+                collapse(self.inline(cell)).strip().replace("|", "\\|")
+                for cell in row.children
+                if isinstance(cell, Node) and cell.tag in ("td", "th")
+            ]
+            if cells:
+                rows.append(cells)
+        if not rows:
+            return ""
+        width = max(len(row) for row in rows)
+        rows = [row + [""] * (width - len(row)) for row in rows]
+        lines = [f"| {' | '.join(rows[0])} |", f"|{' --- |' * width}"]
+        lines.extend(f"| {' | '.join(row)} |" for row in rows[1:])
+        return "\n".join(lines)
+
+    def block(self, node: Node) -> str:
+        tag = node.tag
+        if tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+            text = collapse(self.inline(node)).strip()
+            return f"{'#' * int(tag[1])} {text}" if text else ""
+        if tag == "pre":
+            return f"```\n{node.text().strip(chr(10))}\n```"
+        if tag in ("ul", "ol"):
+            return self.list_items(node, tag == "ol", 0)
+        if tag == "table":
+            return self.table(node)
+        if tag == "hr":
+            return "---"
+        if tag == "blockquote":
+            inner = self.convert(node)
+            return "\n".join(f"> {line}" if line else ">" for line in inner.splitlines())
+        return self.convert(node) if any(
+            isinstance(child, Node) and child.tag in BLOCK_TAGS for child in node.children
+        ) else collapse(self.inline(node)).strip()
+
+    def convert(self, node: Node) -> str:
+        blocks = []
+        inline_run = Node("span", {})
+        for child in node.children + [None]:
+            if child is None or (isinstance(child, Node) and child.tag in BLOCK_TAGS):
+                text = collapse(self.inline(inline_run)).strip()
+                if text:
+                    blocks.append(text)
+                inline_run = Node("span", {})
+                if child is not None:
+                    block = self.block(child).strip()
+                    if block:
+                        blocks.append(block)
+            else:
+                inline_run.children.append(child)
+        return "\n\n".join(blocks)
+
+
+def extract_markdown(html: str, base_url: str) -> dict:
+    """
+    Markdown of the main content of an HTML page.
+
+    Returns:
+        dict: title, markdown, text_length (characters of text in the main content),
+        paragraphs and link_density of the main content, and script_required when the page
+        says it needs JavaScript.
+    """
+    builder = TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    root = builder.root
+    noscript_text = " ".join(node.text() for node in root.find_all({"noscript"}))
+    prune(root)
+
+    content = main_content(root)
+    title = collapse(unescape(builder.title)).strip()
+    markdown = MarkdownWriter(base_url).convert(content)
+    if title and not markdown.startswith("# "):
+        markdown = f"# {title}\n\n{markdown}"
+    text = collapse(content.text()).strip()
+    return {
+        "title": title,
+        "markdown": markdown,
+        "text_length": len(text),
+        "paragraphs": sum(len(p.text().strip()) >= 25 for p in content.find_all({"p", "pre", "li"})),
+        "link_density": round(link_density(content), 4),
+        # Only a sign of a client-rendered page when there's little else to read
+        "script_required": len(text) < 1000
+        and bool(SCRIPT_REQUIRED_PATTERN.search(f"{noscript_text} {text}")),
+    }
+
+
+def quality_problems(extracted: dict, min_chars: int = 500) -> List[str]:
+    """Reasons the local extraction shouldn't be trusted; empty if it looks like the page's content."""
+    problems = []
+    if extracted["script_required"]:
+        problems.append("Page needs JavaScript to render.")
+    if extracted["text_length"] < min_chars:
+        problems.append(f"Only {extracted['text_length']} characters of text (minimum {min_chars}).")
+    if extracted["paragraphs"] < 2:
+        problems.append("Fewer than two paragraphs of text.")
+    if extracted["link_density"] > 0.5:
+        problems.append(f"Mostly links (link density {extracted['link_density']}).")
+    return problems
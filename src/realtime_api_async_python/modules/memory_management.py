@@ -1,5 +1,6 @@
 import json
 import os
+from contextlib import contextmanager
 from typing import Any, Dict, Optional, List
 import xml.etree.ElementTree as ET
 from . import utils
@@ -9,6 +10,7 @@ class MemoryManager:
     def __init__(self, file_path: str):
         self.file_path = file_path
         self.memory: Dict[str, Any] = {}
+        self.transaction_depth = 0
         self.load_memory()
 
     def load_memory(self):
@@ -19,8 +21,30 @@ class MemoryManager:
             self.memory = {}
 
     def save_memory(self):
-        with open(self.file_path, "w") as file:
+        # Inside a transaction the memory is saved once, when it commits
+        if self.transaction_depth:
+            return
+        temp_path = f"{self.file_path}.tmp"
+        with open(temp_path, "w") as file:
             json.dump(self.memory, file, indent=2)
+        os.replace(temp_path, self.file_path)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group changes into one write: memory is saved once when the outermost transaction
+        ends, and restored to its previous state if the block raises.
+        """
+        snapshot = dict(self.memory)
+        self.transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self.memory = snapshot
+            raise
+        finally:
+            self.transaction_depth -= 1
+        self.save_memory()
 
     def create(self, key: str, value: Any) -> bool:
         if key not in self.memory:
@@ -57,6 +81,11 @@ class MemoryManager:
         self.save_memory()
         return True
 
+    def upsert_many(self, items: Dict[str, Any]) -> int:
+        self.memory.update(items)
+        self.save_memory()
+        return len(items)
+
     def get_xml_for_prompt(self, keys: List[str]) -> str:
 
         # reload memory from file
@@ -1,16 +1,18 @@
 # mermaid.py
 
+import asyncio
 import os
-import base64
-import requests
-from PIL import Image, UnidentifiedImageError
-import io
-from typing import Optional, List
+from typing import List, Optional
 from pydantic import BaseModel
 from dotenv import load_dotenv
 import openai
 
 from realtime_api_async_python.modules.memory_management import memory_manager
+from realtime_api_async_python.modules.mermaid_renderer import mermaid_renderer
+from realtime_api_async_python.modules.mermaid_syntax import mermaid_problems
+from realtime_api_async_python.modules.fan_out import first_successful, run_blocking
+from realtime_api_async_python.modules.logging import log_info, log_warning
+from realtime_api_async_python.modules.utils import personalization
 
 from realtime_api_async_python.modules.llm import (
     parse_markdown_backticks,
@@ -26,75 +28,21 @@ class MermaidResponse(BaseModel):
     mermaid_diagrams: List[str]
 
 
-# Helper functions
-def build_file_path(name: str):
-    scratch_pad_dir = os.getenv("SCRATCH_PAD_DIR", "./scratchpad")
-    os.makedirs(scratch_pad_dir, exist_ok=True)
-    return os.path.join(scratch_pad_dir, name)
-
-
-def build_image(graph: str, filename: str) -> Optional[Image.Image]:
-    graphbytes = graph.encode("utf8")
-    base64_bytes = base64.b64encode(graphbytes)
-    base64_string = base64_bytes.decode("ascii")
-
-    url = f"https://mermaid.ink/img/{base64_string}"
-
-    response = requests.get(url)
-    try:
-        img = Image.open(io.BytesIO(response.content))
-        return img
-    except UnidentifiedImageError:
-        print(
-            f"Error: Unable to generate image for '{filename}'. \nContent is {response.content}"
-        )
-        return None
-
-
-def mm(graph: str, filename: str) -> Optional[Image.Image]:
-    img = build_image(graph, filename)
-    if img:
-        output_path = build_file_path(filename)
-        img.save(output_path)
-        return img
-    else:
-        return None
-
-
-# Main function to generate diagrams
-async def generate_diagram(prompt: str, version_count: int = 1) -> dict:
-    """
-    Generates diagrams based on the prompt, producing multiple versions.
-
-    Args:
-        prompt (str): The prompt describing the diagram to generate.
-        version_count (int): The number of versions to generate.
-
-    Returns:
-        dict: A dictionary containing information about the generated diagrams.
-    """
-    memory_content = memory_manager.get_xml_for_prompt(["*"])
-
-    mermaid_prompt = f"""
-<purpose>
-    Generate {version_count} mermaid diagram(s) based on the user's prompt and the current memory content.
-</purpose>
-
-<instructions>
-    <instruction>For each version, create a unique mermaid diagram code that represents the user's prompt.</instruction>
-    <instruction>Generate a suitable 'base_name' for the filenames based on the user's prompt. Use lowercase letters, numbers, and underscores only.</instruction>
-    <instruction>Only provide the 'base_name' and the list of mermaid diagram codes in a dictionary format, without any additional text or formatting.</instruction>
-    <instruction>Consider the current memory content when generating the diagrams, if relevant.</instruction>
-    <instructions>Refer to the examples to understand the format of the mermaid diagrams.</instructions>
-</instructions>
+class MermaidVersionResponse(BaseModel):
+    base_name: str
+    mermaid_diagram: str
 
-<user_prompt>
-    {prompt}
-</user_prompt>
 
-{memory_content}
+# Steers each fan-out request towards a different take on the same prompt
+DIVERSITY_HINTS = [
+    "Use the most conventional diagram type and layout for the request.",
+    "Use a different layout direction or grouping than the most obvious one.",
+    "Keep it minimal: as few nodes and labels as the request allows.",
+    "Be more detailed: add intermediate steps and descriptive labels.",
+    "Use a different diagram type than the most obvious one, if another one fits the request.",
+]
 
-<examples>
+MERMAID_EXAMPLES = """<examples>
     <example>
         <user-chart-request>
             Create a flowchart that shows A flowing to E. At C, branch out to H and I.
@@ -170,7 +118,118 @@ async def generate_diagram(prompt: str, version_count: int = 1) -> dict:
                 line [5000, 6000, 7500, 8200, 9500, 10500, 11000, 10200, 9200, 8500, 7000, 6000]
         </chart-response>
     </example>
-</examples>
+</examples>"""
+
+
+# Helper functions
+def build_file_path(name: str):
+    scratch_pad_dir = os.getenv("SCRATCH_PAD_DIR", "./scratchpad")
+    os.makedirs(scratch_pad_dir, exist_ok=True)
+    return os.path.join(scratch_pad_dir, name)
+
+
+def save_diagram(base_name: str, version: int, mermaid_code: str, image: bytes) -> dict:
+    """Save the rendered PNG as-is, and the mermaid code next to it."""
+    image_file_path = build_file_path(f"diagram_{base_name}_{version}.png")
+    with open(image_file_path, "wb") as f:
+        f.write(image)
+    text_file_path = build_file_path(f"diagram_text_{base_name}_{version}.md")
+    with open(text_file_path, "w") as f:
+        f.write(mermaid_code)
+    return {
+        "version": version,
+        "image_file": image_file_path,
+        "text_file": text_file_path,
+        "mermaid_code": mermaid_code,
+    }
+
+
+async def render_checked(mermaid_code: str) -> Optional[bytes]:
+    """Render mermaid_code unless the local syntax check already rejects it."""
+    problems = mermaid_problems(mermaid_code)
+    if problems:
+        log_warning(f"Skipping invalid mermaid diagram: {' '.join(problems)}")
+        return None
+    return await mermaid_renderer.render(mermaid_code)
+
+
+async def generate_version(prompt: str, memory_content: str, hint: str) -> Optional[tuple]:
+    """One independently generated diagram as (base_name, mermaid_code, image), or None if it failed."""
+    version_prompt = f"""
+<purpose>
+    Generate one mermaid diagram based on the user's prompt and the current memory content.
+</purpose>
+
+<instructions>
+    <instruction>Create mermaid diagram code that represents the user's prompt.</instruction>
+    <instruction>{hint}</instruction>
+    <instruction>Generate a suitable 'base_name' for the filenames based on the user's prompt. Use lowercase letters, numbers, and underscores only.</instruction>
+    <instruction>Only provide the 'base_name' and the mermaid diagram code, without any additional text or formatting.</instruction>
+    <instruction>Consider the current memory content when generating the diagram, if relevant.</instruction>
+    <instructions>Refer to the examples to understand the format of the mermaid diagrams.</instructions>
+</instructions>
+
+<user_prompt>
+    {prompt}
+</user_prompt>
+
+{memory_content}
+
+{MERMAID_EXAMPLES}
+"""
+    response = await run_blocking(structured_output_prompt, version_prompt, MermaidVersionResponse)
+    mermaid_code = parse_markdown_backticks(response.mermaid_diagram)
+    image = await render_checked(mermaid_code)
+    if image is None:
+        return None
+    return response.base_name, mermaid_code, image
+
+
+async def generate_fan_out(prompt: str, version_count: int, memory_content: str) -> List[dict]:
+    """
+    Generate versions with independent, concurrent requests (plus spares for ones that fail)
+    and keep the first version_count that render; the remaining requests are cancelled, though
+    ones already sent still complete in the background (see fan_out.run_blocking).
+    """
+    attempts = version_count + personalization.get("diagram_fan_out_spares", 1)
+    versions = await first_successful(
+        [
+            generate_version(prompt, memory_content, DIVERSITY_HINTS[i % len(DIVERSITY_HINTS)])
+            for i in range(attempts)
+        ],
+        version_count,
+    )
+    if not versions:
+        return []
+    base_name = versions[0][0]
+    return [
+        save_diagram(base_name, i + 1, mermaid_code, image)
+        for i, (_, mermaid_code, image) in enumerate(versions)
+    ]
+
+
+async def generate_batch(prompt: str, version_count: int, memory_content: str) -> List[dict]:
+    """Generate every version with a single structured-output request."""
+    mermaid_prompt = f"""
+<purpose>
+    Generate {version_count} mermaid diagram(s) based on the user's prompt and the current memory content.
+</purpose>
+
+<instructions>
+    <instruction>For each version, create a unique mermaid diagram code that represents the user's prompt.</instruction>
+    <instruction>Generate a suitable 'base_name' for the filenames based on the user's prompt. Use lowercase letters, numbers, and underscores only.</instruction>
+    <instruction>Only provide the 'base_name' and the list of mermaid diagram codes in a dictionary format, without any additional text or formatting.</instruction>
+    <instruction>Consider the current memory content when generating the diagrams, if relevant.</instruction>
+    <instructions>Refer to the examples to understand the format of the mermaid diagrams.</instructions>
+</instructions>
+
+<user_prompt>
+    {prompt}
+</user_prompt>
+
+{memory_content}
+
+{MERMAID_EXAMPLES}
 """
 
     response = structured_output_prompt(mermaid_prompt, MermaidResponse)
@@ -178,36 +237,37 @@ async def generate_diagram(prompt: str, version_count: int = 1) -> dict:
 
     print("response", response)
 
-    diagrams_info = []
-    successful_count = 0
-    failed_count = 0
-
-    for i, mermaid_code in enumerate(response.mermaid_diagrams):
-        image_filename = f"diagram_{base_name}_{i+1}.png"
-        text_filename = f"diagram_text_{base_name}_{i+1}.md"
-
-        mermaid_code = parse_markdown_backticks(mermaid_code)
-
-        img = mm(mermaid_code, image_filename)
-
-        if img:
-            # Save the mermaid code to a text file
-            text_file_path = build_file_path(text_filename)
-            with open(text_file_path, "w") as f:
-                f.write(mermaid_code)
-
-            successful_count += 1
-            diagrams_info.append(
-                {
-                    "version": i + 1,
-                    "image_file": build_file_path(image_filename),
-                    "text_file": text_file_path,
-                    "mermaid_code": mermaid_code,
-                }
-            )
-        else:
-            failed_count += 1
-            continue
+    mermaid_codes = [parse_markdown_backticks(code) for code in response.mermaid_diagrams]
+    images = await asyncio.gather(*(render_checked(code) for code in mermaid_codes))
+    return [
+        save_diagram(base_name, i + 1, mermaid_code, image)
+        for i, (mermaid_code, image) in enumerate(zip(mermaid_codes, images))
+        if image is not None
+    ]
+
+
+# Main function to generate diagrams
+async def generate_diagram(prompt: str, version_count: int = 1) -> dict:
+    """
+    Generates diagrams based on the prompt, producing multiple versions.
+
+    Args:
+        prompt (str): The prompt describing the diagram to generate.
+        version_count (int): The number of versions to generate.
+
+    Returns:
+        dict: A dictionary containing information about the generated diagrams.
+    """
+    memory_content = memory_manager.get_xml_for_prompt(["*"])
+
+    # Fan-out is opt-in: it makes version_count + diagram_fan_out_spares requests per call
+    if personalization.get("diagram_fan_out", False):
+        diagrams_info = await generate_fan_out(prompt, version_count, memory_content)
+    else:
+        diagrams_info = await generate_batch(prompt, version_count, memory_content)
+    successful_count = len(diagrams_info)
+    failed_count = max(version_count - successful_count, 0)
+    log_info(f"Generated {successful_count} of {version_count} diagram(s)", style="dim")
 
     if successful_count > 0:
         message = f"Generated {successful_count} diagram(s)"
@@ -0,0 +1,93 @@
+import asyncio
+import base64
+import hashlib
+import os
+import tempfile
+from typing import List, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from .logging import log_info, log_warning
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Point at a self-hosted mermaid.ink (or any server with the same /img/<base64> API) to render offline
+MERMAID_RENDER_URL = os.getenv("MERMAID_RENDER_URL", "https://mermaid.ink/img/")
+MERMAID_RENDER_CONCURRENCY = int(os.getenv("MERMAID_RENDER_CONCURRENCY", "4"))
+MERMAID_RENDER_TIMEOUT_SECONDS = float(os.getenv("MERMAID_RENDER_TIMEOUT_SECONDS", "30"))
+
+
+class MermaidRenderer:
+    """
+    Renders mermaid source to PNG bytes over one keep-alive session, at most `concurrency`
+    renders at a time. Rendered images are cached on disk by a hash of the endpoint and source.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        base_url: str = MERMAID_RENDER_URL,
+        concurrency: int = MERMAID_RENDER_CONCURRENCY,
+        timeout: float = MERMAID_RENDER_TIMEOUT_SECONDS,
+    ):
+        self.cache_dir = cache_dir
+        self.base_url = base_url if base_url.endswith("/") else f"{base_url}/"
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def image_url(self, graph: str) -> str:
+        encoded = base64.urlsafe_b64encode(graph.encode("utf-8")).decode("ascii")
+        return f"{self.base_url}{encoded}?type=png"
+
+    def cache_path(self, graph: str) -> str:
+        digest = hashlib.sha256(f"{self.base_url}\n{graph}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.png")
+
+    def render_sync(self, graph: str) -> Optional[bytes]:
+        """PNG bytes for graph, or None if the renderer rejected it."""
+        cache_path = self.cache_path(graph)
+        if os.path.exists(cache_path):
+            with open(cache_path, "rb") as file:
+                return file.read()
+
+        try:
+            response = self.session.get(self.image_url(graph), timeout=self.timeout)
+        except requests.RequestException as e:
+            log_warning(f"Mermaid render request failed: {e}")
+            return None
+        if response.status_code != 200 or not response.content.startswith(PNG_SIGNATURE):
+            log_warning(
+                f"Mermaid renderer returned {response.status_code}: {response.content[:200]!r}"
+            )
+            return None
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # A unique temp name, so concurrent renders of the same graph never move each other's file
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(response.content)
+            os.replace(temp_path, cache_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        log_info(f"Rendered mermaid diagram ({len(response.content)} bytes)", style="dim")
+        return response.content
+
+    async def render(self, graph: str) -> Optional[bytes]:
+        async with self.semaphore:
+            return await asyncio.to_thread(self.render_sync, graph)
+
+    async def render_all(self, graphs: List[str]) -> List[Optional[bytes]]:
+        return await asyncio.gather(*(self.render(graph) for graph in graphs))
+
+    def close(self):
+        self.session.close()
+
+
+mermaid_renderer = MermaidRenderer(
+    os.path.join(os.getenv("SCRATCH_PAD_DIR", "./scratchpad"), ".cache", "mermaid")
+)
@@ -0,0 +1,99 @@
+import re
+from typing import List
+
+# First keyword of every diagram type mermaid.ink renders
+DIAGRAM_TYPES = {
+    "graph",
+    "flowchart",
+    "sequenceDiagram",
+    "classDiagram",
+    "classDiagram-v2",
+    "stateDiagram",
+    "stateDiagram-v2",
+    "erDiagram",
+    "journey",
+    "gantt",
+    "pie",
+    "quadrantChart",
+    "requirementDiagram",
+    "gitGraph",
+    "C4Context",
+    "C4Container",
+    "C4Component",
+    "C4Dynamic",
+    "C4Deployment",
+    "mindmap",
+    "timeline",
+    "sankey-beta",
+    "xychart-beta",
+    "block-beta",
+    "packet-beta",
+    "architecture-beta",
+}
+FLOWCHART_DIRECTIONS = {"TB", "TD", "BT", "RL", "LR"}
+PIE_SLICE_PATTERN = re.compile(r'^\s*"[^"]*"\s*:\s*-?\d+(\.\d+)?\s*$')
+ASYMMETRIC_NODE_PATTERN = re.compile(r"(?<=\w)>[^\[\]]*\]")
+BRACKET_PAIRS = {")": "(", "]": "[", "}": "{"}
+
+
+def diagram_lines(mermaid_code: str) -> List[str]:
+    """Non-empty lines, without %% comments and the front-matter / init blocks."""
+    lines = []
+    in_front_matter = False
+    for line in mermaid_code.splitlines():
+        stripped = line.strip()
+        if stripped == "---" and not lines:
+            in_front_matter = not in_front_matter
+            continue
+        if in_front_matter or not stripped or stripped.startswith("%%"):
+            continue
+        lines.append(stripped)
+    return lines
+
+
+def unbalanced(line: str) -> bool:
+    """Whether the brackets or double quotes of a line don't pair up (quoted text is skipped)."""
+    if line.count('"') % 2:
+        return True
+    stack = []
+    # Asymmetric nodes (id>text]) are the one shape whose brackets don't pair
+    for char in ASYMMETRIC_NODE_PATTERN.sub("", re.sub(r'"[^"]*"', "", line)):
+        if char in "([{":
+            stack.append(char)
+        elif char in BRACKET_PAIRS:
+            if not stack or stack.pop() != BRACKET_PAIRS[char]:
+                return True
+    return bool(stack)
+
+
+def mermaid_problems(mermaid_code: str) -> List[str]:
+    """
+    Cheap checks that catch diagrams mermaid would reject, before sending them to the renderer:
+    a known diagram type, a valid flowchart direction, well-formed pie slices and balanced
+    brackets and quotes. An empty list doesn't guarantee the diagram renders.
+    """
+    if "```" in mermaid_code:
+        return ["Diagram still contains markdown code fences."]
+    lines = diagram_lines(mermaid_code)
+    if not lines:
+        return ["Diagram is empty."]
+
+    header = lines[0].rstrip(";").split()
+    diagram_type = header[0]
+    if diagram_type not in DIAGRAM_TYPES:
+        return [f"Unknown diagram type '{diagram_type}'."]
+    if len(lines) == 1:
+        return ["Diagram has no content after its header."]
+
+    problems = []
+    if diagram_type in ("graph", "flowchart") and len(header) > 1 and header[1] not in FLOWCHART_DIRECTIONS:
+        problems.append(f"Unknown flowchart direction '{header[1]}'.")
+    if diagram_type == "pie":
+        for line in lines[1:]:
+            if line.startswith(("title", "showData")) or PIE_SLICE_PATTERN.match(line):
+                continue
+            problems.append(f"Invalid pie slice: {line}")
+    # Other diagram types open blocks across lines or use braces in relationships (||--o{)
+    if diagram_type in ("graph", "flowchart"):
+        problems.extend(f"Unbalanced brackets or quotes: {line}" for line in lines[1:] if unbalanced(line))
+    return problems
@@ -0,0 +1,228 @@
+import mmap
+import os
+import re
+from typing import Iterator, List, Optional
+
+# Lines per page, and the most text a single read returns; smaller files are read whole by default
+FILE_PAGE_LINES = int(os.getenv("FILE_PAGE_LINES", "200"))
+FILE_PAGE_MAX_KB = int(os.getenv("FILE_PAGE_MAX_KB", "64"))
+
+COUNT_CHUNK_BYTES = 1024 * 1024
+
+
+class PagedFile:
+    """
+    Line-addressed, read-only view of a file through mmap. Only the requested ranges are
+    decoded, so head, tail, pages and search windows of large files cost no more memory than
+    the text they return.
+    """
+
+    def __init__(self, file_path: str, max_bytes: int = FILE_PAGE_MAX_KB * 1024):
+        self.file_path = file_path
+        self.max_bytes = max_bytes
+        self.file = open(file_path, "rb")
+        self.size = os.fstat(self.file.fileno()).st_size
+        # mmap can't map empty files
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        self.total_lines = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def count_newlines(self, start: int, end: int) -> int:
+        return sum(
+            self.data[offset : min(offset + COUNT_CHUNK_BYTES, end)].count(b"\n")
+            for offset in range(start, end, COUNT_CHUNK_BYTES)
+        )
+
+    def line_count(self) -> int:
+        if self.total_lines is None:
+            newlines = self.count_newlines(0, self.size)
+            unterminated = self.size and self.data[self.size - 1 : self.size] != b"\n"
+            self.total_lines = newlines + bool(unterminated)
+        return self.total_lines
+
+    def line_start(self, line: int) -> int:
+        """Byte offset of 0-based line (the file size if the file has fewer lines)."""
+        offset = 0
+        for _ in range(line):
+            newline = self.data.find(b"\n", offset)
+            if newline == -1:
+                return self.size
+            offset = newline + 1
+        return offset
+
+    def decode(self, start: int, end: int) -> dict:
+        truncated = end - start > self.max_bytes
+        end = min(end, start + self.max_bytes)
+        return {
+            "text": bytes(self.data[start:end]).decode("utf-8", errors="replace"),
+            "truncated": truncated,
+        }
+
+    def lines(self, start_line: int, count: int) -> dict:
+        """count lines from 1-based start_line."""
+        start_line = max(start_line, 1)
+        start = self.line_start(start_line - 1)
+        end = start
+        read = 0
+        while read < count and end < self.size:
+            newline = self.data.find(b"\n", end)
+            end = self.size if newline == -1 else newline + 1
+            read += 1
+        return {"start_line": start_line, "end_line": start_line + read - 1, **self.decode(start, end)}
+
+    def iter_lines(self) -> Iterator[str]:
+        """Every line of the file with its line ending, decoded one at a time."""
+        offset = 0
+        while offset < self.size:
+            newline = self.data.find(b"\n", offset)
+            end = self.size if newline == -1 else newline + 1
+            yield bytes(self.data[offset:end]).decode("utf-8", errors="replace")
+            offset = end
+
+    def head(self, count: int) -> dict:
+        return self.lines(1, count)
+
+    def tail(self, count: int) -> dict:
+        """The last count lines, found by scanning back from the end."""
+        total_lines = self.line_count()
+        count = min(max(count, 0), total_lines)
+        start = self.size
+        # The final newline ends the last line rather than starting an empty one
+        search_end = self.size - 1 if self.data[self.size - 1 : self.size] == b"\n" else self.size
+        for _ in range(count):
+            newline = self.data.rfind(b"\n", 0, search_end)
+            start = newline + 1
+            search_end = newline
+        truncated = self.size - start > self.max_bytes
+        # Too long to return whole: keep the end rather than the start
+        start = max(start, self.size - self.max_bytes)
+        return {
+            "start_line": total_lines - count + 1,
+            "end_line": total_lines,
+            "text": bytes(self.data[start : self.size]).decode("utf-8", errors="replace"),
+            "truncated": truncated,
+        }
+
+    def page(self, number: int, page_lines: int = FILE_PAGE_LINES) -> dict:
+        """1-based page of page_lines lines, with the page count."""
+        total_pages = max((self.line_count() + page_lines - 1) // page_lines, 1)
+        number = min(max(number, 1), total_pages)
+        return {"page": number, "total_pages": total_pages, **self.lines((number - 1) * page_lines + 1, page_lines)}
+
+    def search(self, pattern: str, context: int = 2, max_matches: int = 20) -> List[dict]:
+        """
+        Windows of `context` lines around lines matching pattern (a case-insensitive regex, or
+        literal text if it isn't a valid regex). Overlapping windows are merged, and the search
+        stops after max_matches matching lines.
+        """
+        try:
+            regex = re.compile(pattern.encode("utf-8"), re.IGNORECASE | re.MULTILINE)
+        except re.error:
+            regex = re.compile(re.escape(pattern.encode("utf-8")), re.IGNORECASE)
+
+        windows = []
+        matches = 0
+        line = 1
+        counted_to = 0
+        last_line_start = -1
+        for match in regex.finditer(self.data):
+            line_start = self.data.rfind(b"\n", 0, match.start()) + 1
+            if line_start == last_line_start:
+                continue
+            last_line_start = line_start
+            line += self.count_newlines(counted_to, line_start)
+            counted_to = line_start
+            first = max(line - context, 1)
+            last = line + context
+            if windows and first <= windows[-1]["last"] + 1:
+                windows[-1]["last"] = last
+                windows[-1]["match_lines"].append(line)
+            else:
+                windows.append({"first": first, "last": last, "match_lines": [line]})
+            matches += 1
+            if matches == max_matches:
+                break
+
+        results = []
+        for window in windows:
+            lines = self.lines(window["first"], window["last"] - window["first"] + 1)
+            results.append({**lines, "match_lines": window["match_lines"]})
+        return results
+
+
+def read_file_slice(
+    file_path: str,
+    page: Optional[int] = None,
+    pattern: Optional[str] = None,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+    page_lines: int = FILE_PAGE_LINES,
+    max_bytes: int = FILE_PAGE_MAX_KB * 1024,
+) -> dict:
+    """
+    The part of a file a tool asked for: lines matching pattern, a line range, or a page. With
+    none of these, files up to max_bytes are returned whole and larger ones as their first page.
+
+    Returns:
+        dict: content, a human-readable description of the range, and the slice details
+        (lines, pages, match lines, truncated) for the tool response.
+    """
+    with PagedFile(file_path, max_bytes) as paged:
+        if pattern:
+            windows = paged.search(pattern)
+            if not windows:
+                return {"content": "", "range": f"no lines match '{pattern}'", "matches": 0}
+            content = "\n...\n".join(
+                f"[lines {window['start_line']}-{window['end_line']}]\n{window['text'].rstrip(chr(10))}"
+                for window in windows
+            )
+            match_lines = [line for window in windows for line in window["match_lines"]]
+            return {
+                "content": content,
+                "range": f"{len(match_lines)} line(s) matching '{pattern}'",
+                "matches": len(match_lines),
+                "match_lines": match_lines,
+            }
+
+        if start_line is not None or end_line is not None:
+            if start_line is not None and start_line < 0:
+                result = paged.tail(-start_line)
+            else:
+                first = start_line or 1
+                last = end_line if end_line is not None else first + page_lines - 1
+                result = paged.lines(first, max(last - first + 1, 0))
+            return {
+                "content": result["text"],
+                "range": f"lines {result['start_line']}-{result['end_line']} of {paged.line_count()}",
+                "start_line": result["start_line"],
+                "end_line": result["end_line"],
+                "total_lines": paged.line_count(),
+                "truncated": result["truncated"],
+            }
+
+        if page is None and paged.size <= max_bytes:
+            return {
+                "content": paged.decode(0, paged.size)["text"],
+                "range": "whole file",
+                "truncated": False,
+            }
+
+        result = paged.page(page or 1, page_lines)
+        return {
+            "content": result["text"],
+            "range": f"page {result['page']} of {result['total_pages']} (lines {result['start_line']}-{result['end_line']})",
+            "page": result["page"],
+            "total_pages": result["total_pages"],
+            "total_lines": paged.line_count(),
+            "truncated": result["truncated"],
+        }
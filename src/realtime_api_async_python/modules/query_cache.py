@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Matches single-quoted string literals and double-quoted identifiers so they keep their case
+QUOTED_SQL_PATTERN = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")""")
+
+# Reserved result files older than this are leftovers of a crashed export
+STALE_TEMP_SECONDS = 3600
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Collapse whitespace and lowercase everything outside of quoted literals and identifiers,
+    so trivially different spellings of the same query share a cache entry.
+    """
+    parts = QUOTED_SQL_PATTERN.split(sql.strip().rstrip(";").strip())
+    normalized = []
+    for i, part in enumerate(parts):
+        if i % 2 == 1:
+            normalized.append(part)
+        else:
+            normalized.append(re.sub(r"\s+", " ", part).lower())
+    return "".join(normalized).strip()
+
+
+class QueryCache:
+    """
+    Caches query results as parquet files keyed by normalized SQL and a data-version token.
+
+    Entries whose backend can't report a data version (e.g. Postgres) are only cached when
+    ttl_seconds is set, and expire after that many seconds. The cache evicts least recently
+    used entries once it grows beyond max_bytes. It is shared by the database lanes, so the
+    index is only touched under a lock.
+    """
+
+    def __init__(
+        self, cache_dir: str, max_bytes: int, ttl_seconds: Optional[float] = None
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.index: Dict[str, Any] = {"entries": {}, "hits": 0, "misses": 0}
+        self.lock = threading.RLock()
+        self.load_index()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def load_index(self):
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r") as file:
+                self.index = json.load(file)
+
+    def save_index(self):
+        with self.lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{self.index_path}.tmp"
+            with open(temp_path, "w") as file:
+                json.dump(self.index, file, indent=2)
+            os.replace(temp_path, self.index_path)
+
+    def cacheable(self, data_version: Optional[str]) -> bool:
+        return self.enabled and (data_version is not None or self.ttl_seconds is not None)
+
+    def key(self, namespace: str, sql: str, data_version: Optional[str]) -> str:
+        raw = f"{namespace}\n{data_version or 'ttl'}\n{normalize_sql(sql)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.parquet")
+
+    def get(self, namespace: str, sql: str, data_version: Optional[str]) -> Optional[str]:
+        """Return the parquet path of a cached result, or None on a miss."""
+        if not self.cacheable(data_version):
+            return None
+
+        key = self.key(namespace, sql, data_version)
+        path = self.path_for(key)
+        with self.lock:
+            entry = self.index["entries"].get(key)
+            expired = (
+                entry is not None
+                and data_version is None
+                and time.time() - entry["created"] > self.ttl_seconds
+            )
+
+            if entry is None or expired or not os.path.exists(path):
+                if entry is not None:
+                    self.remove(key)
+                self.index["misses"] += 1
+                self.save_index()
+                return None
+
+            entry["last_access"] = time.time()
+            self.index["hits"] += 1
+            self.save_index()
+            return path
+
+    def reserve(self, namespace: str, sql: str, data_version: Optional[str]) -> Optional[str]:
+        """
+        Return a temporary path a new result should be written to, or None if it shouldn't be
+        cached. Pass it to put() once the result is complete, or to discard() if writing failed.
+        """
+        if not self.cacheable(data_version):
+            return None
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".parquet.tmp")
+        os.close(fd)
+        return temp_path
+
+    def put(self, namespace: str, sql: str, data_version: Optional[str], temp_path: str) -> str:
+        """Move a result written to a reserved path into the cache and evict old entries if needed."""
+        key = self.key(namespace, sql, data_version)
+        path = self.path_for(key)
+        with self.lock:
+            os.replace(temp_path, path)
+            now = time.time()
+            self.index["entries"][key] = {
+                "size": os.path.getsize(path),
+                "created": now,
+                "last_access": now,
+                "sql": normalize_sql(sql),
+            }
+            self.evict()
+            self.save_index()
+        return path
+
+    def discard(self, temp_path: str):
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    def remove(self, key: str):
+        with self.lock:
+            self.index["entries"].pop(key, None)
+            path = self.path_for(key)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def evict(self):
+        with self.lock:
+            # Results left half-written by a process that died before put() or discard()
+            for file_name in os.listdir(self.cache_dir):
+                path = os.path.join(self.cache_dir, file_name)
+                if file_name.endswith(".parquet.tmp"):
+                    try:
+                        if time.time() - os.path.getmtime(path) > STALE_TEMP_SECONDS:
+                            os.remove(path)
+                    except OSError:
+                        pass
+            entries = self.index["entries"]
+            total = sum(entry["size"] for entry in entries.values())
+            for key in sorted(entries, key=lambda k: entries[k]["last_access"]):
+                if total <= self.max_bytes:
+                    break
+                total -= entries[key]["size"]
+                self.remove(key)
+
+    def report(self) -> dict:
+        with self.lock:
+            hits = self.index["hits"]
+            misses = self.index["misses"]
+            lookups = hits + misses
+            return {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self.index["entries"]),
+                "bytes": sum(entry["size"] for entry in self.index["entries"].values()),
+            }
+
+
+# Initialize the QueryCache inside the scratch pad directory
+query_cache_ttl = os.getenv("QUERY_CACHE_TTL_SECONDS")
+query_cache = QueryCache(
+    os.path.join(os.getenv("SCRATCH_PAD_DIR", "./scratchpad"), ".cache", "query_results"),
+    max_bytes=int(float(os.getenv("QUERY_CACHE_MAX_MB", "256")) * 1024 * 1024),
+    ttl_seconds=float(query_cache_ttl) if query_cache_ttl else None,
+)
@@ -0,0 +1,129 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional
+from .database import DuckDBDatabase, strip_sql
+from .scratchpad_views import SCAN_FUNCTIONS
+
+RESULT_TABLE_PATTERN = re.compile(r"\bresult_(\d+)\b", re.IGNORECASE)
+
+# Results with more rows aren't kept: the workspace lives in memory and is only a convenience
+QUERY_WORKSPACE_MAX_ROWS = int(os.getenv("QUERY_WORKSPACE_MAX_ROWS", "100000"))
+
+
+class QueryWorkspace:
+    """
+    Session-scoped DuckDB workspace where each query result is materialized as a temp
+    table (result_1, result_2, ...), so follow-up questions can refine a small earlier
+    result instead of re-querying the base tables. Only the newest max_results tables
+    are kept, and results over max_rows rows are skipped.
+    """
+
+    def __init__(self, max_results: int = 10, max_rows: int = QUERY_WORKSPACE_MAX_ROWS):
+        self.max_results = max_results
+        self.max_rows = max_rows
+        self.database: Optional[DuckDBDatabase] = None
+        self.results = OrderedDict()  # table name -> rows, columns, sql, description
+        self.counter = 0
+        # The workspace connection is shared by tool calls running on different threads
+        self.lock = threading.RLock()
+
+    def connect(self) -> DuckDBDatabase:
+        with self.lock:
+            if self.database is None:
+                self.database = DuckDBDatabase()
+                self.database.connect(":memory:")
+            return self.database
+
+    def locked(self, function, *args, **kwargs):
+        """Call function(*args, **kwargs) holding the lock, for callers that use the connection directly."""
+        with self.lock:
+            return function(*args, **kwargs)
+
+    def references(self, sql: str) -> bool:
+        """Whether sql reads any of the workspace's result tables."""
+        return any(
+            f"result_{number}" in self.results for number in RESULT_TABLE_PATTERN.findall(sql)
+        )
+
+    def add_query(self, sql: str, description: str) -> Optional[str]:
+        """Materialize the result of a query over earlier results as the next result table."""
+        return self.materialize(strip_sql(sql), description, sql)
+
+    def add_file(self, file_path: str, description: str, source_sql: str) -> Optional[str]:
+        """
+        Materialize an exported result file (parquet from the query cache, or the CSV/JSON
+        export itself) without re-running the query against the source.
+        """
+        escaped_path = file_path.replace("'", "''")
+        scan_function = SCAN_FUNCTIONS[os.path.splitext(file_path)[1].lower()]
+        return self.materialize(
+            f"SELECT * FROM {scan_function}('{escaped_path}')", description, source_sql
+        )
+
+    def materialize(self, select_sql: str, description: str, source_sql: str) -> Optional[str]:
+        """The new result table's name, or None if the result has more than max_rows rows."""
+        with self.lock:
+            database = self.connect()
+            name = f"result_{self.counter + 1}"
+            # One row over the budget is enough to tell the result is too large
+            database.connection.execute(
+                f"CREATE TEMP TABLE {name} AS SELECT * FROM ({select_sql}) LIMIT {self.max_rows + 1}"
+            )
+            (rows,) = database.connection.execute(f"SELECT count(*) FROM {name}").fetchone()
+            if rows > self.max_rows:
+                database.connection.execute(f"DROP TABLE {name}")
+                return None
+            self.counter += 1
+            columns = [row[0] for row in database.connection.execute(f"DESCRIBE {name}").fetchall()]
+            self.results[name] = {
+                "rows": rows,
+                "columns": columns,
+                "sql": strip_sql(source_sql),
+                "description": description,
+            }
+            self.evict()
+            return name
+
+    def evict(self):
+        while len(self.results) > self.max_results:
+            name, _ = self.results.popitem(last=False)
+            self.database.connection.execute(f"DROP TABLE IF EXISTS {name}")
+
+    def table_definitions(self) -> str:
+        """CREATE TABLE definitions of the result tables, for SQL generation prompts."""
+        with self.lock:
+            if not self.results:
+                return ""
+            definitions = []
+            for name, result in self.results.items():
+                columns = self.database.connection.execute(f"DESCRIBE {name}").fetchall()
+                column_definitions = ",\n".join(f"    {col[0]} {col[1]}" for col in columns)
+                definitions.append(
+                    f"-- {result['description']} ({result['rows']} rows)\n"
+                    f"CREATE TEMP TABLE {name} (\n{column_definitions}\n);\n\n"
+                )
+            return "".join(definitions)
+
+    def catalog(self) -> str:
+        """One short line per result table, compact enough to keep in active memory."""
+        with self.lock:
+            lines = []
+            for name, result in self.results.items():
+                columns = ", ".join(result["columns"][:6])
+                if len(result["columns"]) > 6:
+                    columns += ", ..."
+                lines.append(f"{name}: {result['rows']} rows ({columns}) - {result['description'][:80]}")
+            return "\n".join(lines)
+
+    def reset(self):
+        with self.lock:
+            if self.database is not None:
+                self.database.connection.close()
+            self.database = None
+            self.results.clear()
+            self.counter = 0
+
+
+query_workspace = QueryWorkspace()
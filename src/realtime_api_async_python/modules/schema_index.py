@@ -0,0 +1,145 @@
+import hashlib
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+from .database import Database
+
+# Weights for where a prompt term matched: table names count most, comments least
+TABLE_NAME_WEIGHT = 3.0
+COLUMN_NAME_WEIGHT = 1.0
+COMMENT_WEIGHT = 0.5
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase terms, breaking up camelCase and snake_case identifiers
+    and reducing simple plurals so 'users' matches 'UserID'.
+    """
+    text = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", text or "")
+    terms = []
+    for term in re.findall(r"[a-z0-9]+", text.lower()):
+        if len(term) > 4 and term.endswith("ies"):
+            term = term[:-3] + "y"
+        elif len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+            term = term[:-1]
+        if len(term) > 1:
+            terms.append(term)
+    return terms
+
+
+class SchemaIndex:
+    """
+    Keyword index over table names, column names and comments used to pick the tables
+    relevant to a prompt, so SQL generation prompts don't carry the full schema.
+    """
+
+    def __init__(self, tables: List[dict], data_version: Optional[str] = None):
+        self.tables = {table["name"]: table for table in tables}
+        self.data_version = data_version
+        self.terms: Dict[str, Counter] = {}
+        for table in tables:
+            weights = Counter()
+            for term in tokenize(table["name"]):
+                weights[term] += TABLE_NAME_WEIGHT
+            for term in tokenize(table.get("comment")):
+                weights[term] += COMMENT_WEIGHT
+            for column in table["columns"]:
+                for term in tokenize(column["name"]):
+                    weights[term] += COLUMN_NAME_WEIGHT
+                for term in tokenize(column.get("comment")):
+                    weights[term] += COMMENT_WEIGHT
+            self.terms[table["name"]] = weights
+
+        document_frequency = Counter()
+        for weights in self.terms.values():
+            document_frequency.update(weights.keys())
+        table_count = len(tables)
+        self.idf = {
+            term: math.log(1 + table_count / count)
+            for term, count in document_frequency.items()
+        }
+
+    def neighbours(self, table_name: str) -> List[str]:
+        """Tables joined to table_name by a foreign key in either direction."""
+        linked = [
+            fk["references_table"] for fk in self.tables[table_name]["foreign_keys"]
+        ]
+        linked += [
+            name
+            for name, table in self.tables.items()
+            if any(fk["references_table"] == table_name for fk in table["foreign_keys"])
+        ]
+        return [name for name in dict.fromkeys(linked) if name in self.tables]
+
+    def search(self, prompt: str, top_k: int) -> List[str]:
+        """
+        Return the top_k tables most relevant to the prompt plus their foreign-key neighbours,
+        in schema order. Returns every table when nothing in the prompt matches.
+        """
+        prompt_terms = set(tokenize(prompt))
+        scores = {
+            name: sum(weights[term] * self.idf[term] for term in prompt_terms if term in weights)
+            for name, weights in self.terms.items()
+        }
+        ranked = [
+            name
+            for name, score in sorted(scores.items(), key=lambda item: -item[1])
+            if score > 0
+        ][:top_k]
+        if not ranked:
+            return list(self.tables)
+
+        selected = set(ranked)
+        for name in ranked:
+            selected.update(self.neighbours(name))
+        return [name for name in self.tables if name in selected]
+
+    def render(self, table_names: List[str]) -> str:
+        return "".join(self.tables[name]["definition"] for name in table_names)
+
+    def relevant_tables(self, prompt: str, top_k: int) -> List[str]:
+        """Tables to include in a prompt; small schemas are always included in full."""
+        if len(self.tables) <= top_k:
+            return list(self.tables)
+        return self.search(prompt, top_k)
+
+    def table_definitions_for_prompt(self, prompt: str, top_k: int) -> str:
+        return self.render(self.relevant_tables(prompt, top_k))
+
+    def to_dict(self) -> dict:
+        return {"data_version": self.data_version, "tables": list(self.tables.values())}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SchemaIndex":
+        return cls(data["tables"], data.get("data_version"))
+
+
+def schema_cache_path(cache_dir: str, namespace: str, suffix: str = "schema") -> str:
+    digest = hashlib.sha256(namespace.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{digest}_{suffix}.json")
+
+
+def load_schema_index(database: Database, namespace: str, cache_dir: str) -> SchemaIndex:
+    """
+    Load the schema index from the cache when the database's data version is unchanged,
+    otherwise introspect the database and refresh the cache. Backends without a data
+    version are introspected every time.
+    """
+    data_version = database.data_version()
+    cache_path = schema_cache_path(cache_dir, namespace)
+
+    if data_version is not None and os.path.exists(cache_path):
+        with open(cache_path, "r") as file:
+            cached = json.load(file)
+        if cached.get("data_version") == data_version:
+            return SchemaIndex.from_dict(cached)
+
+    index = SchemaIndex(database.describe_tables(), data_version)
+    if data_version is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(cache_path, "w") as file:
+            json.dump(index.to_dict(), file, indent=2)
+    return index
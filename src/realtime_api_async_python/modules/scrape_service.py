@@ -0,0 +1,291 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import statistics
+import tempfile
+import threading
+import time
+from typing import Callable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import requests
+from firecrawl import FirecrawlApp
+from requests.adapters import HTTPAdapter
+from .html_extract import declared_charset, extract_markdown, quality_problems
+from .logging import log_info, log_warning
+
+SCRAPE_CACHE_TTL_SECONDS = float(os.getenv("SCRAPE_CACHE_TTL_SECONDS", "3600"))
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", "4"))
+SCRAPE_TIMEOUT_SECONDS = float(os.getenv("SCRAPE_TIMEOUT_SECONDS", "30"))
+# Extract static pages locally and only send the rest to Firecrawl
+SCRAPE_LOCAL_EXTRACTION = os.getenv("SCRAPE_LOCAL_EXTRACTION", "true").lower() in ("1", "true", "yes")
+SCRAPE_LOCAL_MIN_CHARS = int(os.getenv("SCRAPE_LOCAL_MIN_CHARS", "500"))
+SCRAPE_LOCAL_MAX_BYTES = 5 * 1024 * 1024
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+URL_PATTERN = re.compile(r"https?://[^\s<>\"'`]+")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of url for cache keys: lowercase scheme and host, no default port, no
+    fragment, sorted query parameters and "/" for an empty path.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+def extract_urls(text: str) -> List[str]:
+    """Every http(s) URL in text, in order, without duplicates or trailing punctuation."""
+    urls = {}
+    for match in URL_PATTERN.findall(text):
+        url = match.rstrip(".,;:!?)]}")
+        urls.setdefault(normalize_url(url), url)
+    return list(urls.values())
+
+
+class ScrapeService:
+    """
+    Scrapes pages to markdown and caches the result by normalized URL. Static HTML pages are
+    fetched and extracted locally when the extraction passes a quality check; everything else
+    goes to one shared Firecrawl client. Entries are fresh for ttl_seconds; after that, a
+    conditional request to the page (If-None-Match / If-Modified-Since) renews them without a
+    new scrape when the page hasn't changed. At most `concurrency` scrapes run at once.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        ttl_seconds: float = SCRAPE_CACHE_TTL_SECONDS,
+        concurrency: int = SCRAPE_CONCURRENCY,
+        timeout: float = SCRAPE_TIMEOUT_SECONDS,
+        scraper: Optional[Callable[[str], str]] = None,
+        local_extraction: bool = SCRAPE_LOCAL_EXTRACTION,
+        min_chars: int = SCRAPE_LOCAL_MIN_CHARS,
+    ):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.timeout = timeout
+        self.local_extraction = local_extraction
+        self.min_chars = min_chars
+        self.scraper = scraper or self.scrape_with_firecrawl
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.client = None
+        self.client_lock = threading.Lock()
+        self.latencies = {"cache": [], "local": [], "firecrawl": []}
+        self.latencies_lock = threading.Lock()
+
+    def firecrawl_client(self):
+        """The Firecrawl client, created on first use and shared by every scrape."""
+        with self.client_lock:
+            if self.client is None:
+                api_key = os.getenv("FIRECRAWL_API_KEY")
+                if not api_key:
+                    raise ValueError("FIRECRAWL_API_KEY environment variable not set")
+                self.client = FirecrawlApp(api_key=api_key)
+            return self.client
+
+    def scrape_with_firecrawl(self, url: str) -> str:
+        return self.firecrawl_client().scrape_url(url, params={"formats": ["markdown"]})["markdown"]
+
+    def cache_path(self, url: str) -> str:
+        digest = hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def load_entry(self, url: str) -> Optional[dict]:
+        cache_path = self.cache_path(url)
+        if not os.path.exists(cache_path):
+            return None
+        with open(cache_path, "r") as file:
+            return json.load(file)
+
+    def save_entry(self, url: str, entry: dict):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        cache_path = self.cache_path(url)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(entry, file)
+            os.replace(temp_path, cache_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def fetch(self, url: str) -> Optional[dict]:
+        """
+        GET the page for its status, ETag and Last-Modified, and its HTML when local extraction
+        is on and the page is HTML of at most SCRAPE_LOCAL_MAX_BYTES. None if the request failed.
+        """
+        try:
+            with self.session.get(url, timeout=self.timeout, stream=True) as response:
+                content_type = response.headers.get("Content-Type", "")
+                page = {
+                    "url": response.url,
+                    "status": response.status_code,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "html": None,
+                }
+                media_type = content_type.split(";")[0].strip().lower()
+                if (
+                    not self.local_extraction
+                    or response.status_code != 200
+                    or media_type not in HTML_CONTENT_TYPES
+                ):
+                    return page
+                body = b""
+                for chunk in response.iter_content(64 * 1024):
+                    body += chunk
+                    if len(body) > SCRAPE_LOCAL_MAX_BYTES:
+                        return page
+        except requests.RequestException:
+            return None
+
+        encoding = response.encoding if "charset" in content_type.lower() else declared_charset(body)
+        try:
+            page["html"] = body.decode(encoding or "utf-8", errors="replace")
+        except LookupError:
+            page["html"] = body.decode("utf-8", errors="replace")
+        return page
+
+    def unchanged(self, url: str, entry: dict) -> bool:
+        """Whether the page answers a conditional request for the cached version with 304."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        if not headers:
+            return False
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+            response.close()
+        except requests.RequestException:
+            return False
+        return response.status_code == 304
+
+    def record(self, path: str, duration: float):
+        with self.latencies_lock:
+            self.latencies[path].append(duration)
+
+    def stats(self) -> dict:
+        """Scrape count and median / max latency in seconds for each path (cache, local, firecrawl)."""
+        with self.latencies_lock:
+            return {
+                path: {
+                    "count": len(durations),
+                    "median": round(statistics.median(durations), 4) if durations else None,
+                    "max": round(max(durations), 4) if durations else None,
+                }
+                for path, durations in self.latencies.items()
+            }
+
+    def scrape_sync(self, url: str) -> dict:
+        """
+        Markdown content of url, from the cache when it is still fresh or the page is unchanged,
+        otherwise extracted locally or scraped with Firecrawl.
+
+        Returns:
+            dict: url, content, cache ("fresh", "revalidated" or "miss"), path ("cache", "local"
+            or "firecrawl"), duration and the timings of each step in seconds.
+        """
+        start_time = time.perf_counter()
+        entry = self.load_entry(url)
+        if entry is not None:
+            cache = None
+            if time.time() - entry["fetched_at"] < self.ttl_seconds:
+                cache = "fresh"
+            elif self.unchanged(url, entry):
+                entry["fetched_at"] = time.time()
+                self.save_entry(url, entry)
+                cache = "revalidated"
+            if cache:
+                duration = time.perf_counter() - start_time
+                self.record("cache", duration)
+                return {
+                    "url": url,
+                    "content": entry["content"],
+                    "cache": cache,
+                    "path": "cache",
+                    "duration": round(duration, 4),
+                    "timings": {},
+                }
+
+        timings = {}
+        page = self.fetch(url) or {}
+        timings["fetch"] = time.perf_counter() - start_time
+        content, path = None, "firecrawl"
+        if page.get("html") is not None:
+            extract_start = time.perf_counter()
+            try:
+                extracted = extract_markdown(page["html"], page["url"])
+                problems = quality_problems(extracted, self.min_chars)
+            except Exception as e:
+                # A page the local extractor can't handle is still worth a Firecrawl scrape
+                problems = [f"Extraction failed: {e!r}"]
+            timings["extract"] = time.perf_counter() - extract_start
+            if problems:
+                log_info(
+                    f"Local extraction of {url} falls back to Firecrawl: {' '.join(problems)}",
+                    style="dim",
+                )
+            else:
+                content, path = extracted["markdown"], "local"
+        if content is None:
+            firecrawl_start = time.perf_counter()
+            content = self.scraper(url)
+            timings["firecrawl"] = time.perf_counter() - firecrawl_start
+
+        self.save_entry(
+            url,
+            {
+                "url": url,
+                "fetched_at": time.time(),
+                "content": content,
+                "etag": page.get("etag"),
+                "last_modified": page.get("last_modified"),
+            },
+        )
+        duration = time.perf_counter() - start_time
+        self.record(path, duration)
+        log_info(f"Scraped {url} via {path} in {duration:.2f}s", style="dim")
+        return {
+            "url": url,
+            "content": content,
+            "cache": "miss",
+            "path": path,
+            "duration": round(duration, 4),
+            "timings": {step: round(seconds, 4) for step, seconds in timings.items()},
+        }
+
+    async def scrape(self, url: str) -> dict:
+        async with self.semaphore:
+            return await asyncio.to_thread(self.scrape_sync, url)
+
+    async def scrape_many(self, urls: List[str]) -> List[dict]:
+        """Scrape urls concurrently; a URL that fails gets an "error" instead of "content"."""
+        results = await asyncio.gather(*(self.scrape(url) for url in urls), return_exceptions=True)
+        for i, result in enumerate(results):
+            if isinstance(result, Exception):
+                log_warning(f"Failed to scrape {urls[i]}: {result}")
+                results[i] = {"url": urls[i], "error": str(result)}
+        return results
+
+    def close(self):
+        self.session.close()
+
+
+scrape_service = ScrapeService(
+    os.path.join(os.getenv("SCRATCH_PAD_DIR", "./scratchpad"), ".cache", "scrapes")
+)
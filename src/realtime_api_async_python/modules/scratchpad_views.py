@@ -0,0 +1,166 @@
+import asyncio
+import os
+import re
+from typing import Dict
+from .async_database import AsyncDatabase
+from .database import DuckDBDatabase, file_version
+
+# Identifiers in a query, quoted or bare, used to find the views it reads
+IDENTIFIER_PATTERN = re.compile(r'"((?:[^"]|"")+)"|\b([A-Za-z_]\w*)\b')
+
+# DuckDB table functions used to scan each tabular file type in place
+SCAN_FUNCTIONS = {
+    ".csv": "read_csv_auto",
+    ".tsv": "read_csv_auto",
+    ".parquet": "read_parquet",
+    ".jsonl": "read_json_auto",
+    ".json": "read_json_auto",
+}
+
+
+def view_name_for_file(file_name: str) -> str:
+    """Turn a scratchpad file name into a SQL identifier, e.g. 'user analytics.csv' -> 'user_analytics'."""
+    stem = os.path.splitext(file_name)[0]
+    name = re.sub(r"\W+", "_", stem).strip("_").lower() or "file"
+    if name[0].isdigit():
+        name = f"file_{name}"
+    return name
+
+
+class ScratchpadDatabase(DuckDBDatabase):
+    """
+    In-memory DuckDB session exposing every tabular scratchpad file as a view, so SQL
+    runs directly over the files with DuckDB's parallel scanners instead of loading
+    them into pandas. Views are refreshed when files are added, changed or removed.
+    """
+
+    def __init__(self, scratch_pad_dir: str):
+        super().__init__()
+        self.scratch_pad_dir = scratch_pad_dir
+        self.views = {}  # view name -> {"file": file name, "version": file version}
+
+    def connect(self, url: str = ":memory:"):
+        super().connect(url)
+        self.views = {}
+        self.refresh()
+
+    def tabular_files(self) -> dict:
+        """Map of file name -> file version for every tabular file in the scratchpad."""
+        if not os.path.isdir(self.scratch_pad_dir):
+            return {}
+        files = {}
+        for file_name in sorted(os.listdir(self.scratch_pad_dir)):
+            file_path = os.path.join(self.scratch_pad_dir, file_name)
+            extension = os.path.splitext(file_name)[1].lower()
+            if extension in SCAN_FUNCTIONS and os.path.isfile(file_path):
+                files[file_name] = file_version(file_path)
+        return files
+
+    def refresh(self) -> dict:
+        """
+        Sync the views with the scratchpad: create views for new files, recreate views whose
+        file changed (the column types are sniffed when the view is created) and drop views
+        whose file is gone.
+
+        Returns:
+            dict: The view names that were created, updated and dropped.
+        """
+        files = self.tabular_files()
+        changes = {"created": [], "updated": [], "dropped": []}
+
+        current = {view["file"]: name for name, view in self.views.items()}
+        for file_name, name in current.items():
+            if file_name not in files:
+                self.connection.execute(f'DROP VIEW IF EXISTS "{name}"')
+                del self.views[name]
+                changes["dropped"].append(name)
+
+        for file_name, version in files.items():
+            name = current.get(file_name)
+            if name is not None and self.views[name]["version"] == version:
+                continue
+            if name is None:
+                name = view_name_for_file(file_name)
+                if name in self.views:
+                    # e.g. users.csv and users.parquet: keep both, suffixed by extension
+                    name = f"{name}_{os.path.splitext(file_name)[1][1:].lower()}"
+            try:
+                self.create_view(name, file_name)
+            except Exception:
+                # Files DuckDB can't parse (e.g. a .json that isn't tabular) are skipped
+                if name in self.views:
+                    self.connection.execute(f'DROP VIEW IF EXISTS "{name}"')
+                    del self.views[name]
+                continue
+            changes["updated" if name in self.views else "created"].append(name)
+            self.views[name] = {"file": file_name, "version": version}
+
+        return changes
+
+    def create_view(self, name: str, file_name: str):
+        file_path = os.path.join(self.scratch_pad_dir, file_name).replace("'", "''")
+        scan_function = SCAN_FUNCTIONS[os.path.splitext(file_name)[1].lower()]
+        self.connection.execute(
+            f"CREATE OR REPLACE VIEW \"{name}\" AS SELECT * FROM {scan_function}('{file_path}')"
+        )
+
+    def data_version(self):
+        """Versions of the files behind the views, so cached results follow the files."""
+        return ",".join(
+            f"{name}={view['version']}" for name, view in sorted(self.views.items())
+        )
+
+    def query_version(self, sql: str):
+        """
+        Versions of the files behind the views sql reads. Other files, such as the results
+        query_scratchpad writes into the scratchpad, don't invalidate its cached results.
+        """
+        identifiers = {
+            (quoted.replace('""', '"') if quoted else bare).lower()
+            for quoted, bare in IDENTIFIER_PATTERN.findall(sql)
+        }
+        views = sorted(name for name in self.views if name in identifiers)
+        if not views:
+            return self.data_version()
+        return ",".join(f"{name}={self.views[name]['version']}" for name in views)
+
+    def view_files(self) -> dict:
+        """Map of view name -> scratchpad file name."""
+        return {name: view["file"] for name, view in self.views.items()}
+
+    def describe_tables(self, schema: str = None) -> list:
+        tables = super().describe_tables(schema)
+        for table in tables:
+            view = self.views.get(table["name"])
+            if view:
+                table["comment"] = f"View over scratchpad file '{view['file']}'"
+                table["definition"] = f"-- {table['comment']}\n{table['definition']}"
+        return tables
+
+
+# One session per scratchpad directory, so each query only refreshes the views whose files changed
+scratchpad_sessions: Dict[str, AsyncDatabase] = {}
+scratchpad_sessions_lock = asyncio.Lock()
+
+
+async def open_scratchpad(scratch_pad_dir: str) -> AsyncDatabase:
+    """
+    Return the scratchpad's session, connecting it on first use and refreshing its views
+    otherwise. The session stays open for later queries; every call runs on its lane.
+    """
+    key = os.path.abspath(scratch_pad_dir)
+    async with scratchpad_sessions_lock:
+        session = scratchpad_sessions.get(key)
+        if session is None:
+            session = AsyncDatabase(ScratchpadDatabase(scratch_pad_dir), "duckdb")
+            try:
+                await session.connect(":memory:")
+            except BaseException:
+                await session.close()
+                raise
+            scratchpad_sessions[key] = session
+        else:
+            # Spans cover the current query rather than the session's lifetime
+            session.spans.clear()
+            await session.run(session.database.refresh)
+    return session
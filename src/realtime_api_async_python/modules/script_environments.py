@@ -0,0 +1,227 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import tomllib
+from typing import List, Optional
+from .logging import log_info, log_warning
+from .script_runner import ScriptResult, run_command
+
+# Inline script metadata (PEP 723); such scripts need their own environment
+SCRIPT_METADATA_PATTERN = re.compile(
+    r"(?m)^# /// (?P<type>[a-zA-Z0-9-]+)$\s(?P<content>(^#(| .*)$\s)+)^# ///$"
+)
+REQUIREMENT_NAME_PATTERN = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(.*)$")
+
+SCRIPT_ENV_CACHE_MAX_MB = int(os.getenv("SCRIPT_ENV_CACHE_MAX_MB", "2048"))
+SCRIPT_ENV_BUILD_TIMEOUT_SECONDS = float(os.getenv("SCRIPT_ENV_BUILD_TIMEOUT_SECONDS", "600"))
+# Set to only ever install from the local wheel cache / find-links directory
+SCRIPT_ENV_OFFLINE = os.getenv("SCRIPT_ENV_OFFLINE", "").lower() in ("1", "true", "yes")
+SCRIPT_ENV_FIND_LINKS = os.getenv("SCRIPT_ENV_FIND_LINKS", "")
+
+
+def script_metadata(python_code: str) -> Optional[dict]:
+    """
+    The parsed `# /// script` block of python_code, or None if it has none. Raises
+    tomllib.TOMLDecodeError when the block isn't valid TOML.
+    """
+    for match in SCRIPT_METADATA_PATTERN.finditer(python_code):
+        if match.group("type") == "script":
+            content = "".join(
+                line[2:] if line.startswith("# ") else line[1:]
+                for line in match.group("content").splitlines(keepends=True)
+            )
+            return tomllib.loads(content)
+    return None
+
+
+def declares_dependencies(python_code: str) -> bool:
+    return any(
+        match.group("type") == "script" for match in SCRIPT_METADATA_PATTERN.finditer(python_code)
+    )
+
+
+def normalize_requirement(requirement: str) -> str:
+    """Canonical form of a requirement: PEP 503 name, lowercase, no whitespace."""
+    match = REQUIREMENT_NAME_PATTERN.match(requirement)
+    if not match:
+        return requirement.strip()
+    name, rest = match.groups()
+    return re.sub(r"[-_.]+", "-", name).lower() + re.sub(r"\s+", "", rest).lower()
+
+
+def environment_key(metadata: dict) -> str:
+    """Key of the environment for a script's metadata; ordering and spelling don't matter."""
+    dependencies = sorted({normalize_requirement(d) for d in metadata.get("dependencies", [])})
+    normalized = {
+        "dependencies": dependencies,
+        "requires-python": re.sub(r"\s+", "", metadata.get("requires-python", "")),
+        "platform": sys.platform,
+    }
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def directory_size(path: str, unshared: bool = False) -> int:
+    """
+    Bytes used under path, counting each inode once since uv hardlinks installed files
+    from its wheel cache. With unshared, only files with no other links are counted,
+    i.e. what removing path would free.
+    """
+    size = 0
+    seen = set()
+    for root, _, files in os.walk(path):
+        for file in files:
+            try:
+                stat = os.lstat(os.path.join(root, file))
+            except OSError:
+                continue
+            if unshared and stat.st_nlink > 1:
+                continue
+            if (stat.st_dev, stat.st_ino) not in seen:
+                seen.add((stat.st_dev, stat.st_ino))
+                size += stat.st_size
+    return size
+
+
+class ScriptEnvironmentCache:
+    """
+    Virtual environments for scripts with inline dependency metadata, built once per
+    normalized dependency set and reused, so repeat runs skip uv's resolution entirely.
+    Wheels are kept in a local uv cache so rebuilds after eviction can run offline.
+    Least recently used environments are evicted to stay within max_mb.
+    """
+
+    def __init__(self, cache_dir: str, max_mb: int = SCRIPT_ENV_CACHE_MAX_MB):
+        # Absolute, since scripts run with their own working directory
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_mb = max_mb
+        self.environments_dir = os.path.join(self.cache_dir, "environments")
+        self.wheel_cache_dir = os.path.join(self.cache_dir, "uv")
+
+    def environment_path(self, key: str) -> str:
+        return os.path.join(self.environments_dir, key)
+
+    def python_path(self, key: str) -> str:
+        return os.path.join(self.environment_path(key), "bin", "python")
+
+    def uv_command(self, *args: str, offline: bool) -> List[str]:
+        command = ["uv", *args, "--cache-dir", self.wheel_cache_dir]
+        if offline:
+            command.append("--offline")
+        if SCRIPT_ENV_FIND_LINKS:
+            command += ["--find-links", SCRIPT_ENV_FIND_LINKS]
+        return command
+
+    async def build(self, key: str, metadata: dict) -> Optional[ScriptResult]:
+        """
+        Build the environment for key, trying the local wheel cache before the network.
+        Returns the failing step's result, or None once the environment is in place.
+        """
+        os.makedirs(self.environments_dir, exist_ok=True)
+        build_dir = tempfile.mkdtemp(prefix=f".{key}-", dir=self.environments_dir)
+        python_path = os.path.join(build_dir, "bin", "python")
+        dependencies = metadata.get("dependencies", [])
+        limits = {
+            "timeout": SCRIPT_ENV_BUILD_TIMEOUT_SECONDS,
+            "cpu_seconds": None,
+            "memory_limit_mb": None,
+        }
+        try:
+            venv_command = ["venv", build_dir, "--relocatable", "--quiet"]
+            if metadata.get("requires-python"):
+                venv_command += ["--python", metadata["requires-python"]]
+            result = await run_command(self.uv_command(*venv_command, offline=False), **limits)
+            if not result.success:
+                return result
+
+            if dependencies:
+                install = ["pip", "install", "--python", python_path, "--quiet", *dependencies]
+                result = await run_command(self.uv_command(*install, offline=True), **limits)
+                if not result.success and not SCRIPT_ENV_OFFLINE:
+                    # Something isn't in the wheel cache yet
+                    result = await run_command(self.uv_command(*install, offline=False), **limits)
+                if not result.success:
+                    return result
+
+            with open(os.path.join(build_dir, "environment.json"), "w") as f:
+                json.dump(
+                    {"dependencies": dependencies, "requires-python": metadata.get("requires-python")},
+                    f,
+                )
+            try:
+                os.rename(build_dir, self.environment_path(key))
+            except OSError:
+                # Built concurrently by another run; use that one
+                pass
+            log_info(f"📦 Built script environment {key}: {', '.join(dependencies)}", style="dim")
+            return None
+        finally:
+            shutil.rmtree(build_dir, ignore_errors=True)
+
+    def touch(self, key: str):
+        os.utime(self.environment_path(key))
+
+    def evict(self, keep: str):
+        """
+        Keep the whole cache (environments and uv's wheel cache) within max_mb: remove least
+        recently used environments, then the wheel cache if that isn't enough.
+        """
+        max_bytes = self.max_mb * 1024 * 1024
+        total = directory_size(self.cache_dir)
+        if total <= max_bytes:
+            return
+        entries = []
+        if os.path.isdir(self.environments_dir):
+            for key in os.listdir(self.environments_dir):
+                path = self.environment_path(key)
+                if key.startswith(".") or not os.path.isdir(path) or key == keep:
+                    continue
+                entries.append((os.path.getmtime(path), key, directory_size(path, unshared=True)))
+        for _, key, size in sorted(entries):
+            shutil.rmtree(self.environment_path(key), ignore_errors=True)
+            total -= size
+            if total <= max_bytes:
+                return
+
+        if SCRIPT_ENV_OFFLINE:
+            # Offline builds can only install from the wheel cache
+            log_warning(f"⚠️ Script environment cache is over {self.max_mb} MB")
+        elif os.path.isdir(self.wheel_cache_dir):
+            # Wheels are downloaded again when an environment needs them
+            shutil.rmtree(self.wheel_cache_dir, ignore_errors=True)
+            log_info(f"🧹 Cleared the script wheel cache to stay within {self.max_mb} MB", style="dim")
+
+    async def run(self, python_code: str, cwd: Optional[str] = None, **limits) -> ScriptResult:
+        """Run a script with inline metadata in its cached environment, building it if needed."""
+        try:
+            metadata = script_metadata(python_code) or {}
+        except tomllib.TOMLDecodeError as e:
+            return ScriptResult(
+                exit_code=1,
+                stdout="",
+                stderr=f"Invalid `# /// script` metadata block: {e}\n",
+                duration=0.0,
+            )
+        key = environment_key(metadata)
+        if not os.path.exists(self.python_path(key)):
+            failure = await self.build(key, metadata)
+            if failure is not None:
+                return failure
+            self.evict(keep=key)
+        self.touch(key)
+
+        with tempfile.NamedTemporaryFile(suffix=".py", delete=False) as temp_file:
+            temp_file.write(python_code.encode("utf-8"))
+            temp_file_path = temp_file.name
+        try:
+            return await run_command([self.python_path(key), temp_file_path], cwd=cwd, **limits)
+        finally:
+            os.remove(temp_file_path)
+
+
+script_environments = ScriptEnvironmentCache(
+    os.path.join(os.getenv("SCRATCH_PAD_DIR", "./scratchpad"), ".cache", "script_envs")
+)
@@ -0,0 +1,60 @@
+"""
+Launcher for scripts run by script_runner.run_command.
+
+Started as `python script_launcher.py <report fd> <cpu seconds> <memory MB> <program> [args...]`,
+it applies the CPU and address-space rlimits to itself, spawns the program (which inherits
+them), waits for it and exits the same way it did. The program's peak RSS, from wait4(), is
+written as JSON to the report fd unless it is -1. A program of "-" runs this interpreter.
+
+The assistant is heavily multi-threaded, where a preexec_fn can deadlock the child between
+fork and exec; this small single-threaded process sets the limits instead. This file runs
+outside the package, so it only uses the standard library.
+"""
+
+import sys
+
+# Started as a script, so sys.path[0] is modules/, whose logging.py would shadow the
+# standard library for everything imported from here on
+sys.path.pop(0)
+
+import json
+import os
+import resource
+import signal
+
+
+def main():
+    report_fd, cpu_seconds, memory_limit_mb = (int(arg) for arg in sys.argv[1:4])
+    command = sys.argv[4:]
+    if command[0] == "-":
+        command[0] = sys.executable
+    if report_fd >= 0:
+        os.set_inheritable(report_fd, False)
+
+    if cpu_seconds > 0:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    if memory_limit_mb > 0:
+        memory_bytes = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+
+    try:
+        pid = os.posix_spawnp(command[0], command, os.environ)
+    except OSError as e:
+        print(f"{command[0]}: {e}", file=sys.stderr)
+        sys.exit(127)
+    _, status, usage = os.wait4(pid, 0)
+
+    if report_fd >= 0:
+        os.write(report_fd, json.dumps({"max_rss": usage.ru_maxrss}).encode("utf-8"))
+        os.close(report_fd)
+
+    if os.WIFSIGNALED(status):
+        # Die of the same signal (without a core file) so the caller sees how the program ended
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+        signal.signal(os.WTERMSIG(status), signal.SIG_DFL)
+        os.kill(os.getpid(), os.WTERMSIG(status))
+    sys.exit(os.waitstatus_to_exitcode(status))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import List, Optional
+from .logging import log_info, log_warning
+from .script_environments import declares_dependencies, script_environments
+from .script_runner import (
+    SCRIPT_CPU_SECONDS,
+    SCRIPT_MAX_OUTPUT_KB,
+    SCRIPT_MEMORY_LIMIT_MB,
+    SCRIPT_TIMEOUT_SECONDS,
+    ScriptResult,
+    kill_process_group,
+    read_capped_sync,
+    run_uv_script,
+    supervise,
+)
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "script_worker.py")
+
+SCRIPT_WORKERS = int(os.getenv("SCRIPT_WORKERS", "2"))
+SCRIPT_WORKER_MAX_RUNS = int(os.getenv("SCRIPT_WORKER_MAX_RUNS", "50"))
+SCRIPT_WORKER_PRELOAD = os.getenv(
+    "SCRIPT_WORKER_PRELOAD", "numpy,pandas,matplotlib,matplotlib.pyplot"
+).split(",")
+
+# SOCK_SEQPACKET keeps message boundaries and reports EOF when the pool goes away
+SOCKET_TYPE = getattr(socket, "SOCK_SEQPACKET", socket.SOCK_DGRAM)
+
+
+class ScriptWorker:
+    """
+    A warm interpreter (see script_worker.py) with the preload modules imported. Each run
+    is forked from it, so it starts in milliseconds with a fresh namespace. Methods block
+    and are called from worker threads.
+    """
+
+    def __init__(self, preload: List[str]):
+        self.preload = preload
+        self.process: Optional[subprocess.Popen] = None
+        self.control: Optional[socket.socket] = None
+        self.runs = 0
+
+    def start(self):
+        control, worker_end = socket.socketpair(socket.AF_UNIX, SOCKET_TYPE)
+        self.process = subprocess.Popen(
+            [sys.executable, WORKER_SCRIPT, str(worker_end.fileno()), ",".join(self.preload)],
+            pass_fds=[worker_end.fileno()],
+            stdin=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        worker_end.close()
+        self.control = control
+        ready = self.receive()
+        log_info(f"🐍 Script worker {self.process.pid} ready in {ready['startup']}s", style="dim")
+
+    def receive(self) -> dict:
+        message = self.control.recv(4096)
+        if not message:
+            raise ConnectionError("Script worker exited unexpectedly.")
+        return json.loads(message)
+
+    def submit(self, request: dict, stdout_fd: int, stderr_fd: int) -> int:
+        """Send a run request with the output pipes and return the pid of the forked run."""
+        socket.send_fds(self.control, [json.dumps(request).encode("utf-8")], [stdout_fd, stderr_fd])
+        return self.receive()["pid"]
+
+    def wait(self) -> tuple:
+        result = self.receive()
+        self.runs += 1
+        return os.waitstatus_to_exitcode(result["status"]), result["max_rss"]
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def worn_out(self, max_runs: int) -> bool:
+        # Runs execute in forked children, so the worker itself doesn't grow with them; it is
+        # recycled after max_runs to bound anything that does accumulate (e.g. leaked fds)
+        return self.runs >= max_runs
+
+    def close(self):
+        if self.control is not None:
+            self.control.close()
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+
+
+class ScriptWorkerPool:
+    """
+    Bounded pool of warm script workers. Workers are started on demand (or ahead of time
+    with start()), and recycled after max_runs runs.
+    """
+
+    def __init__(
+        self,
+        size: int = SCRIPT_WORKERS,
+        max_runs: int = SCRIPT_WORKER_MAX_RUNS,
+        preload: List[str] = SCRIPT_WORKER_PRELOAD,
+    ):
+        self.size = size
+        self.max_runs = max_runs
+        self.preload = preload
+        self.idle: List[ScriptWorker] = []
+        self.lock = threading.Lock()
+        self.slots = asyncio.Semaphore(max(1, size))
+
+    async def start(self):
+        """Warm up the idle workers so the first scripts don't pay for the imports."""
+        missing = self.size - len(self.idle)
+        workers = [ScriptWorker(self.preload) for _ in range(max(0, missing))]
+        results = await asyncio.gather(
+            *(asyncio.to_thread(worker.start) for worker in workers), return_exceptions=True
+        )
+        with self.lock:
+            for worker, result in zip(workers, results):
+                if isinstance(result, Exception):
+                    log_warning(f"⚠️ Failed to start script worker: {result}")
+                    worker.close()
+                else:
+                    self.idle.append(worker)
+
+    async def acquire(self) -> ScriptWorker:
+        await self.slots.acquire()
+        try:
+            with self.lock:
+                while self.idle:
+                    worker = self.idle.pop()
+                    if worker.alive():
+                        return worker
+                    worker.close()
+            worker = ScriptWorker(self.preload)
+            await asyncio.to_thread(worker.start)
+            return worker
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def release(self, worker: ScriptWorker, reusable: bool = True):
+        reusable = (
+            reusable and worker.alive() and not worker.worn_out(self.max_runs)
+        )
+        with self.lock:
+            if reusable and len(self.idle) < self.size:
+                self.idle.append(worker)
+                worker = None
+        if worker is not None:
+            worker.close()
+        self.slots.release()
+
+    async def run_script(
+        self,
+        script_path: str,
+        cwd: str,
+        timeout: Optional[float] = SCRIPT_TIMEOUT_SECONDS,
+        cpu_seconds: Optional[int] = SCRIPT_CPU_SECONDS,
+        memory_limit_mb: Optional[int] = SCRIPT_MEMORY_LIMIT_MB,
+        max_output_kb: int = SCRIPT_MAX_OUTPUT_KB,
+    ) -> ScriptResult:
+        """Run a script file on a warm worker, with the same limits and result as run_command."""
+        worker = await self.acquire()
+        start_time = time.perf_counter()
+        stdout_read, stdout_write = os.pipe()
+        stderr_read, stderr_write = os.pipe()
+        stdout, stderr = os.fdopen(stdout_read, "rb"), os.fdopen(stderr_read, "rb")
+        pid = None
+        reusable = False
+        try:
+            request = {
+                "path": script_path,
+                "cwd": cwd,
+                "cpu_seconds": cpu_seconds,
+                "memory_limit_mb": memory_limit_mb,
+            }
+            try:
+                pid = await asyncio.to_thread(worker.submit, request, stdout_write, stderr_write)
+            finally:
+                # The run holds its own copies; EOF arrives once it and its children exit
+                os.close(stdout_write)
+                os.close(stderr_write)
+            max_bytes = max_output_kb * 1024
+            result = await supervise(
+                pid,
+                asyncio.to_thread(read_capped_sync, stdout, max_bytes),
+                asyncio.to_thread(read_capped_sync, stderr, max_bytes),
+                asyncio.to_thread(worker.wait),
+                timeout,
+                start_time,
+            )
+            reusable = True
+            return result
+        except BaseException:
+            if pid is not None:
+                kill_process_group(pid)
+            stdout.close()
+            stderr.close()
+            raise
+        finally:
+            self.release(worker, reusable)
+
+    async def run_code(self, python_code: str, cwd: Optional[str] = None, **limits) -> ScriptResult:
+        """
+        Run python_code on a warm worker in its own working directory (a fresh temporary
+        directory unless cwd is given). The directory and script are removed afterwards.
+        """
+        run_dir = tempfile.mkdtemp(prefix="script_run_")
+        script_path = os.path.join(run_dir, "script.py")
+        with open(script_path, "w") as f:
+            f.write(python_code)
+        try:
+            return await self.run_script(script_path, cwd or run_dir, **limits)
+        finally:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+    def close(self):
+        with self.lock:
+            for worker in self.idle:
+                worker.close()
+            self.idle.clear()
+
+
+script_pool = ScriptWorkerPool()
+
+
+async def run_script(python_code: str, cwd: Optional[str] = None, **limits) -> ScriptResult:
+    """
+    Run python_code on the warm worker pool. Scripts that declare their own dependencies
+    (PEP 723) run in their cached environment instead, and everything goes through
+    `uv run` when SCRIPT_WORKERS is 0. Every path applies rlimits and forks or spawns
+    through POSIX APIs, so scripts only run on POSIX systems (Linux, macOS).
+    """
+    if os.name != "posix":
+        return ScriptResult(
+            exit_code=1,
+            stdout="",
+            stderr="Running scripts requires a POSIX system (Linux or macOS).\n",
+            duration=0.0,
+        )
+    if declares_dependencies(python_code):
+        return await script_environments.run(python_code, cwd=cwd, **limits)
+    if script_pool.size <= 0:
+        return await run_uv_script(python_code, cwd=cwd, **limits)
+    return await script_pool.run_code(python_code, cwd=cwd, **limits)
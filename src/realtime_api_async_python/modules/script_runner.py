@@ -0,0 +1,250 @@
+import asyncio
+import json
+import os
+import signal
+import sys
+import tempfile
+import time
+from typing import Awaitable, List, Optional
+from pydantic import BaseModel
+
+# Defaults for scripts run on behalf of tools; a runaway script must never hang the assistant
+SCRIPT_TIMEOUT_SECONDS = float(os.getenv("SCRIPT_TIMEOUT_SECONDS", "120"))
+SCRIPT_CPU_SECONDS = int(os.getenv("SCRIPT_CPU_SECONDS", "120"))
+SCRIPT_MEMORY_LIMIT_MB = int(os.getenv("SCRIPT_MEMORY_LIMIT_MB", "4096"))
+SCRIPT_MAX_OUTPUT_KB = int(os.getenv("SCRIPT_MAX_OUTPUT_KB", "256"))
+
+
+class ScriptResult(BaseModel):
+    exit_code: Optional[int]
+    stdout: str
+    stderr: str
+    duration: float
+    peak_memory_mb: Optional[float] = None
+    timed_out: bool = False
+    cpu_limit_exceeded: bool = False
+    truncated: bool = False
+
+    @property
+    def success(self) -> bool:
+        return self.exit_code == 0 and not self.timed_out
+
+    @property
+    def output(self) -> str:
+        output = self.stdout + self.stderr
+        if self.timed_out:
+            output += f"\nScript timed out after {self.duration:.1f} seconds and was killed."
+        elif self.cpu_limit_exceeded:
+            output += "\nScript exceeded its CPU time limit and was killed."
+        if self.truncated:
+            output += "\n[output truncated]"
+        return output
+
+
+LAUNCHER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "script_launcher.py")
+
+
+def launcher_command(
+    command: List[str],
+    cpu_seconds: Optional[int],
+    memory_limit_mb: Optional[int],
+    report_fd: int = -1,
+    python: str = sys.executable,
+) -> List[str]:
+    """
+    command run through script_launcher.py, which applies the CPU and address-space rlimits
+    without a preexec_fn and reports peak memory to report_fd.
+    """
+    return [
+        python,
+        LAUNCHER_SCRIPT,
+        str(report_fd),
+        str(cpu_seconds or 0),
+        str(memory_limit_mb or 0),
+        *command,
+    ]
+
+
+async def read_capped(stream: asyncio.StreamReader, max_bytes: int) -> tuple:
+    """
+    Read a pipe to EOF in chunks, keeping at most max_bytes. The rest is drained and
+    dropped so the child never blocks on a full pipe. Returns (data, truncated).
+    """
+    chunks = []
+    kept = 0
+    truncated = False
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            break
+        if kept + len(chunk) > max_bytes:
+            truncated = True
+            chunk = chunk[: max(max_bytes - kept, 0)]
+        if chunk:
+            chunks.append(chunk)
+            kept += len(chunk)
+    return b"".join(chunks).decode("utf-8", errors="replace"), truncated
+
+
+def read_capped_sync(stream, max_bytes: int) -> tuple:
+    """read_capped for a blocking file object, to run on a thread."""
+    chunks = []
+    kept = 0
+    truncated = False
+    while True:
+        chunk = stream.read1(65536)
+        if not chunk:
+            break
+        if kept + len(chunk) > max_bytes:
+            truncated = True
+            chunk = chunk[: max(max_bytes - kept, 0)]
+        if chunk:
+            chunks.append(chunk)
+            kept += len(chunk)
+    stream.close()
+    return b"".join(chunks).decode("utf-8", errors="replace"), truncated
+
+
+def kill_process_group(pid: int):
+    """Kill the process group led by pid, or just pid if it hasn't become a group leader yet."""
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+async def supervise(
+    pid: int,
+    stdout_reader: Awaitable[tuple],
+    stderr_reader: Awaitable[tuple],
+    wait: Awaitable[tuple],
+    timeout: Optional[float],
+    start_time: float,
+) -> ScriptResult:
+    """
+    Collect the output of a running process and wait for it to exit.
+
+    The readers return (text, truncated) for each stream; wait returns (exit code, peak RSS
+    in ru_maxrss units or None) once the process is reaped. The whole process group is
+    killed when the wall-clock timeout passes or the awaiting task is cancelled.
+    """
+    stdout_reader = asyncio.ensure_future(stdout_reader)
+    stderr_reader = asyncio.ensure_future(stderr_reader)
+    waiter = asyncio.ensure_future(wait)
+
+    timed_out = False
+    try:
+        await asyncio.wait_for(asyncio.shield(waiter), timeout)
+    except asyncio.TimeoutError:
+        timed_out = True
+        kill_process_group(pid)
+    except asyncio.CancelledError:
+        kill_process_group(pid)
+        await asyncio.gather(waiter, stdout_reader, stderr_reader, return_exceptions=True)
+        raise
+
+    exit_code, max_rss = await waiter
+    # Grandchildren may still hold the pipes open; make sure nothing outlives the run
+    kill_process_group(pid)
+    stdout, stdout_truncated = await stdout_reader
+    stderr, stderr_truncated = await stderr_reader
+
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    peak_memory_mb = None
+    if max_rss is not None:
+        peak_memory_mb = round(max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    # The soft CPU limit raises SIGXCPU; uv reports a killed child as 128 + signal
+    cpu_limit_exceeded = not timed_out and exit_code in (-signal.SIGXCPU, 128 + signal.SIGXCPU)
+    return ScriptResult(
+        exit_code=None if timed_out else exit_code,
+        stdout=stdout,
+        stderr=stderr,
+        duration=round(time.perf_counter() - start_time, 4),
+        peak_memory_mb=peak_memory_mb,
+        timed_out=timed_out,
+        cpu_limit_exceeded=cpu_limit_exceeded,
+        truncated=stdout_truncated or stderr_truncated,
+    )
+
+
+async def run_command(
+    command: List[str],
+    cwd: Optional[str] = None,
+    timeout: Optional[float] = SCRIPT_TIMEOUT_SECONDS,
+    cpu_seconds: Optional[int] = SCRIPT_CPU_SECONDS,
+    memory_limit_mb: Optional[int] = SCRIPT_MEMORY_LIMIT_MB,
+    max_output_kb: int = SCRIPT_MAX_OUTPUT_KB,
+) -> ScriptResult:
+    """
+    Run a command in its own process group as an asyncio subprocess.
+
+    The command is started through script_launcher.py, which applies the rlimits and reports
+    the peak RSS of the process tree (from wait4()). The whole tree is killed when the
+    wall-clock timeout passes or the awaiting task is cancelled. stdout and stderr are
+    captured incrementally up to max_output_kb each.
+    """
+    start_time = time.perf_counter()
+    report_read, report_write = os.pipe()
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *launcher_command(command, cpu_seconds, memory_limit_mb, report_write),
+            cwd=cwd,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            pass_fds=(report_write,),
+            start_new_session=True,
+        )
+    except BaseException:
+        os.close(report_read)
+        raise
+    finally:
+        os.close(report_write)
+
+    async def wait() -> tuple:
+        try:
+            exit_code = await process.wait()
+            # The launcher has exited, so the report is complete (or missing if it was killed)
+            report = os.read(report_read, 4096)
+        finally:
+            os.close(report_read)
+        max_rss = json.loads(report)["max_rss"] if report else None
+        return exit_code, max_rss
+
+    max_bytes = max_output_kb * 1024
+    return await supervise(
+        process.pid,
+        read_capped(process.stdout, max_bytes),
+        read_capped(process.stderr, max_bytes),
+        wait(),
+        timeout,
+        start_time,
+    )
+
+
+async def run_uv_script(python_code: str, cwd: Optional[str] = None, **limits) -> ScriptResult:
+    """
+    Write python_code to a temporary script and run it with Astral UV under the given
+    limits (see run_command), which apply to the script rather than uv. The script is
+    always deleted afterwards.
+    """
+    with tempfile.NamedTemporaryFile(suffix=".py", delete=False) as temp_file:
+        temp_file.write(python_code.encode("utf-8"))
+        temp_file_path = temp_file.name
+
+    try:
+        # Only the script gets the limits, not uv resolving and syncing the environment
+        script_command = launcher_command(
+            ["-", temp_file_path],
+            limits.pop("cpu_seconds", SCRIPT_CPU_SECONDS),
+            limits.pop("memory_limit_mb", SCRIPT_MEMORY_LIMIT_MB),
+            python="python",
+        )
+        return await run_command(
+            ["uv", "run", *script_command], cwd=cwd, cpu_seconds=None, memory_limit_mb=None, **limits
+        )
+    finally:
+        os.remove(temp_file_path)
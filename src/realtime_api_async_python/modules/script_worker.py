@@ -0,0 +1,121 @@
+"""
+Warm Python worker process for running scratchpad scripts.
+
+Started by script_pool.ScriptWorker as `python script_worker.py <socket fd> <modules>`,
+it imports the given modules once and then waits for run requests on the socket. Each
+request is forked off into a child that starts with every module already imported, runs
+the script in a fresh __main__ namespace in its own session and working directory, and
+writes to the stdout/stderr pipes passed along with the request. This file runs outside
+the package, so it only uses the standard library.
+"""
+
+import sys
+
+# Started as a script, so sys.path[0] is modules/, whose logging.py would shadow the
+# standard library for everything imported from here on
+sys.path.pop(0)
+
+import importlib
+import json
+import os
+import resource
+import runpy
+import socket
+import time
+import traceback
+
+MAX_MESSAGE_BYTES = 65536
+
+
+def preload(module_names: list):
+    # Charts are rendered to files; never try to open a GUI window from a worker
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    for module_name in module_names:
+        try:
+            importlib.import_module(module_name)
+        except Exception as e:
+            print(f"Script worker could not preload {module_name}: {e}", file=sys.stderr)
+
+
+def run_child(request: dict, stdout_fd: int, stderr_fd: int):
+    """Runs in the forked child and never returns."""
+    exit_code = 1
+    try:
+        os.setsid()
+        os.dup2(stdout_fd, 1)
+        os.dup2(stderr_fd, 2)
+        os.close(stdout_fd)
+        os.close(stderr_fd)
+        if request.get("cpu_seconds"):
+            cpu_seconds = request["cpu_seconds"]
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+        if request.get("memory_limit_mb"):
+            memory_bytes = request["memory_limit_mb"] * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+        os.chdir(request["cwd"])
+
+        script_path = request["path"]
+        sys.argv = [script_path]
+        sys.path[0] = os.path.dirname(script_path)
+        try:
+            runpy.run_path(script_path, run_name="__main__")
+            exit_code = 0
+        except SystemExit as e:
+            if e.code is None:
+                exit_code = 0
+            elif isinstance(e.code, int):
+                exit_code = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                exit_code = 1
+        except BaseException as e:
+            # Report the traceback from the script's first frame, like `python script.py`
+            tb = e.__traceback__
+            while tb is not None and tb.tb_frame.f_code.co_filename != script_path:
+                tb = tb.tb_next
+            traceback.print_exception(type(e), e, tb)
+            exit_code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(exit_code)
+
+
+def serve(control: socket.socket):
+    while True:
+        message, fds, _, _ = socket.recv_fds(control, MAX_MESSAGE_BYTES, 2)
+        if not message:
+            # The pool closed its end of the socket
+            return
+        request = json.loads(message)
+        pid = os.fork()
+        if pid == 0:
+            control.close()
+            run_child(request, fds[0], fds[1])
+        for fd in fds:
+            os.close(fd)
+        control.send(json.dumps({"pid": pid}).encode("utf-8"))
+        _, status, usage = os.wait4(pid, 0)
+        control.send(
+            json.dumps(
+                {"status": status, "max_rss": usage.ru_maxrss}
+            ).encode("utf-8")
+        )
+
+
+def main():
+    control = socket.socket(fileno=int(sys.argv[1]))
+    start_time = time.perf_counter()
+    preload([name for name in sys.argv[2].split(",") if name])
+    control.send(
+        json.dumps(
+            {"startup": round(time.perf_counter() - start_time, 4)}
+        ).encode("utf-8")
+    )
+    serve(control)
+
+
+if __name__ == "__main__":
+    main()
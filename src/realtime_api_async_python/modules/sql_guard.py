@@ -0,0 +1,91 @@
+from typing import Optional
+from .database import Database, is_query, strip_sql
+
+
+class SQLValidationError(ValueError):
+    """The SQL failed to parse or bind during the EXPLAIN dry-run. Nothing was executed."""
+
+
+class SQLCostError(ValueError):
+    """The SQL's planner estimate is above the configured budget and can't be auto-limited."""
+
+
+def limit_sql(sql: str, max_rows: int) -> str:
+    return f"SELECT * FROM ({strip_sql(sql)}) AS guarded_query LIMIT {max_rows}"
+
+
+def guard_sql(
+    database: Database,
+    sql: str,
+    max_estimated_rows: Optional[int] = None,
+    max_estimated_cost: Optional[float] = None,
+    over_limit_action: str = "limit",
+) -> dict:
+    """
+    Validate sql with an EXPLAIN dry-run and enforce the row and cost budgets.
+
+    Queries estimated to return more than max_estimated_rows are wrapped in a LIMIT when
+    over_limit_action is 'limit', otherwise rejected. Queries above max_estimated_cost are
+    always rejected since a LIMIT doesn't bound the work needed to produce the first rows.
+
+    Raises:
+        SQLValidationError: If the planner can't parse or bind the query.
+        SQLCostError: If the query is over budget and can't be limited.
+
+    Returns:
+        dict: The SQL to execute, the planner estimates, and the action taken.
+    """
+    try:
+        plan = database.explain(sql)
+    except Exception as e:
+        raise SQLValidationError(str(e)) from e
+
+    estimated_rows = plan["estimated_rows"]
+    estimated_cost = plan["estimated_cost"]
+    result = {
+        "sql": sql,
+        "estimated_rows": estimated_rows,
+        "estimated_cost": estimated_cost,
+        "action": "none",
+    }
+
+    if (
+        max_estimated_cost is not None
+        and estimated_cost is not None
+        and estimated_cost > max_estimated_cost
+    ):
+        raise SQLCostError(
+            f"Estimated query cost {estimated_cost} exceeds the limit of {max_estimated_cost}."
+        )
+
+    if (
+        max_estimated_rows is not None
+        and estimated_rows is not None
+        and estimated_rows > max_estimated_rows
+    ):
+        if over_limit_action == "limit" and is_query(sql):
+            result["sql"] = limit_sql(sql, max_estimated_rows)
+            result["action"] = "limited"
+        else:
+            raise SQLCostError(
+                f"Estimated {estimated_rows} rows exceeds the limit of {max_estimated_rows}."
+            )
+
+    return result
+
+
+def guard_sql_file(
+    database: Database,
+    sql: str,
+    max_estimated_rows: Optional[int] = None,
+    max_estimated_cost: Optional[float] = None,
+    over_limit_action: str = "limit",
+) -> dict:
+    """
+    guard_sql for SQL files, which may hold several statements, DDL or DML that an EXPLAIN
+    dry-run can't check. Only a single read query is guarded, and only when a budget is set;
+    anything else is returned to execute as written.
+    """
+    if not is_query(sql) or (max_estimated_rows is None and max_estimated_cost is None):
+        return {"sql": sql, "estimated_rows": None, "estimated_cost": None, "action": "none"}
+    return guard_sql(database, sql, max_estimated_rows, max_estimated_cost, over_limit_action)
@@ -1,12 +1,10 @@
 import asyncio
-import io
 import os
 import json
 import random
 import logging
 import subprocess
 import pyperclip
-import pandas as pd
 from pydantic import BaseModel
 from typing import Any, Dict, Tuple, List, Optional
 from datetime import datetime
@@ -21,14 +19,47 @@ from .utils import (
     model_name_to_id,
     SESSION_INSTRUCTIONS,
     personalization,
-    scrap_url_clean,
-    run_uv_script,
 )
 from .mermaid import generate_diagram
-from .database import get_database_instance
+from .database import get_database_instance, export_parquet, is_query
+from .query_cache import query_cache
+from .sql_guard import guard_sql, guard_sql_file, SQLValidationError, SQLCostError
+from .schema_index import load_schema_index
+from .column_profiler import load_profiles, profile_in_background, format_profiles
+from .scratchpad_views import open_scratchpad
+from .async_database import AsyncDatabase
+from .query_workspace import query_workspace
+from .script_pool import run_script
+from .code_check import check_code
+from .chart_engine import ChartSpec, ChartType, chart_script, spec_problems
+from .csv_profiler import load_csv_profile, format_csv_profile
+from .scrape_service import extract_urls, scrape_service
+from .bulk_ingest import ingest_directory, load_ingest_index, save_ingest_index
+from .paged_reader import PagedFile, read_file_slice, FILE_PAGE_MAX_KB
+from .chunk_mapper import (
+    DISCUSS_CHUNK_KB,
+    DISCUSS_MAX_CHUNKS,
+    DISCUSS_NOTES_MAX_KB,
+    chunk_mapper,
+    group_notes,
+    iter_chunks,
+)
 import re
 
 
+def scratchpad_files(scratch_pad_dir: str) -> List[str]:
+    """
+    Files tools may offer from the scratchpad. Directories (such as the .cache of results,
+    scrapes and script environments) and hidden files are left out.
+    """
+    return sorted(
+        file_name
+        for file_name in os.listdir(scratch_pad_dir)
+        if not file_name.startswith(".")
+        and os.path.isfile(os.path.join(scratch_pad_dir, file_name))
+    )
+
+
 @timeit_decorator
 async def ingest_memory() -> dict:
     """
@@ -44,9 +75,17 @@ async def ingest_memory() -> dict:
 
 
 @timeit_decorator
-async def ingest_file(prompt: str) -> dict:
+async def ingest_file(
+    prompt: str,
+    page: Optional[int] = None,
+    pattern: Optional[str] = None,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+) -> dict:
     """
-    Selects a file based on the user's prompt, reads its content, and returns the file data.
+    Selects a file based on the user's prompt, reads the requested slice of it (a page, a line
+    range or the lines matching a pattern), and returns the file data. Without a slice, small
+    files are returned whole and large ones as their first page.
     """
     scratch_pad_dir = os.getenv("SCRATCH_PAD_DIR", "./scratchpad")
 
@@ -62,7 +101,7 @@ async def ingest_file(prompt: str) -> dict:
 </instructions>
 
 <available-files>
-    {", ".join(os.listdir(scratch_pad_dir))}
+    {", ".join(scratchpad_files(scratch_pad_dir))}
 </available-files>
 
 <user-prompt>
@@ -92,10 +131,11 @@ async def ingest_file(prompt: str) -> dict:
             "success": False,
         }
 
-    # Read the file content
+    # Read only the requested slice of the file
     try:
-        with open(file_path, "r") as f:
-            file_content = f.read()
+        file_slice = await asyncio.to_thread(
+            read_file_slice, file_path, page, pattern, start_line, end_line
+        )
     except Exception as e:
         return {
             "ingested_content": None,
@@ -104,9 +144,10 @@ async def ingest_file(prompt: str) -> dict:
         }
 
     return {
-        "ingested_content": file_content,
-        "message": "Successfully ingested content",
+        "ingested_content": file_slice.pop("content"),
+        "message": f"Successfully ingested {file_slice['range']}",
         "success": True,
+        **file_slice,
     }
 
 
@@ -194,14 +235,6 @@ class RunPythonResponse(BaseModel):
     error: Optional[str] = None
 
 
-class ChartType(str, Enum):
-    HISTOGRAM = "histogram"
-    PIE = "pie"
-    SCATTER = "scatter"
-    BAR = "bar"
-    LINE = "line"
-
-
 class PythonChartResponse(BaseModel):
     executable_python: str
 
@@ -335,7 +368,7 @@ async def update_file(prompt: str, model: ModelName = ModelName.base_model) -> d
     os.makedirs(scratch_pad_dir, exist_ok=True)
 
     # List available files in SCRATCH_PAD_DIR
-    available_files = os.listdir(scratch_pad_dir)
+    available_files = scratchpad_files(scratch_pad_dir)
     available_files_str = ", ".join(available_files)
 
     # Build the structured prompt to select the file
@@ -446,27 +479,90 @@ async def load_tables_into_memory() -> dict:
         database = get_database_instance(sql_dialect)
     except ValueError as e:
         return {"status": "error", "message": str(e)}
+    async_database = AsyncDatabase(database, sql_dialect)
 
-    # Step 4: Connect to the database
     try:
-        database.connect(database_url)
-    except Exception as e:
-        return {"status": "error", "message": f"Failed to connect: {str(e)}"}
+        # Step 4: Connect to the database
+        try:
+            await async_database.connect(database_url)
+        except Exception as e:
+            return {"status": "error", "message": f"Failed to connect: {str(e)}"}
 
-    # Step 5: Read table definitions
-    try:
-        table_definitions = database.read_tables()
-    except Exception as e:
-        return {"status": "error", "message": f"Failed to read tables: {str(e)}"}
+        # Step 5: Read table definitions
+        try:
+            table_definitions = await async_database.read_tables()
+        except Exception as e:
+            return {"status": "error", "message": f"Failed to read tables: {str(e)}"}
 
-    # Step 6: Save table definitions to active memory
-    memory_manager.upsert("table_definitions", table_definitions)
-    memory_manager.save_memory()
+        # Step 6: Save table definitions to active memory
+        memory_manager.upsert("table_definitions", table_definitions)
+        memory_manager.save_memory()
 
-    return {
-        "status": "success",
-        "message": "Table definitions loaded into active memory.",
-    }
+        # Step 7: Warm the column profiles used to enrich SQL generation prompts
+        schema_cache_dir = os.path.join(
+            os.getenv("SCRATCH_PAD_DIR", "./scratchpad"), ".cache", "schema"
+        )
+        profile_in_background(
+            sql_dialect, database_url, f"{sql_dialect}:{database.url}", schema_cache_dir
+        )
+
+        return {
+            "status": "success",
+            "message": "Table definitions loaded into active memory.",
+        }
+    finally:
+        await async_database.close()
+
+
+def sql_dialect_prompt(sql_dialect: str, database) -> str:
+    """
+    The <sql_dialect> block of SQL generation prompts. The federated backend runs DuckDB SQL
+    over its ATTACHed sources, so the model is told that and how their tables are named.
+    """
+    if sql_dialect != "federated":
+        return f"<sql_dialect>\n{sql_dialect}\n</sql_dialect>"
+    sources = ", ".join(f"'{alias}' ({source_type})" for alias, source_type, _ in database.sources)
+    return f"""<sql_dialect>
+duckdb
+</sql_dialect>
+
+<federated_sources>
+    <instruction>Write DuckDB SQL. Each source database is ATTACHed read-only under its alias: {sources}.</instruction>
+    <instruction>Always qualify tables with their alias exactly as in the table definitions: alias.table for a source's main schema, alias.schema.table otherwise (e.g. alias.public.table for Postgres).</instruction>
+    <instruction>Tables from different sources can be joined in one query.</instruction>
+</federated_sources>"""
+
+
+def read_relevant_tables(database, sql_dialect: str, prompt: str, caller: str) -> str:
+    """
+    Read only the table definitions relevant to the prompt (plus their foreign-key
+    neighbours) from the cached schema index, and log how much of the schema was pruned.
+    Precomputed column profiles are appended when available; stale or missing profiles
+    are refreshed in the background so the current prompt never waits on them.
+    """
+    schema_cache_dir = os.path.join(
+        os.getenv("SCRATCH_PAD_DIR", "./scratchpad"), ".cache", "schema"
+    )
+    namespace = f"{sql_dialect}:{database.url}"
+    schema_index = load_schema_index(database, namespace, schema_cache_dir)
+    all_tables = schema_index.render(list(schema_index.tables))
+    table_names = schema_index.relevant_tables(
+        prompt, personalization.get("sql_schema_top_k", 8)
+    )
+    table_definitions = schema_index.render(table_names)
+
+    profiles = load_profiles(namespace, schema_index.data_version, schema_cache_dir)
+    if profiles is not None:
+        table_definitions += format_profiles(profiles, table_names)
+    else:
+        profile_in_background(sql_dialect, database.url, namespace, schema_cache_dir)
+
+    log_info(
+        f"📐 {caller}() schema prompt size {len(all_tables)} -> {len(table_definitions)} chars "
+        f"(~{len(all_tables) // 4} -> ~{len(table_definitions) // 4} tokens)",
+        style="bold cyan",
+    )
+    return table_definitions
 
 
 @timeit_decorator
@@ -490,35 +586,39 @@ async def generate_sql_save_to_file(prompt: str) -> dict:
         database = get_database_instance(sql_dialect)
     except ValueError as e:
         return {"status": "error", "message": str(e)}
+    async_database = AsyncDatabase(database, sql_dialect)
 
-    # Step 4: Connect to the database
     try:
-        database.connect(database_url)
-    except Exception as e:
-        return {"status": "error", "message": f"Failed to connect: {str(e)}"}
+        # Step 4: Connect to the database
+        try:
+            await async_database.connect(database_url)
+        except Exception as e:
+            return {"status": "error", "message": f"Failed to connect: {str(e)}"}
 
-    # Step 5: Read table definitions
-    try:
-        table_definitions = database.read_tables()
-    except Exception as e:
-        return {"status": "error", "message": f"Failed to read tables: {str(e)}"}
+        # Step 5: Read the table definitions relevant to the prompt
+        try:
+            table_definitions = await async_database.run(
+                read_relevant_tables, database, sql_dialect, prompt, "generate_sql_save_to_file"
+            )
+        except Exception as e:
+            return {"status": "error", "message": f"Failed to read tables: {str(e)}"}
 
-    # Step 6: Generate SQL and file name using structured_output_prompt
-    from enum import Enum
+        # Step 6: Generate SQL and file name using structured_output_prompt
+        from enum import Enum
 
-    class OutputFormat(str, Enum):
-        CSV = ".csv"
-        JSON = ".json"
+        class OutputFormat(str, Enum):
+            CSV = ".csv"
+            JSON = ".json"
 
-    class GenerateSQLResponse(BaseModel):
-        file_name: str
-        sql_query: str
-        output_format: OutputFormat
+        class GenerateSQLResponse(BaseModel):
+            file_name: str
+            sql_query: str
+            output_format: OutputFormat
 
-    # Get all memory content
-    memory_content = memory_manager.get_xml_for_prompt(["*"])
+        # Get all memory content
+        memory_content = memory_manager.get_xml_for_prompt(["*"])
 
-    prompt_structure = f"""
+        prompt_structure = f"""
 <purpose>
     Generate an SQL query and a suitable file name based on the user's prompt, available table definitions, and current memory content.
 </purpose>
@@ -536,9 +636,7 @@ async def generate_sql_save_to_file(prompt: str) -> dict:
 {table_definitions}
 </table_definitions>
 
-<sql_dialect>
-{sql_dialect}
-</sql_dialect>
+{sql_dialect_prompt(sql_dialect, database)}
 
 {memory_content}
 
@@ -547,23 +645,22 @@ async def generate_sql_save_to_file(prompt: str) -> dict:
 </user_prompt>
     """
 
-    response = structured_output_prompt(prompt_structure, GenerateSQLResponse)
+        response = structured_output_prompt(prompt_structure, GenerateSQLResponse)
 
-    # Step 7: Save the generated SQL to a file
-    scratch_pad_dir = os.getenv("SCRATCH_PAD_DIR", "./scratchpad")
-    os.makedirs(scratch_pad_dir, exist_ok=True)
-    sql_file_path = os.path.join(scratch_pad_dir, response.file_name)
+        # Step 7: Save the generated SQL to a file
+        scratch_pad_dir = os.getenv("SCRATCH_PAD_DIR", "./scratchpad")
+        os.makedirs(scratch_pad_dir, exist_ok=True)
+        sql_file_path = os.path.join(scratch_pad_dir, response.file_name)
 
-    with open(sql_file_path, "w") as f:
-        f.write(response.sql_query)
+        with open(sql_file_path, "w") as f:
+            f.write(response.sql_query)
 
-    return {
-        "status": "success",
-        "message": f"SQL query saved to file '{response.file_name}'.",
-    }
-
-
-from enum import Enum
+        return {
+            "status": "success",
+            "message": f"SQL query saved to file '{response.file_name}'.",
+        }
+    finally:
+        await async_database.close()
 
 
 class OutputFormat(str, Enum):
@@ -578,6 +675,81 @@ class GenerateSQLResponse(BaseModel):
     output_format: OutputFormat
 
 
+def guard_generated_sql(database, sql_query: str) -> dict:
+    """
+    Run the EXPLAIN dry-run and cost guard using the limits from personalization.json.
+    """
+    return guard_sql(
+        database,
+        sql_query,
+        max_estimated_rows=personalization.get("sql_max_estimated_rows"),
+        max_estimated_cost=personalization.get("sql_max_estimated_cost"),
+        over_limit_action=personalization.get("sql_over_limit_action", "limit"),
+    )
+
+
+def guard_file_sql(database, sql_query: str) -> dict:
+    """
+    Cost guard for SQL files using the limits from personalization.json; see guard_sql_file.
+    """
+    return guard_sql_file(
+        database,
+        sql_query,
+        max_estimated_rows=personalization.get("sql_max_estimated_rows"),
+        max_estimated_cost=personalization.get("sql_max_estimated_cost"),
+        over_limit_action=personalization.get("sql_over_limit_action", "limit"),
+    )
+
+
+workspace_memory_synced = False
+
+
+def sync_workspace_memory(catalog: str):
+    """Keep the workspace catalog in active memory, removing it while there are no result tables."""
+    global workspace_memory_synced
+    workspace_memory_synced = True
+    if catalog:
+        memory_manager.upsert("query_workspace", catalog)
+    else:
+        memory_manager.delete("query_workspace")
+
+
+def export_sql_results(
+    database, sql_dialect: str, sql_query: str, file_path: str, output_format: str
+) -> dict:
+    """
+    Export query results to file_path, serving repeated queries against unchanged data
+    from the parquet result cache.
+    """
+    namespace = f"{sql_dialect}:{database.url}"
+    # Only read queries are cached; statements that change data must run every time
+    cacheable = is_query(sql_query)
+    data_version = database.query_version(sql_query) if cacheable else None
+
+    cached_path = query_cache.get(namespace, sql_query, data_version) if cacheable else None
+    if cached_path:
+        export = export_parquet(cached_path, file_path, output_format)
+        export["cache"] = "hit"
+    else:
+        cache_path = query_cache.reserve(namespace, sql_query, data_version) if cacheable else None
+        if cache_path:
+            try:
+                export = database.export_sql(sql_query, cache_path, ".parquet")
+            except BaseException:
+                query_cache.discard(cache_path)
+                raise
+            cached_path = query_cache.put(namespace, sql_query, data_version, cache_path)
+            export_parquet(cached_path, file_path, output_format)
+            export["cache"] = "miss"
+        else:
+            export = database.export_sql(sql_query, file_path, output_format)
+            export["cache"] = "disabled"
+
+    export["cache_path"] = cached_path
+    export["cache_report"] = query_cache.report()
+    return export
+
+
 @timeit_decorator
 async def generate_sql_and_execute(prompt: str) -> dict:
     """
@@ -602,24 +774,46 @@ async def generate_sql_and_execute(prompt: str) -> dict:
         database = get_database_instance(sql_dialect)
     except ValueError as e:
         return {"status": "error", "message": str(e)}
+    async_database = AsyncDatabase(database, sql_dialect)
 
-    # Step 4: Connect to the database
-    try:
-        database.connect(database_url)
-    except Exception as e:
-        return {"status": "error", "message": f"Failed to connect: {str(e)}"}
-
-    # Step 5: Read table definitions
     try:
-        table_definitions = database.read_tables()
-    except Exception as e:
-        return {"status": "error", "message": f"Failed to read tables: {str(e)}"}
+        # Step 4: Connect to the database
+        try:
+            await async_database.connect(database_url)
+        except Exception as e:
+            return {"status": "error", "message": f"Failed to connect: {str(e)}"}
+        database.statement_timeout = personalization.get("sql_statement_timeout_seconds")
 
-    # Step 6: Generate SQL query, output format, and file name using structured_output_prompt
-    # Get all memory content
-    memory_content = memory_manager.get_xml_for_prompt(["*"])
+        # Step 5: Read the table definitions relevant to the prompt
+        try:
+            table_definitions = await async_database.run(
+                read_relevant_tables, database, sql_dialect, prompt, "generate_sql_and_execute"
+            )
+        except Exception as e:
+            return {"status": "error", "message": f"Failed to read tables: {str(e)}"}
+
+        # Step 6: Generate SQL query, output format, and file name using structured_output_prompt
+        # The workspace only lives in this process, so a catalog saved by an earlier run names
+        # tables that are gone; replace it on first use
+        if not workspace_memory_synced:
+            sync_workspace_memory(await asyncio.to_thread(query_workspace.catalog))
+
+        # Get all memory content
+        memory_content = memory_manager.get_xml_for_prompt(["*"])
+
+        # Earlier results in the session workspace can be refined instead of re-querying the base tables
+        workspace_definitions = query_workspace.table_definitions()
+        workspace_prompt = ""
+        if workspace_definitions:
+            workspace_prompt = f"""
+<workspace_tables>
+    <instruction>These DuckDB temp tables hold the results of earlier queries in this session.</instruction>
+    <instruction>If the user's prompt refines or builds on an earlier result, query these tables with DuckDB SQL instead of the base tables. Never join them with the base tables.</instruction>
+{workspace_definitions}
+</workspace_tables>
+"""
 
-    prompt_structure = f"""
+        prompt_structure = f"""
 <purpose>
     Generate an SQL query, output format, and a suitable file name based on the user's prompt, available table definitions, and current memory content.
 </purpose>
@@ -637,10 +831,8 @@ async def generate_sql_and_execute(prompt: str) -> dict:
 {table_definitions}
 </table_definitions>
 
-<sql_dialect>
-{sql_dialect}
-</sql_dialect>
-
+{sql_dialect_prompt(sql_dialect, database)}
+{workspace_prompt}
 {memory_content}
 
 <user_prompt>
@@ -648,38 +840,121 @@ async def generate_sql_and_execute(prompt: str) -> dict:
 </user_prompt>
     """
 
-    response = structured_output_prompt(prompt_structure, GenerateSQLResponse)
+        response = structured_output_prompt(prompt_structure, GenerateSQLResponse)
 
-    # Step 7: Execute the SQL query
-    try:
-        df = database.execute_sql(response.sql_query)
-    except Exception as e:
-        return {"status": "error", "message": f"Failed to execute SQL query: {str(e)}"}
+        # Step 7: Validate the SQL with an EXPLAIN dry-run, regenerating once if it doesn't parse
+        async def guard_on_target(sql_query: str):
+            # Queries over earlier results run in the workspace, everything else on the source
+            if query_workspace.references(sql_query):
+                target = AsyncDatabase(query_workspace.connect(), "workspace")
+                guarded = await target.run(
+                    query_workspace.locked, guard_generated_sql, target.database, sql_query
+                )
+                return target, guarded
+            return async_database, await async_database.run(guard_generated_sql, database, sql_query)
 
-    # Step 8: Save the DataFrame to a file based on the output_format
-    scratch_pad_dir = os.getenv("SCRATCH_PAD_DIR", "./scratchpad")
-    os.makedirs(scratch_pad_dir, exist_ok=True)
-    file_path = os.path.join(scratch_pad_dir, response.file_name)
+        try:
+            try:
+                target, guarded = await guard_on_target(response.sql_query)
+            except SQLValidationError as e:
+                log_info(
+                    f"🔁 generate_sql_and_execute() regenerating invalid SQL: {str(e)}",
+                    style="bold yellow",
+                )
+                retry_prompt = f"""{prompt_structure}
+<previous_attempt>
+    <sql_query>{response.sql_query}</sql_query>
+    <error>{str(e)}</error>
+    <instruction>The previous SQL query failed validation. Fix the error and generate a corrected query.</instruction>
+</previous_attempt>
+    """
+                response = structured_output_prompt(retry_prompt, GenerateSQLResponse)
+                target, guarded = await guard_on_target(response.sql_query)
+        except SQLValidationError as e:
+            return {"status": "error", "message": f"Generated SQL query is invalid: {str(e)}"}
+        except SQLCostError as e:
+            return {"status": "error", "message": f"Generated SQL query rejected: {str(e)}"}
+
+        if guarded["action"] == "limited":
+            log_info(
+                f"🛡️ generate_sql_and_execute() limited query estimated at {guarded['estimated_rows']} rows",
+                style="bold yellow",
+            )
+
+        # Step 8: Execute the SQL query and export the results to a file based on the output_format
+        scratch_pad_dir = os.getenv("SCRATCH_PAD_DIR", "./scratchpad")
+        os.makedirs(scratch_pad_dir, exist_ok=True)
+        file_path = os.path.join(scratch_pad_dir, response.file_name)
 
-    try:
-        if response.output_format == OutputFormat.CSV:
-            df.to_csv(file_path, index=False)
-        elif response.output_format == OutputFormat.JSONL:
-            df.to_json(file_path, orient="records", lines=True)
-        elif response.output_format == OutputFormat.JSON_ARRAY:
-            df.to_json(file_path, orient="records")
-        else:
+        try:
+            if target is async_database:
+                export = await async_database.run(
+                    export_sql_results,
+                    database,
+                    sql_dialect,
+                    guarded["sql"],
+                    file_path,
+                    response.output_format,
+                )
+            else:
+                # Workspace results are small and session-scoped, so they skip the result cache
+                export = await target.run(
+                    query_workspace.locked,
+                    target.database.export_sql,
+                    guarded["sql"],
+                    file_path,
+                    response.output_format,
+                )
+                export.update(cache="workspace", cache_path=None, cache_report=query_cache.report())
+        except Exception as e:
             return {
                 "status": "error",
-                "message": f"Invalid output format: {response.output_format}",
+                "message": f"Failed to execute SQL query and save results: {str(e)}",
             }
-    except Exception as e:
-        return {"status": "error", "message": f"Failed to save file: {str(e)}"}
 
-    return {
-        "status": "success",
-        "message": f"SQL query results saved to {response.output_format} file '{response.file_name}'.",
-    }
+        log_info(
+            f"📤 generate_sql_and_execute() exported {export['rows']} rows via {export['engine']} "
+            f"({export['rows_per_second']} rows/s, cache {export['cache']}, "
+            f"hit rate {export['cache_report']['hit_rate']:.0%})",
+            style="bold cyan",
+        )
+
+        # Step 9: Materialize the result in the session workspace and keep its catalog in memory
+        try:
+            if export["rows"] is not None and export["rows"] > query_workspace.max_rows:
+                result_table = None
+            elif target is not async_database:
+                result_table = await target.run(query_workspace.add_query, guarded["sql"], prompt)
+            else:
+                result_table = await asyncio.to_thread(
+                    query_workspace.add_file,
+                    export["cache_path"] or file_path,
+                    prompt,
+                    guarded["sql"],
+                )
+            if result_table is None:
+                log_info(
+                    f"🗃️ generate_sql_and_execute() kept the result out of the workspace: over "
+                    f"{query_workspace.max_rows} rows",
+                    style="dim",
+                )
+            sync_workspace_memory(await asyncio.to_thread(query_workspace.catalog))
+        except Exception as e:
+            log_info(
+                f"⚠️ generate_sql_and_execute() could not materialize the result: {str(e)}",
+                style="bold yellow",
+            )
+            result_table = None
+
+        return {
+            "status": "success",
+            "message": f"SQL query results saved to {response.output_format} file '{response.file_name}'.",
+            "result_table": result_table,
+            "export": export,
+            "guard": {key: value for key, value in guarded.items() if key != "sql"},
+        }
+    finally:
+        await async_database.close()
 
 
 async def run_sql_file(prompt: str) -> dict:
@@ -700,7 +975,7 @@ async def run_sql_file(prompt: str) -> dict:
 </instructions>
 
 <available-files>
-    {", ".join([f for f in os.listdir(scratch_pad_dir) if f.endswith('.sql')])}
+    {", ".join([f for f in scratchpad_files(scratch_pad_dir) if f.endswith('.sql')])}
 </available-files>
 
 <user-prompt>
@@ -754,21 +1029,26 @@ async def run_sql_file(prompt: str) -> dict:
         database = get_database_instance(sql_dialect)
     except ValueError as e:
         return {"status": "error", "message": str(e)}
+    async_database = AsyncDatabase(database, sql_dialect)
 
-    # Step 6: Connect to the database
     try:
-        database.connect(database_url)
-    except Exception as e:
-        return {"status": "error", "message": f"Failed to connect: {str(e)}"}
-
-    # Step 7: Execute the SQL query
-    try:
-        df = database.execute_sql(sql_query)
-    except Exception as e:
-        return {"status": "error", "message": f"Failed to execute SQL query: {str(e)}"}
+        # Step 6: Connect to the database
+        try:
+            await async_database.connect(database_url)
+        except Exception as e:
+            return {"status": "error", "message": f"Failed to connect: {str(e)}"}
+        database.statement_timeout = personalization.get("sql_statement_timeout_seconds")
 
-    # Step 8: Determine output format and file name
-    output_format_prompt = f"""
+        # Step 7: Apply the cost guard to single read queries when a budget is set
+        try:
+            guarded = await async_database.run(guard_file_sql, database, sql_query)
+        except SQLValidationError as e:
+            return {"status": "error", "message": f"SQL query is invalid: {str(e)}"}
+        except SQLCostError as e:
+            return {"status": "error", "message": f"SQL query rejected: {str(e)}"}
+
+        # Step 8: Determine output format and file name
+        output_format_prompt = f"""
 <purpose>
     Determine the output format and file name for the SQL query results.
 </purpose>
@@ -784,40 +1064,156 @@ async def run_sql_file(prompt: str) -> dict:
 </user-prompt>
     """
 
-    class OutputFormatResponse(BaseModel):
-        file_name: str
-        output_format: OutputFormat
+        class OutputFormatResponse(BaseModel):
+            file_name: str
+            output_format: OutputFormat
 
-    output_format_response = structured_output_prompt(
-        output_format_prompt,
-        OutputFormatResponse,
-        llm_model=model_name_to_id[ModelName.fast_model],
-    )
+        output_format_response = structured_output_prompt(
+            output_format_prompt,
+            OutputFormatResponse,
+            llm_model=model_name_to_id[ModelName.fast_model],
+        )
 
-    # Step 9: Save the results to a file based on the output_format
-    output_file_path = os.path.join(scratch_pad_dir, output_format_response.file_name)
+        # Step 9: Execute the SQL query and export the results based on the output_format
+        output_file_path = os.path.join(scratch_pad_dir, output_format_response.file_name)
 
-    try:
-        if output_format_response.output_format == OutputFormat.CSV:
-            df.to_csv(output_file_path, index=False)
-        elif output_format_response.output_format == OutputFormat.JSONL:
-            df.to_json(output_file_path, orient="records", lines=True)
-        elif output_format_response.output_format == OutputFormat.JSON_ARRAY:
-            df.to_json(output_file_path, orient="records")
-        else:
+        try:
+            export = await async_database.run(
+                export_sql_results,
+                database,
+                sql_dialect,
+                guarded["sql"],
+                output_file_path,
+                output_format_response.output_format,
+            )
+        except Exception as e:
             return {
                 "status": "error",
-                "message": f"Invalid output format: {output_format_response.output_format}",
+                "message": f"Failed to execute SQL query and save results: {str(e)}",
             }
+
+        log_info(
+            f"📤 run_sql_file() exported {export['rows']} rows via {export['engine']} "
+            f"({export['rows_per_second']} rows/s, cache {export['cache']}, "
+            f"hit rate {export['cache_report']['hit_rate']:.0%})",
+            style="bold cyan",
+        )
+
+        return {
+            "status": "success",
+            "message": f"SQL query executed successfully. Results saved to '{output_format_response.file_name}'.",
+            "file_name": file_selection_response.file,
+            "output_file": output_format_response.file_name,
+            "output_format": output_format_response.output_format,
+            "export": export,
+        }
+    finally:
+        await async_database.close()
+
+
+@timeit_decorator
+async def query_scratchpad(prompt: str) -> dict:
+    """
+    Generates a DuckDB SQL query over the tabular files in the scratchpad (CSV, TSV, JSONL,
+    JSON and Parquet, each exposed as a view), executes it, and saves the results to a file.
+    """
+    scratch_pad_dir = os.getenv("SCRATCH_PAD_DIR", "./scratchpad")
+
+    # Step 1: Open the scratchpad's DuckDB session, with a view per tabular file
+    try:
+        async_database = await open_scratchpad(scratch_pad_dir)
+    except Exception as e:
+        return {"status": "error", "message": f"Failed to open scratchpad views: {str(e)}"}
+    database = async_database.database
+    database.statement_timeout = personalization.get("sql_statement_timeout_seconds")
+    views = await async_database.run(database.view_files)
+
+    if not views:
+        return {
+            "status": "error",
+            "message": f"No CSV, JSONL, JSON or Parquet files found in '{scratch_pad_dir}'.",
+        }
+
+    # Step 2: Read the view definitions
+    try:
+        table_definitions = await async_database.read_tables()
+    except Exception as e:
+        return {"status": "error", "message": f"Failed to read views: {str(e)}"}
+
+    # Step 3: Generate SQL query, output format, and file name using structured_output_prompt
+    memory_content = memory_manager.get_xml_for_prompt(["*"])
+
+    prompt_structure = f"""
+<purpose>
+    Generate a DuckDB SQL query over the scratchpad files, an output format, and a suitable file name based on the user's prompt, available view definitions, and current memory content.
+</purpose>
+
+<instructions>
+    <instruction>Each view reads one file in the scratchpad directory. Query the views by name; never reference the files directly.</instruction>
+    <instruction>Based on the user's prompt, create an appropriate SQL query using the provided view definitions.</instruction>
+    <instruction>Determine whether to output the results in '.csv', '.jsonl' (JSON Lines), or '.json' (JSON array) format.</instruction>
+    <instruction>Decide on a clear and descriptive file name for saving the query results, ensuring the file extension matches the output format.</instruction>
+    <instruction>Respond only with the required fields: 'file_name', 'sql_query', and 'output_format'.</instruction>
+    <instruction>Consider the current memory content when generating the SQL query, if relevant.</instruction>
+</instructions>
+
+<table_definitions>
+{table_definitions}
+</table_definitions>
+
+<sql_dialect>
+duckdb
+</sql_dialect>
+
+{memory_content}
+
+<user_prompt>
+{prompt}
+</user_prompt>
+    """
+
+    response = structured_output_prompt(prompt_structure, GenerateSQLResponse)
+
+    # Step 4: Validate the SQL with an EXPLAIN dry-run and the cost guard
+    try:
+        guarded = await async_database.run(
+            guard_generated_sql, database, response.sql_query
+        )
+    except SQLValidationError as e:
+        return {"status": "error", "message": f"Generated SQL query is invalid: {str(e)}"}
+    except SQLCostError as e:
+        return {"status": "error", "message": f"Generated SQL query rejected: {str(e)}"}
+
+    # Step 5: Execute the SQL query over the files and export the results
+    file_path = os.path.join(scratch_pad_dir, response.file_name)
+
+    try:
+        export = await async_database.run(
+            export_sql_results,
+            database,
+            "scratchpad",
+            guarded["sql"],
+            file_path,
+            response.output_format,
+        )
     except Exception as e:
-        return {"status": "error", "message": f"Failed to save results: {str(e)}"}
+        return {
+            "status": "error",
+            "message": f"Failed to execute SQL query and save results: {str(e)}",
+        }
+
+    log_info(
+        f"📤 query_scratchpad() exported {export['rows']} rows over {len(views)} views "
+        f"via {export['engine']} ({export['rows_per_second']} rows/s, cache {export['cache']})",
+        style="bold cyan",
+    )
 
     return {
         "status": "success",
-        "message": f"SQL query executed successfully. Results saved to '{output_format_response.file_name}'.",
-        "file_name": file_selection_response.file,
-        "output_file": output_format_response.file_name,
-        "output_format": output_format_response.output_format,
+        "message": f"Scratchpad query results saved to {response.output_format} file '{response.file_name}'.",
+        "sql_query": guarded["sql"],
+        "views": views,
+        "export": export,
     }
 
 
@@ -832,7 +1228,7 @@ async def delete_file(prompt: str, force_delete: bool = False) -> dict:
     os.makedirs(scratch_pad_dir, exist_ok=True)
 
     # List available files in SCRATCH_PAD_DIR
-    available_files = os.listdir(scratch_pad_dir)
+    available_files = scratchpad_files(scratch_pad_dir)
     available_files_str = ", ".join(available_files)
 
     # Build the structured prompt to select the file and determine 'force_delete' status
@@ -885,10 +1281,172 @@ async def delete_file(prompt: str, force_delete: bool = False) -> dict:
     return result
 
 
+async def discuss_file_in_chunks(prompt: str, model: ModelName, file_path: str) -> dict:
+    """
+    Map-reduce discussion of a file too large for one prompt: the fast model takes notes on each
+    chunk concurrently, then the selected model answers from the notes. Notes don't depend on
+    the question and are cached by chunk content, so repeat questions about an unchanged file
+    only pay for the answer. Notes too long for one prompt are condensed in groups first, and
+    files needing more than DISCUSS_MAX_CHUNKS chunks are refused.
+    """
+
+    # Step 1: Refuse files that would take more than DISCUSS_MAX_CHUNKS model calls
+    too_large = {
+        "status": "File too large to discuss whole",
+        "file_name": os.path.basename(file_path),
+        "message": (
+            f"Discussing the whole file would take more than {DISCUSS_MAX_CHUNKS} chunks. "
+            "Ask about a page, a line range or a search pattern instead."
+        ),
+    }
+    if os.path.getsize(file_path) > DISCUSS_MAX_CHUNKS * DISCUSS_CHUNK_KB * 1024:
+        return too_large
+
+    # Step 2: Stream the file into chunks at headings, definitions and blank lines
+    def read_chunks() -> Optional[List[dict]]:
+        chunks = []
+        with PagedFile(file_path) as paged:
+            for chunk in iter_chunks(paged.iter_lines()):
+                if len(chunks) == DISCUSS_MAX_CHUNKS:
+                    return None
+                chunks.append(chunk)
+        return chunks
+
+    chunks = await asyncio.to_thread(read_chunks)
+    if chunks is None:
+        return too_large
+
+    # Step 3: Take notes on every chunk not already in the cache
+    notes_model = model_name_to_id[ModelName.fast_model]
+
+    def take_notes(chunk: dict) -> str:
+        take_notes_prompt = f"""
+<purpose>
+    Take notes on one chunk of a larger file so questions about the file can be answered from the notes alone.
+</purpose>
+
+<instructions>
+    <instruction>Summarize what this chunk contains and covers.</instruction>
+    <instruction>Keep the specifics a question could hinge on: names, numbers, dates, definitions, decisions and errors.</instruction>
+    <instruction>Don't speculate about the rest of the file.</instruction>
+    <instruction>Respond with the notes only, as concise bullet points.</instruction>
+</instructions>
+
+<file-chunk lines="{chunk['start_line']}-{chunk['end_line']}">
+{chunk['text']}
+</file-chunk>
+        """
+        return chat_prompt(take_notes_prompt, notes_model)
+
+    mapped = await chunk_mapper.map_all(chunks, take_notes, f"discuss-notes-v1:{notes_model}")
+    if not mapped["cached"] and not mapped["mapped"]:
+        return {
+            "status": "Failed to discuss file",
+            "file_name": os.path.basename(file_path),
+            "message": f"Taking notes failed for all {len(chunks)} chunks.",
+        }
+
+    # Step 4: Condense the notes in groups, level by level, until they fit DISCUSS_NOTES_MAX_KB
+    def as_note(span: dict, result: str) -> dict:
+        lines = f'{span["start_line"]}-{span["end_line"]}'
+        return {
+            "text": f'<chunk-notes lines="{lines}">\n{result}\n</chunk-notes>',
+            "start_line": span["start_line"],
+            "end_line": span["end_line"],
+        }
+
+    notes = [
+        as_note(chunk, result)
+        for chunk, result in zip(chunks, mapped["results"])
+        if result is not None
+    ]
+    max_notes_chars = DISCUSS_NOTES_MAX_KB * 1024
+
+    def condense_notes(group: dict) -> str:
+        condense_notes_prompt = f"""
+<purpose>
+    Condense consecutive notes on a larger file into one set of notes, so questions about the file can be answered from them alone.
+</purpose>
+
+<instructions>
+    <instruction>Merge the notes, dropping repetition but keeping the specifics a question could hinge on: names, numbers, dates, definitions, decisions and errors.</instruction>
+    <instruction>Keep line ranges next to the points they support.</instruction>
+    <instruction>Respond with the condensed notes only, as concise bullet points.</instruction>
+</instructions>
+
+<file-notes lines="{group['start_line']}-{group['end_line']}">
+{group['text']}
+</file-notes>
+        """
+        return chat_prompt(condense_notes_prompt, notes_model)
+
+    level = 0
+    while len(notes) > 1 and sum(len(note["text"]) for note in notes) > max_notes_chars:
+        level += 1
+        groups = group_notes(notes, max_notes_chars // 2)
+        condensed = await chunk_mapper.map_all(
+            groups, condense_notes, f"discuss-condense-v1:{notes_model}"
+        )
+        # A group that couldn't be condensed keeps its notes as they are
+        notes = [
+            as_note(group, result) if result is not None else group
+            for group, result in zip(groups, condensed["results"])
+        ]
+
+    # Step 5: Answer from the notes with the selected model
+    notes = "\n".join(note["text"] for note in notes)
+    memory_content = memory_manager.get_xml_for_prompt(["*"])
+    discuss_notes_prompt = f"""
+<purpose>
+    Discuss the content of a large file based on the user's prompt and the current memory content, using notes taken on each chunk of the file.
+</purpose>
+
+<instructions>
+    <instruction>Based on the user's prompt, the notes on the file, and the current memory content, provide a relevant discussion or analysis.</instruction>
+    <instruction>The notes are in file order; cite line ranges when they help the user find something.</instruction>
+    <instruction>If the notes don't cover what the user asks about, say so rather than guessing.</instruction>
+    <instruction>Keep responses short and concise. Keep response under 3 sentences for concise conversations.</instruction>
+</instructions>
+
+<file-notes file="{os.path.basename(file_path)}" chunks="{len(chunks)}" missing-chunks="{mapped['failed']}">
+{notes}
+</file-notes>
+
+{memory_content}
+
+<user-prompt>
+{prompt}
+</user-prompt>
+    """
+
+    discussion = chat_prompt(discuss_notes_prompt, model_name_to_id[model])
+
+    return {
+        "status": "File discussed",
+        "file_name": os.path.basename(file_path),
+        "range": f"whole file in {len(chunks)} chunks",
+        "discussion": discussion,
+        "chunks": len(chunks),
+        "chunks_cached": mapped["cached"],
+        "chunks_failed": mapped["failed"],
+        "reduce_levels": level,
+    }
+
+
 @timeit_decorator
-async def discuss_file(prompt: str, model: ModelName = ModelName.base_model) -> dict:
+async def discuss_file(
+    prompt: str,
+    model: ModelName = ModelName.base_model,
+    page: Optional[int] = None,
+    pattern: Optional[str] = None,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+) -> dict:
     """
     Discuss a file's content based on the user's prompt, considering the current memory content.
+    Only the requested slice of the file (a page, a line range or the lines matching a pattern)
+    is read and sent to the model. Files over FILE_PAGE_MAX_KB discussed without a slice are
+    read in full through discuss_file_in_chunks.
     """
     scratch_pad_dir = os.getenv("SCRATCH_PAD_DIR", "./scratchpad")
     focus_file = personalization.get("focus_file")
@@ -899,7 +1457,7 @@ async def discuss_file(prompt: str, model: ModelName = ModelName.base_model) ->
             return {"status": "Focus file not found", "file_name": focus_file}
     else:
         # List available files in SCRATCH_PAD_DIR
-        available_files = os.listdir(scratch_pad_dir)
+        available_files = scratchpad_files(scratch_pad_dir)
         available_files_str = ", ".join(available_files)
 
         # Build the structured prompt to select the file
@@ -934,9 +1492,16 @@ async def discuss_file(prompt: str, model: ModelName = ModelName.base_model) ->
 
         file_path = os.path.join(scratch_pad_dir, file_selection_response.file)
 
-    # Read the content of the file
-    with open(file_path, "r") as f:
-        file_content = f.read()
+    # Large files without a requested slice are discussed chunk by chunk
+    no_slice = page is None and pattern is None and start_line is None and end_line is None
+    if no_slice and os.path.getsize(file_path) > FILE_PAGE_MAX_KB * 1024:
+        return await discuss_file_in_chunks(prompt, model, file_path)
+
+    # Read only the requested slice of the file
+    file_slice = await asyncio.to_thread(
+        read_file_slice, file_path, page, pattern, start_line, end_line
+    )
+    file_content = file_slice["content"]
 
     # Get all memory content
     memory_content = memory_manager.get_xml_for_prompt(["*"])
@@ -954,7 +1519,7 @@ async def discuss_file(prompt: str, model: ModelName = ModelName.base_model) ->
     <instruction>Keep responses short and concise. Keep response under 3 sentences for concise conversations.</instruction>
 </instructions>
 
-<file-content>
+<file-content range="{file_slice['range']}">
 {file_content}
 </file-content>
 
@@ -971,6 +1536,7 @@ async def discuss_file(prompt: str, model: ModelName = ModelName.base_model) ->
     return {
         "status": "File discussed",
         "file_name": os.path.basename(file_path),
+        "range": file_slice["range"],
         "discussion": discussion,
     }
 
@@ -1047,12 +1613,19 @@ async def remove_variable_from_memory(prompt: str) -> dict:
 
 
 @timeit_decorator
-async def read_file_into_memory(prompt: str) -> dict:
+async def read_file_into_memory(
+    prompt: str,
+    page: Optional[int] = None,
+    pattern: Optional[str] = None,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+) -> dict:
     """
     Read a file from the scratch_pad_dir and save its content into memory based on the user's prompt.
+    With a page, line range or pattern only that slice is saved, under a key naming the slice.
     """
     scratch_pad_dir = os.getenv("SCRATCH_PAD_DIR", "./scratchpad")
-    available_files = os.listdir(scratch_pad_dir)
+    available_files = scratchpad_files(scratch_pad_dir)
     available_files_str = ", ".join(available_files)
 
     # Build the structured prompt to select the file
@@ -1094,13 +1667,21 @@ async def read_file_into_memory(prompt: str) -> dict:
         }
 
     try:
-        with open(file_path, "r") as file:
-            content = file.read()
+        file_slice = await asyncio.to_thread(
+            read_file_slice, file_path, page, pattern, start_line, end_line
+        )
+        if pattern and not file_slice["matches"]:
+            return {"status": "error", "message": f"No lines in '{file_selection_response.file}' match '{pattern}'"}
+        key = file_selection_response.file
+        if file_slice["range"] != "whole file":
+            key = f"{key} ({file_slice['range']})"
 
-        memory_manager.upsert(file_selection_response.file, content)
+        memory_manager.upsert(key, file_slice["content"])
         return {
             "status": "success",
-            "message": f"File '{file_selection_response.file}' content saved to memory",
+            "message": f"File '{file_selection_response.file}' {file_slice['range']} saved to memory as '{key}'",
+            "key": key,
+            "total_pages": file_slice.get("total_pages"),
         }
     except Exception as e:
         return {
@@ -1111,23 +1692,33 @@ async def read_file_into_memory(prompt: str) -> dict:
 
 async def read_dir_into_memory() -> dict:
     """
-    Read all files from the scratch_pad_dir and save their content into memory.
+    Read all text files from the scratch_pad_dir and save their content into memory.
     """
     scratch_pad_dir = os.getenv("SCRATCH_PAD_DIR", "./scratchpad")
+    index_path = os.path.join(scratch_pad_dir, ".cache", "ingest_index.json")
 
     try:
-        files = os.listdir(scratch_pad_dir)
-        for file_name in files:
-            file_path = os.path.join(scratch_pad_dir, file_name)
-            if os.path.isfile(file_path):
-                with open(file_path, "r") as file:
-                    content = file.read()
-                memory_manager.upsert(file_name, content)
+        # Step 1: Read new and changed text files concurrently, skipping binaries and oversized files
+        report = await asyncio.to_thread(
+            ingest_directory,
+            scratch_pad_dir,
+            load_ingest_index(index_path),
+            set(memory_manager.list_keys()),
+        )
+
+        # Step 2: Save every file to memory in one transaction
+        with memory_manager.transaction():
+            memory_manager.upsert_many(report["contents"])
+        save_ingest_index(index_path, report["index"])
 
         return {
             "status": "success",
-            "message": f"All files from '{scratch_pad_dir}' have been read into memory",
-            "files_read": len(files),
+            "message": f"All text files from '{scratch_pad_dir}' have been read into memory",
+            "files_read": len(report["contents"]),
+            "files_unchanged": len(report["unchanged"]),
+            "files_skipped": report["skipped"],
+            "bytes_read": report["bytes_read"],
+            "duration": report["duration"],
         }
     except Exception as e:
         return {
@@ -1139,55 +1730,94 @@ async def read_dir_into_memory() -> dict:
 @timeit_decorator
 async def scrap_to_file_from_clipboard() -> dict:
     """
-    Get content from clipboard, validate it's a URL, generate a file name,
-    scrape the URL, and save the content to a file in the scratch_pad_dir.
+    Get content from clipboard, find every URL in it, generate file names,
+    scrape the URLs concurrently, and save each page's content to a file in the scratch_pad_dir.
     """
     scratch_pad_dir = os.getenv("SCRATCH_PAD_DIR", "./scratchpad")
 
     try:
-        # Get content from clipboard
-        url = pyperclip.paste().strip()
-
-        # Validate URL (simple check, can be improved)
-        if not url.startswith(("http://", "https://")):
+        # Step 1: Get URLs from clipboard
+        urls = extract_urls(pyperclip.paste())
+        if not urls:
             return {
                 "status": "error",
-                "message": "Clipboard content is not a valid URL",
+                "message": "Clipboard content does not contain a valid URL",
             }
 
-        # Generate file name
+        # Step 2: Generate file names while the pages are scraped
+        url_list = "\n".join(f"<url>{url}</url>" for url in urls)
         file_name_prompt = f"""
 <purpose>
-    Generate a suitable file name for the content of this URL: {url}
+    Generate a suitable file name for the content of each of these URLs, in the same order.
 </purpose>
 
 <instructions>
-    <instruction>Create a short, descriptive file name based on the URL.</instruction>
+    <instruction>Create a short, descriptive file name based on each URL.</instruction>
     <instruction>Use lowercase letters, numbers, and underscores only.</instruction>
     <instruction>Include the .md extension at the end.</instruction>
+    <instruction>Return exactly one unique file name per URL.</instruction>
 </instructions>
+
+<urls>
+{url_list}
+</urls>
         """
 
-        class FileNameResponse(BaseModel):
-            file_name: str
+        class FileNamesResponse(BaseModel):
+            file_names: List[str]
 
-        file_name_response = structured_output_prompt(
-            file_name_prompt, FileNameResponse
+        file_names_response, results = await asyncio.gather(
+            asyncio.to_thread(structured_output_prompt, file_name_prompt, FileNamesResponse),
+            scrape_service.scrape_many(urls),
+            return_exceptions=True,
         )
-        file_name = file_name_response.file_name
-
-        # Scrape URL
-        content = scrap_url_clean(url)
-
-        # Save to file
-        file_path = os.path.join(scratch_pad_dir, file_name)
-        with open(file_path, "w") as file:
-            file.write(content)
-
+        if isinstance(results, BaseException):
+            raise results
+        if isinstance(file_names_response, BaseException):
+            # The pages are already scraped; save them under generic names rather than losing them
+            log_info(
+                f"⚠️ scrap_to_file_from_clipboard() could not generate file names: {file_names_response}",
+                style="bold yellow",
+            )
+            file_names = []
+        else:
+            file_names = file_names_response.file_names
+        if len(file_names) != len(urls) or len(set(file_names)) != len(file_names):
+            file_names = [f"scrape_{i + 1}.md" for i in range(len(urls))]
+
+        # Step 3: Save to files
+        saved = []
+        failed = []
+        for file_name, result in zip(file_names, results):
+            if "error" in result:
+                failed.append({"url": result["url"], "error": result["error"]})
+                continue
+            file_path = os.path.join(scratch_pad_dir, file_name)
+            with open(file_path, "w") as file:
+                file.write(result["content"])
+            saved.append(
+                {
+                    "url": result["url"],
+                    "file_name": file_name,
+                    "cache": result["cache"],
+                    "path": result["path"],
+                    "duration": result["duration"],
+                }
+            )
+
+        if not saved:
+            return {
+                "status": "error",
+                "message": f"Failed to scrape URL and save to file: {failed[0]['error']}",
+                "failed": failed,
+            }
         return {
             "status": "success",
-            "message": f"Content scraped and saved to {file_path}",
-            "file_name": file_name,
+            "message": f"Content of {len(saved)} URL(s) scraped and saved to {scratch_pad_dir}"
+            + (f"; {len(failed)} URL(s) failed" if failed else ""),
+            "file_name": saved[0]["file_name"],
+            "files": saved,
+            "failed": failed,
         }
     except Exception as e:
         return {
@@ -1275,7 +1905,7 @@ async def runnable_code_check(prompt: str) -> dict:
 </instructions>
 
 <available-files>
-    {", ".join(os.listdir(scratch_pad_dir))}
+    {", ".join(scratchpad_files(scratch_pad_dir))}
 </available-files>
 
 <user-prompt>
@@ -1306,8 +1936,29 @@ async def runnable_code_check(prompt: str) -> dict:
     except Exception as e:
         return {"status": "Error", "message": f"Failed to read the file: {str(e)}"}
 
-    # Step 2: Determine if the code is runnable
-    check_runnable_prompt = f"""
+    # Step 2: Check the code locally; the LLM is only asked when that is inconclusive
+    code_check = {"runnable": None, "issues": [], "checks": []}
+    if file_path.endswith(".py"):
+        code_check = await check_code(
+            code_content,
+            file_path,
+            run_dry_import=personalization.get("code_check_dry_import", False),
+        )
+        log_info(
+            f"🔎 Local code check ({', '.join(code_check['checks'])}): {code_check['runnable']}",
+            style="dim",
+        )
+
+    if code_check["runnable"]:
+        return {
+            "status": "success",
+            "message": "The code is runnable.",
+            "checks": code_check["checks"],
+        }
+
+    # Step 3: Ask the LLM only if the local checks couldn't decide
+    if code_check["runnable"] is None:
+        check_runnable_prompt = f"""
 <purpose>
     Determine if the following code is runnable.
 </purpose>
@@ -1325,12 +1976,16 @@ async def runnable_code_check(prompt: str) -> dict:
 {memory_content}
 """
 
-    is_runnable_response = structured_output_prompt(check_runnable_prompt, IsRunnable)
+        is_runnable_response = structured_output_prompt(check_runnable_prompt, IsRunnable)
 
-    if is_runnable_response.code_is_runnable:
-        return {"status": "success", "message": "The code is runnable."}
+        if is_runnable_response.code_is_runnable:
+            return {"status": "success", "message": "The code is runnable."}
 
-    # Step 3: If not runnable, get the necessary changes
+    detected_errors = "\n".join(
+        f"    <error>{issue}</error>" for issue in code_check["issues"]
+    )
+
+    # Step 4: If not runnable, get the necessary changes
     make_runnable_prompt = f"""
 <purpose>
     Provide the necessary changes to make the following code runnable.
@@ -1341,12 +1996,17 @@ async def runnable_code_check(prompt: str) -> dict:
     <instruction>Provide a list of change descriptions and the full updated code.</instruction>
     <instruction>Do not include any additional commentary.</instruction>
     <instruction>Consider the current memory content when applying changes.</instruction>
+    <instruction>If detected errors are listed, fix every one of them.</instruction>
 </instructions>
 
 <code-content>
 {code_content}
 </code-content>
 
+<detected-errors>
+{detected_errors}
+</detected-errors>
+
 {memory_content}
 """
 
@@ -1365,6 +2025,7 @@ async def runnable_code_check(prompt: str) -> dict:
         "status": "code_updated",
         "message": "The code was not runnable. Necessary changes have been applied.",
         "changes": make_runnable_response.changes_described,
+        "detected_errors": code_check["issues"],
         "file_name": file_selection_response.file,
     }
 
@@ -1390,7 +2051,7 @@ async def run_python(prompt: str) -> dict:
 </instructions>
 
 <available-files>
-    {", ".join([f for f in os.listdir(scratch_pad_dir) if f.endswith('.py')])}
+    {", ".join([f for f in scratchpad_files(scratch_pad_dir) if f.endswith('.py')])}
 </available-files>
 
 <memory-content>
@@ -1429,8 +2090,10 @@ async def run_python(prompt: str) -> dict:
     except Exception as e:
         return {"status": "error", "message": f"Failed to read the file: {str(e)}"}
 
-    # Execute the Python code using run_uv_script
-    output = run_uv_script(python_code)
+    # Execute the Python code on a warm worker, bounded by the script limits. Scratchpad
+    # scripts keep the assistant's working directory so their relative paths still work.
+    result = await run_script(python_code, cwd=os.getcwd())
+    output = result.output
 
     # Save the output to a file with '_output' suffix
     output_file_name = os.path.splitext(file_selection_response.file)[0] + "_output.txt"
@@ -1438,19 +2101,14 @@ async def run_python(prompt: str) -> dict:
     with open(output_file_path, "w") as f:
         f.write(output)
 
-    # Determine success based on presence of errors
-    if "Traceback" in output or "Error" in output:
-        success = False
-        error_message = output
-    else:
-        success = True
-        error_message = None
-
     return {
-        "status": "success" if success else "failure",
-        "error": error_message,
+        "status": "success" if result.success else "failure",
+        "error": None if result.success else output,
         "file_name": file_selection_response.file,
         "output_file": output_file_name,
+        "exit_code": result.exit_code,
+        "duration": result.duration,
+        "peak_memory_mb": result.peak_memory_mb,
     }
 
 
@@ -1459,7 +2117,7 @@ async def create_python_chart(prompt: str, chart_type: str) -> dict:
     scratch_pad_dir = os.getenv("SCRATCH_PAD_DIR", "./scratchpad")
 
     # List available CSV files
-    available_files = os.listdir(scratch_pad_dir)
+    available_files = scratchpad_files(scratch_pad_dir)
     csv_files = [f for f in available_files if f.endswith(".csv")]
     if not csv_files:
         return {
@@ -1508,27 +2166,77 @@ async def create_python_chart(prompt: str, chart_type: str) -> dict:
             "message": f"CSV file '{file_selection_response.file}' does not exist in '{scratch_pad_dir}'.",
         }
 
-    # Step 2: Read and analyze the CSV file
+    # Step 2: Profile the CSV file from a bounded sample, reusing the cached profile if it hasn't changed
     try:
-        df = pd.read_csv(file_path)
-        csv_preview = df.head(10).to_string(index=False)
-        csv_info = df.info(verbose=True, memory_usage="deep", buf=io.StringIO())
+        csv_profile = await asyncio.to_thread(
+            load_csv_profile,
+            file_path,
+            os.path.join(scratch_pad_dir, ".cache", "csv_profiles"),
+        )
+        csv_preview = csv_profile["preview"]
+        csv_info = format_csv_profile(csv_profile)
     except Exception as e:
         return {
             "status": "error",
             "message": f"Failed to read or analyze the CSV file: {str(e)}",
         }
 
-    # Step 3: Generate Python code for the chart
     memory_content = memory_manager.get_xml_for_prompt(["*"])
+    csv_stem = os.path.splitext(file_selection_response.file)[0]
+    chart_code_file_name = f"{csv_stem}_{chart_type}_chart.py"
+    chart_code_file_path = os.path.join(scratch_pad_dir, chart_code_file_name)
+    image_path = os.path.join(os.path.abspath(scratch_pad_dir), f"{csv_stem}_{chart_type}_chart.png")
 
-    code_generation_prompt = f"""
+    # Step 3: Let the LLM pick columns and options for the chart template
+    chart_spec_prompt = f"""
+<purpose>
+    Choose the columns and options to draw a {chart_type} chart from the selected CSV file, based on the user's prompt.
+</purpose>
+
+<instructions>
+    <instruction>Only use column names exactly as they appear in the CSV preview.</instruction>
+    <instruction>x_column holds the categories (bar, pie), the x axis (line, scatter) or nothing for a histogram.</instruction>
+    <instruction>y_columns are the values to plot or bin. Leave it empty for a bar or pie chart of how often each x_column value occurs.</instruction>
+    <instruction>Use aggregation to combine rows that share an x_column value, and x_time_unit to group a date column by day, week, month, quarter or year.</instruction>
+    <instruction>filter_expression is an optional pandas DataFrame.query expression to select rows.</instruction>
+    <instruction>Use sort and top_n for requests like "top 10".</instruction>
+    <instruction>Set supported to false if the chart needs anything these options can't express.</instruction>
+</instructions>
+
+<csv-preview>
+{csv_preview}
+</csv-preview>
+
+<csv-info>
+{csv_info}
+</csv-info>
+
+<user-prompt>
+    {prompt}
+</user-prompt>
+
+{memory_content}
+    """
+
+    chart_spec = structured_output_prompt(
+        chart_spec_prompt, ChartSpec, llm_model=model_name_to_id[ModelName.fast_model]
+    )
+    problems = spec_problems(chart_spec, ChartType(chart_type), list(csv_profile["columns"]))
+
+    if not problems:
+        engine = "template"
+        code = chart_script(chart_spec, ChartType(chart_type), os.path.abspath(file_path), image_path)
+    else:
+        # Step 4: Fall back to generating the code for charts the template can't draw
+        log_info(f"📊 Generating chart code: {' '.join(problems)}", style="dim")
+        engine = "codegen"
+        code_generation_prompt = f"""
 <purpose>
     Generate Python code using matplotlib to create a {chart_type} chart based on the user's prompt, the selected CSV file, and the memory content.
 </purpose>
 
 <instructions>
-    <instruction>Use pandas to read the CSV file located at '{file_path}'.</instruction>
+    <instruction>Use pandas to read the CSV file located at '{os.path.abspath(file_path)}'.</instruction>
     <instruction>Generate the Python code to create a {chart_type} chart according to the user's prompt.</instruction>
     <instruction>The code should be complete and runnable, starting with necessary imports.</instruction>
     <instruction>Do not include any additional commentary or markdown formatting.</instruction>
@@ -1536,7 +2244,7 @@ async def create_python_chart(prompt: str, chart_type: str) -> dict:
     <instruction>Consider the columns, data types, and statistics when creating the chart.</instruction>
     <instruction>Ensure the chart is properly labeled and formatted for clarity.</instruction>
     <instruction>Do not wrap in backticks or triple quotes. We're going to execute this code immediately so it must be executable python code.</instruction>
-    <instruction>Your code should save an image back into the scratchpad directory.</instruction>
+    <instruction>Your code should save the image to '{image_path}'.</instruction>
     <instruction>After you save the image print out the file path so we can find it.</instruction>
 </instructions>
 
@@ -1555,30 +2263,29 @@ async def create_python_chart(prompt: str, chart_type: str) -> dict:
 {memory_content}
     """
 
-    # Call the LLM to generate the Python code
-    response = chat_prompt(
-        code_generation_prompt, model_name_to_id[ModelName.reasoning_model]
-    )
-
-    response = parse_markdown_backticks(response)
+        # Call the LLM to generate the Python code
+        response = chat_prompt(
+            code_generation_prompt, model_name_to_id[ModelName.reasoning_model]
+        )
 
-    # Save the generated code to a file
-    chart_code_file_name = (
-        f"{os.path.splitext(file_selection_response.file)[0]}_{chart_type}_chart.py"
-    )
-    chart_code_file_path = os.path.join(scratch_pad_dir, chart_code_file_name)
+        code = parse_markdown_backticks(response)
 
+    # Save the chart code to a file
     with open(chart_code_file_path, "w") as f:
-        f.write(response)
+        f.write(code)
 
-    # now execute the code
-    output = run_uv_script(response)
+    # Step 5: Render on a warm worker (Agg backend); it runs in its own working directory
+    result = await run_script(code)
 
     return {
-        "status": "success",
+        "status": "success" if result.success else "failure",
         "message": f"Python code for {chart_type} chart generated and saved to '{chart_code_file_name}'. ",
         "file_name": chart_code_file_name,
-        "execution_output": output,
+        "image_path": image_path if result.success and os.path.exists(image_path) else None,
+        "engine": engine,
+        "execution_output": result.output,
+        "exit_code": result.exit_code,
+        "duration": result.duration,
     }
 
 
@@ -1608,10 +2315,31 @@ function_map = {
     "generate_sql_save_to_file": generate_sql_save_to_file,
     "generate_sql_and_execute": generate_sql_and_execute,
     "run_sql_file": run_sql_file,
+    "query_scratchpad": query_scratchpad,
     "create_python_chart": create_python_chart,
 }
 
 # Tools array for session initialization
+# Optional slice of a file for the tools that read one, so only that part is decoded and returned
+file_slice_properties = {
+    "page": {
+        "type": "integer",
+        "description": "1-based page of the file to read, e.g. 3 for 'page 3'. Large files are read a page at a time; responses report total_pages.",
+    },
+    "pattern": {
+        "type": "string",
+        "description": "Read only the lines matching this text or regex (case-insensitive), with a few lines of context around each.",
+    },
+    "start_line": {
+        "type": "integer",
+        "description": "1-based first line to read. Negative values read that many lines from the end of the file, e.g. -20 for the last 20 lines.",
+    },
+    "end_line": {
+        "type": "integer",
+        "description": "1-based last line to read, inclusive. Used with start_line.",
+    },
+}
+
 tools = [
     {
         "type": "function",
@@ -1792,6 +2520,7 @@ tools = [
                     ],
                     "description": "The model to use for discussing the file content. Defaults to 'base_model' if not explicitlyspecified.",
                 },
+                **file_slice_properties,
             },
             "required": ["prompt"],  # 'model' is optional
         },
@@ -1837,6 +2566,7 @@ tools = [
                     "type": "string",
                     "description": "The user's prompt describing the file to read into memory.",
                 },
+                **file_slice_properties,
             },
             "required": ["prompt"],
         },
@@ -1873,7 +2603,7 @@ tools = [
     {
         "type": "function",
         "name": "scrap_to_file_from_clipboard",
-        "description": "Gets a URL from the clipboard, scrapes its content, and saves it to a file in the scratch_pad_dir.",
+        "description": "Gets one or more URLs from the clipboard, scrapes their content, and saves each page to a file in the scratch_pad_dir.",
         "parameters": {
             "type": "object",
             "properties": {},
@@ -1932,7 +2662,7 @@ tools = [
     {
         "type": "function",
         "name": "ingest_file",
-        "description": "Selects a file based on the user's prompt, reads its content, and returns the file data.",
+        "description": "Selects a file based on the user's prompt, reads its content, and returns the file data. Large files are returned a page at a time; ask for a page, a line range, or lines matching a pattern.",
         "parameters": {
             "type": "object",
             "properties": {
@@ -1940,6 +2670,7 @@ tools = [
                     "type": "string",
                     "description": "The user's prompt describing which file to ingest.",
                 },
+                **file_slice_properties,
             },
             "required": ["prompt"],
         },
@@ -1994,4 +2725,19 @@ tools = [
             "required": ["prompt"],
         },
     },
+    {
+        "type": "function",
+        "name": "query_scratchpad",
+        "description": "Generates and executes a DuckDB SQL query directly over the CSV, JSONL, JSON, and Parquet files in the scratch_pad_dir, and saves the results to a file.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "prompt": {
+                    "type": "string",
+                    "description": "The user's prompt describing what to query from the scratchpad files.",
+                },
+            },
+            "required": ["prompt"],
+        },
+    },
 ]
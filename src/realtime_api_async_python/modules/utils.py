@@ -7,9 +7,7 @@ import asyncio
 from datetime import datetime
 from enum import Enum
 import pyaudio
-from firecrawl import FirecrawlApp
-import tempfile
-import subprocess
+from .scrape_service import scrape_service
 
 RUN_TIME_TABLE_LOG_JSON = "runtime_time_table.jsonl"
 
@@ -131,10 +129,7 @@ def scrap_url(url: str, formats: list = ["markdown", "html"]) -> dict:
     Returns:
         dict: The scrape status returned by FirecrawlApp.
     """
-    api_key = os.getenv("FIRECRAWL_API_KEY")
-    if not api_key:
-        raise ValueError("FIRECRAWL_API_KEY environment variable not set")
-    app = FirecrawlApp(api_key=api_key)
+    app = scrape_service.firecrawl_client()
     scrape_status = app.scrape_url(url, params={"formats": formats})
     return scrape_status
 
@@ -142,6 +137,8 @@ def scrap_url(url: str, formats: list = ["markdown", "html"]) -> dict:
 def scrap_url_clean(url: str) -> str:
     """
     Wrapper method that scrapes a URL and extracts the content as a single string from the HTML body.
+    Results are cached by normalized URL (see scrape_service). This blocks on the network, so
+    async code should await scrap_url_clean_async instead.
 
     Args:
         url (str): The URL of the website to scrape.
@@ -149,36 +146,9 @@ def scrap_url_clean(url: str) -> str:
     Returns:
         str: A single string containing all the extracted content.
     """
-    scrape_result = scrap_url(url)
+    return scrape_service.scrape_sync(url)["content"]
 
-    return scrape_result["markdown"]
 
-
-def run_uv_script(python_code: str) -> str:
-    """
-    Create a temporary Python script with the given code and run it using Astral UV.
-    Returns the response from running the script.
-
-    :param python_code: A Python code snippet as a string.
-    :return: The response from running the script.
-    """
-    # Create a temporary file to hold the Python script
-    with tempfile.NamedTemporaryFile(suffix=".py", delete=False) as temp_file:
-        # Write the provided Python code to the temporary file
-        temp_file.write(python_code.encode("utf-8"))
-        temp_file_path = temp_file.name
-
-    # Command to run the script using Astral UV
-    uv_command = ["uv", "run", temp_file_path]
-
-    try:
-        # Run the uv command and capture the output
-        result = subprocess.run(uv_command, capture_output=True, text=True)
-
-        # Return the stdout and stderr from the uv execution
-        return result.stdout + result.stderr
-    except Exception as e:
-        return str(e)
-    finally:
-        # Cleanup: remove the temporary file after execution
-        temp_file.close()
+async def scrap_url_clean_async(url: str) -> str:
+    """scrap_url_clean for async callers: the scrape runs on a worker thread, not the event loop."""
+    return (await scrape_service.scrape(url))["content"]
@@ -0,0 +1,77 @@
+import asyncio
+import sqlite3
+import pytest
+from ..modules.async_database import AsyncDatabase
+from ..modules.database import SQLiteDatabase, DuckDBDatabase
+
+SLOW_SQLITE_SQL = (
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT count(*) FROM c"
+)
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    connection = sqlite3.connect(db_path)
+    connection.execute("CREATE TABLE Users (UserID INTEGER, FirstName TEXT)")
+    connection.executemany("INSERT INTO Users VALUES (?, ?)", [(1, "John"), (2, "Jane")])
+    connection.commit()
+    connection.close()
+    return db_path
+
+
+async def test_sqlite_calls_run_on_the_connecting_thread(sqlite_path):
+    database = AsyncDatabase(SQLiteDatabase(), "sqlite")
+    await database.connect(sqlite_path)
+
+    # sqlite3 raises ProgrammingError if a connection is used from another thread
+    df = await database.execute_sql("SELECT * FROM Users ORDER BY UserID")
+    assert df["FirstName"].tolist() == ["John", "Jane"]
+    assert "CREATE TABLE Users" in await database.read_tables()
+    assert [span["operation"] for span in database.spans] == [
+        "connect",
+        "execute_sql",
+        "read_tables",
+    ]
+    assert all(span["status"] == "ok" for span in database.spans)
+
+
+async def test_event_loop_stays_responsive(sqlite_path):
+    database = AsyncDatabase(SQLiteDatabase(), "sqlite")
+    await database.connect(sqlite_path)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker_task = asyncio.create_task(ticker())
+    query = asyncio.create_task(database.execute_sql(SLOW_SQLITE_SQL))
+    await asyncio.sleep(0.2)
+    query.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await query
+    ticker_task.cancel()
+
+    assert ticks >= 5
+    assert database.spans[-1]["status"] == "cancelled"
+    # The interrupted connection is idle and usable again
+    assert len(await database.execute_sql("SELECT * FROM Users")) == 2
+
+
+async def test_cancel_interrupts_duckdb_query():
+    database = AsyncDatabase(DuckDBDatabase(), "duckdb")
+    await database.connect(":memory:")
+
+    query = asyncio.create_task(
+        database.execute_sql("SELECT count(*) FROM range(100000) a, range(100000) b")
+    )
+    await asyncio.sleep(0.2)
+    query.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(query, timeout=5)
+
+    assert (await database.execute_sql("SELECT 42 AS answer"))["answer"][0] == 42
+    await database.close()
@@ -0,0 +1,63 @@
+import os
+from ..modules.bulk_ingest import ingest_directory, load_ingest_index, looks_binary, save_ingest_index
+
+
+def test_binary_sniffing():
+    assert looks_binary(b"\x89PNG\r\n\x1a\n\x00\x00")
+    assert looks_binary(b"text with a \x00 byte")
+    assert looks_binary(bytes(range(1, 32)) * 10)
+    assert not looks_binary("héllo, wörld\n".encode("utf-8"))
+    # A multi-byte character cut off by the sniff window
+    assert not looks_binary("naïve".encode("utf-8")[:3])
+    assert not looks_binary(b"")
+
+
+def test_ingest_reads_text_and_skips_binaries_and_oversized_files(tmp_path):
+    (tmp_path / "notes.md").write_text("# Notes\n")
+    (tmp_path / "data.csv").write_text("a,b\n1,2\n")
+    (tmp_path / "diagram.png").write_bytes(b"\x89PNG\r\n\x1a\n" + bytes(100))
+    (tmp_path / "big.log").write_text("x" * 2000)
+    (tmp_path / "z_last.txt").write_text("y" * 600)
+    (tmp_path / ".hidden").write_text("secret")
+    (tmp_path / ".cache").mkdir()
+
+    report = ingest_directory(str(tmp_path), {}, set(), max_file_bytes=1000, max_total_bytes=500)
+
+    assert report["contents"] == {"data.csv": "a,b\n1,2\n", "notes.md": "# Notes\n"}
+    assert report["skipped"] == [
+        {"file": ".hidden", "reason": "hidden"},
+        {"file": "big.log", "reason": "too_large", "size": 2000},
+        {"file": "z_last.txt", "reason": "total_limit", "size": 600},
+        {"file": "diagram.png", "reason": "binary"},
+    ]
+    assert report["bytes_read"] == 8 + 8 + 108
+    assert set(report["index"]) == {"data.csv", "notes.md"}
+
+
+def test_unchanged_files_are_skipped_by_stat_then_by_hash(tmp_path):
+    directory = tmp_path / "scratchpad"
+    directory.mkdir()
+    notes = directory / "notes.md"
+    notes.write_text("first")
+    (directory / "todo.txt").write_text("todo")
+    index_path = str(tmp_path / "index.json")
+
+    first = ingest_directory(str(directory), load_ingest_index(index_path), set())
+    save_ingest_index(index_path, first["index"])
+    known_keys = set(first["contents"])
+
+    again = ingest_directory(str(directory), load_ingest_index(index_path), known_keys)
+    assert again["contents"] == {} and again["bytes_read"] == 0
+    assert again["unchanged"] == ["notes.md", "todo.txt"]
+
+    # Touched but identical content is read and hashed, but not re-sent to memory
+    os.utime(notes, ns=(0, os.stat(notes).st_mtime_ns + 1000))
+    (directory / "todo.txt").write_text("done")
+    touched = ingest_directory(str(directory), load_ingest_index(index_path), known_keys)
+    assert touched["contents"] == {"todo.txt": "done"}
+    assert touched["unchanged"] == ["notes.md"]
+    save_ingest_index(index_path, touched["index"])
+
+    # A file missing from memory is always read
+    missing = ingest_directory(str(directory), load_ingest_index(index_path), {"todo.txt"})
+    assert missing["contents"] == {"notes.md": "first"}
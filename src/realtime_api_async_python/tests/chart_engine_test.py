@@ -0,0 +1,69 @@
+import sys
+import pytest
+from ..modules.chart_engine import ChartSpec, ChartType, chart_script, spec_problems
+from ..modules.script_runner import run_command
+
+COLUMNS = ["OrderDate", "State", "Revenue", "Quantity"]
+
+
+def make_spec(**overrides) -> ChartSpec:
+    values = {
+        "supported": True,
+        "x_column": "State",
+        "y_columns": ["Revenue"],
+        "aggregation": "sum",
+        "x_time_unit": None,
+        "filter_expression": None,
+        "sort": "descending",
+        "top_n": None,
+        "bins": None,
+        "title": "Revenue by state",
+        "x_label": None,
+        "y_label": None,
+    }
+    values.update(overrides)
+    return ChartSpec(**values)
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "orders.csv"
+    rows = ["OrderDate,State,Revenue,Quantity"]
+    for day in range(1, 61):
+        month = 1 + (day - 1) // 30
+        rows.append(f"2024-{month:02d}-{(day - 1) % 28 + 1:02d},{'CA' if day % 3 else 'NY'},{day * 10.5},{day % 7}")
+    path.write_text("\n".join(rows) + "\n")
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "chart_type, overrides",
+    [
+        (ChartType.BAR, {"top_n": 5}),
+        (ChartType.PIE, {"y_columns": [], "aggregation": "count"}),
+        (ChartType.LINE, {"x_column": "OrderDate", "x_time_unit": "month", "sort": "none"}),
+        (ChartType.SCATTER, {"x_column": "Quantity", "aggregation": "none"}),
+        (ChartType.HISTOGRAM, {"x_column": None, "bins": 10, "filter_expression": "State == 'CA'"}),
+    ],
+)
+async def test_template_renders_every_chart_type(tmp_path, csv_path, chart_type, overrides):
+    spec = make_spec(**overrides)
+    image_path = str(tmp_path / f"{chart_type.value}.png")
+    assert spec_problems(spec, chart_type, COLUMNS) == []
+
+    script_path = tmp_path / "chart.py"
+    script_path.write_text(chart_script(spec, chart_type, csv_path, image_path))
+    result = await run_command([sys.executable, str(script_path)], cwd=str(tmp_path))
+
+    assert result.success, result.output
+    assert result.stdout.strip() == image_path
+    with open(image_path, "rb") as image:
+        assert image.read(8) == b"\x89PNG\r\n\x1a\n"
+
+
+def test_spec_problems_send_unusual_charts_to_code_generation():
+    assert spec_problems(make_spec(supported=False), ChartType.BAR, COLUMNS)
+    assert spec_problems(make_spec(y_columns=["Profit"]), ChartType.BAR, COLUMNS) == [
+        "Unknown column 'Profit'."
+    ]
+    assert spec_problems(make_spec(x_column=None), ChartType.SCATTER, COLUMNS)
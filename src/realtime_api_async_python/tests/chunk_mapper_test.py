@@ -0,0 +1,86 @@
+import threading
+import time
+from ..modules.chunk_mapper import ChunkMapper, group_notes, iter_chunks, split_into_chunks
+from ..modules.paged_reader import PagedFile
+
+
+def section(title, paragraphs):
+    lines = [f"# {title}\n", "\n"]
+    for i in range(paragraphs):
+        lines += [f"Paragraph {i} of {title}, with some words.\n", "\n"]
+    return lines
+
+
+def test_chunks_cut_at_headings_and_cover_every_line():
+    lines = section("Intro", 3) + section("Usage", 3) + section("Notes", 3)
+
+    chunks = split_into_chunks(lines, max_chars=200)
+
+    assert [chunk["text"].splitlines()[0] for chunk in chunks] == ["# Intro", "# Usage", "# Notes"]
+    assert "".join(chunk["text"] for chunk in chunks) == "".join(lines)
+    assert [(chunk["start_line"], chunk["end_line"]) for chunk in chunks] == [(1, 8), (9, 16), (17, 24)]
+
+
+def test_chunks_fall_back_to_blank_lines_and_long_lines():
+    paragraphs = []
+    for i in range(20):
+        paragraphs += [f"Sentence {i} of a long section without headings.\n", "\n"]
+    chunks = split_into_chunks(paragraphs + ["x" * 500 + "\n", "tail\n"], max_chars=200)
+
+    assert all(chunk["text"].endswith("\n\n") for chunk in chunks[:-2])
+    assert all(len(chunk["text"]) <= 200 for chunk in chunks[:-2])
+    assert chunks[-2]["text"] == "x" * 500 + "\n" and chunks[-1]["text"] == "tail\n"
+
+
+async def test_map_all_runs_concurrently_and_caches_by_content(tmp_path):
+    chunks = split_into_chunks(section("A", 3) + section("B", 3) + section("C", 3), max_chars=200)
+    calls = []
+    lock = threading.Lock()
+
+    def take_notes(chunk):
+        time.sleep(0.2)
+        with lock:
+            calls.append(chunk["start_line"])
+        if chunk["start_line"] == 17:
+            raise RuntimeError("rate limited")
+        return f"notes on {chunk['text'].splitlines()[0]}"
+
+    mapper = ChunkMapper(str(tmp_path / "notes"), concurrency=3)
+    start_time = time.perf_counter()
+    first = await mapper.map_all(chunks, take_notes, "notes-v1")
+    assert time.perf_counter() - start_time < 0.4
+    assert first["results"] == ["notes on # A", "notes on # B", None]
+    assert (first["cached"], first["mapped"], first["failed"]) == (0, 2, 1)
+
+    # Only the failed chunk is retried; a different step doesn't share the cache
+    second = await mapper.map_all(chunks, take_notes, "notes-v1")
+    assert (second["cached"], second["failed"]) == (2, 1)
+    assert sorted(calls) == [1, 9, 17, 17]
+    other = await mapper.map_all(chunks[:1], take_notes, "answers-v1")
+    assert other["mapped"] == 1
+
+
+def test_chunks_stream_from_a_paged_file(tmp_path):
+    lines = section("Intro", 3) + section("Usage", 3) + section("Notes", 3)
+    file_path = tmp_path / "notes.md"
+    file_path.write_text("".join(lines))
+
+    with PagedFile(str(file_path)) as paged:
+        chunks = iter_chunks(paged.iter_lines(), max_chars=200)
+        assert next(chunks)["end_line"] == 8
+        rest = list(chunks)
+
+    assert rest == split_into_chunks(lines, max_chars=200)[1:]
+
+
+def test_group_notes_shrinks_every_level():
+    notes = [
+        {"text": "n" * 60, "start_line": index * 10 + 1, "end_line": index * 10 + 10}
+        for index in range(5)
+    ]
+
+    groups = group_notes(notes, max_chars=100)
+
+    assert [(group["start_line"], group["end_line"]) for group in groups] == [(1, 20), (21, 40), (41, 50)]
+    assert groups[0]["text"] == "n" * 60 + "\n" + "n" * 60
+    assert len(group_notes(groups, max_chars=100)) == 2
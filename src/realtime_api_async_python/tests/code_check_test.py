@@ -0,0 +1,108 @@
+from ..modules.code_check import check_code, static_check
+
+
+def test_clean_script_passes_without_running():
+    source = """import os
+import pandas as pd
+
+counter = 0
+
+def bump(step):
+    global total
+    total = step
+    return [counter + i for i in range(step)]
+
+class Report:
+    def path(self):
+        return os.path.join("out", __name__)
+
+try:
+    import some_optional_module
+except ImportError:
+    some_optional_module = None
+
+print(bump(2), Report().path(), total, pd.__name__)
+"""
+    result = static_check(source, "script.py")
+
+    assert result == {"runnable": True, "issues": [], "checks": ["syntax", "imports", "names"]}
+
+
+def test_syntax_error_is_reported_with_its_location():
+    result = static_check("def broken(:\n    pass\n", "script.py")
+
+    assert result["runnable"] is False
+    assert result["issues"][0].startswith("SyntaxError at line 1")
+
+
+def test_unresolved_imports_and_undefined_names_are_reported():
+    source = "import definitely_not_installed\n\ndef f():\n    return missing_helper()\n\nprint(typo_name)\n"
+    result = static_check(source, "script.py")
+
+    assert result["runnable"] is False
+    assert result["issues"] == [
+        "ModuleNotFoundError at line 1: No module named 'definitely_not_installed'",
+        "NameError at module level: name 'typo_name' is not defined",
+        "NameError in f(): name 'missing_helper' is not defined",
+    ]
+
+
+def test_implicit_class_names_are_defined():
+    source = """class Greeter:
+    label = __qualname__
+    origin = __module__
+
+    def greet(self):
+        return super().__init__, __class__
+
+
+def describe():
+    return __qualname__
+"""
+    result = static_check(source, "script.py")
+
+    assert result["issues"] == ["NameError in describe(): name '__qualname__' is not defined"]
+
+
+def test_local_modules_next_to_the_script_resolve(tmp_path):
+    (tmp_path / "helpers.py").write_text("VALUE = 1\n")
+
+    result = static_check("import helpers\nprint(helpers.VALUE)\n", str(tmp_path / "script.py"))
+
+    assert result["runnable"] is True
+
+
+def test_star_imports_and_inline_dependencies_are_inconclusive():
+    star = static_check("from os.path import *\nprint(join('a', 'b'))\n", "script.py")
+    inline = static_check(
+        '# /// script\n# dependencies = ["some-package"]\n# ///\nimport some_package\n',
+        "script.py",
+    )
+
+    assert star["runnable"] is None
+    assert inline["runnable"] is None and inline["issues"] == []
+
+
+async def test_malformed_inline_metadata_is_reported(tmp_path):
+    script = tmp_path / "script.py"
+    script.write_text('# /// script\n# dependencies = ["pandas"\n# ///\nimport pandas\n')
+
+    result = await check_code(script.read_text(), str(script), run_dry_import=True)
+
+    assert result["runnable"] is False
+    assert result["issues"][0].startswith("Invalid `# /// script` metadata block")
+
+
+async def test_dry_import_catches_runtime_errors_but_skips_main(tmp_path):
+    failing = tmp_path / "failing.py"
+    failing.write_text("values = {}\nprint(values['missing'])\n")
+    guarded = tmp_path / "guarded.py"
+    guarded.write_text("if __name__ == '__main__':\n    raise SystemExit(1)\n")
+
+    failed = await check_code(failing.read_text(), str(failing), run_dry_import=True)
+    passed = await check_code(guarded.read_text(), str(guarded), run_dry_import=True)
+
+    assert failed["runnable"] is False
+    assert "KeyError: 'missing'" in failed["issues"][0]
+    assert passed["runnable"] is True
+    assert passed["checks"][-1] == "dry_import"
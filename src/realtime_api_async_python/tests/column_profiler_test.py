@@ -0,0 +1,121 @@
+import pytest
+import sqlite3
+import duckdb
+import pandas as pd
+from ..modules.database import DuckDBDatabase, SQLiteDatabase
+from ..modules.column_profiler import (
+    profile_column,
+    profile_database,
+    refresh_profiles,
+    profile_in_background,
+    profiling_failed_at,
+    load_profiles,
+    format_profiles,
+)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    db_path = str(tmp_path / "test.duckdb")
+    connection = duckdb.connect(db_path)
+    connection.execute(
+        """
+        CREATE TABLE Orders AS
+        SELECT range AS OrderID,
+               ['pending', 'shipped', 'delivered'][range % 3 + 1] AS Status,
+               DATE '2024-01-01' + INTERVAL (range % 30) DAY AS OrderDate,
+               CASE WHEN range % 4 = 0 THEN NULL ELSE range * 1.5 END AS Amount
+        FROM range(50000)
+        """
+    )
+    connection.close()
+    return db_path
+
+
+def test_profile_column():
+    profile = profile_column(pd.Series(["a", "b", "a", None, "a", "b"]), top_k=1)
+
+    assert profile["distinct"] == 2
+    assert profile["null_rate"] == round(1 / 6, 4)
+    assert profile["top_values"] == ["a"]
+    assert (profile["min"], profile["max"]) == ("a", "b")
+
+
+def test_profile_database_samples(db_path):
+    database = DuckDBDatabase()
+    database.connect(db_path)
+
+    profiles = profile_database(database, sample_rows=1000)
+
+    orders = profiles["Orders"]
+    assert orders["sampled_rows"] == 1000
+    assert orders["columns"]["Status"]["distinct"] == 3
+    assert sorted(orders["columns"]["Status"]["top_values"]) == ["delivered", "pending", "shipped"]
+    assert 0.15 < orders["columns"]["Amount"]["null_rate"] < 0.35
+    assert "top_values" not in orders["columns"]["OrderID"]
+
+
+def test_profiles_refresh_only_for_matching_version(db_path, tmp_path):
+    cache_dir = str(tmp_path / "schema")
+    database = DuckDBDatabase()
+    database.connect(db_path)
+    data_version = database.data_version()
+    database.connection.close()
+
+    assert load_profiles("duckdb:test", data_version, cache_dir) is None
+
+    refresh_profiles("duckdb", db_path, "duckdb:test", cache_dir, sample_rows=500)
+
+    profiles = load_profiles("duckdb:test", data_version, cache_dir)
+    assert profiles["Orders"]["sampled_rows"] == 500
+    assert load_profiles("duckdb:test", "stale-version", cache_dir) is None
+
+    summary = format_profiles(profiles, ["Orders"])
+    assert summary.startswith("-- Column profiles (sampled)")
+    assert "-- Orders.Status: 3 distinct" in summary
+
+
+def test_profiles_without_a_data_version_expire_after_the_ttl(tmp_path):
+    cache_dir = str(tmp_path / "schema")
+
+    # An in-memory database has no data version, like Postgres
+    refresh_profiles("duckdb", ":memory:", "duckdb:memory", cache_dir)
+
+    assert load_profiles("duckdb:memory", None, cache_dir) == {}
+    assert load_profiles("duckdb:memory", None, cache_dir, ttl_seconds=0) is None
+    assert load_profiles("duckdb:memory", "some-version", cache_dir) is None
+
+
+def test_failed_profiling_backs_off_before_retrying(tmp_path):
+    cache_dir = str(tmp_path / "schema")
+    missing_path = str(tmp_path / "missing" / "test.duckdb")
+
+    with pytest.raises(Exception):
+        refresh_profiles("duckdb", missing_path, "duckdb:missing", cache_dir)
+
+    assert "duckdb:missing" in profiling_failed_at
+    assert not profile_in_background("duckdb", missing_path, "duckdb:missing", cache_dir)
+
+    refresh_profiles("duckdb", ":memory:", "duckdb:missing", cache_dir)
+
+    assert "duckdb:missing" not in profiling_failed_at
+
+
+def test_sqlite_samples_rowid_blocks(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    connection = sqlite3.connect(db_path)
+    connection.execute("CREATE TABLE Events (EventID INTEGER, Kind TEXT)")
+    connection.executemany("INSERT INTO Events VALUES (?, ?)", ((i, f"kind{i % 3}") for i in range(20000)))
+    connection.commit()
+    connection.close()
+    database = SQLiteDatabase()
+    database.connect(db_path)
+
+    sql = database.sample_sql("Events", 1000)
+    df = database.execute_sql(sql)
+
+    assert "random()" not in sql
+    assert len(df) == 1000 and df["EventID"].is_unique
+    # Spread over the whole table rather than its first rows
+    assert df["EventID"].max() > 15000
+    assert database.execute_sql(database.sample_sql("Events", 50000))["EventID"].count() == 20000
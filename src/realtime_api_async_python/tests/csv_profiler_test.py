@@ -0,0 +1,61 @@
+import os
+import pytest
+from ..modules import csv_profiler
+from ..modules.csv_profiler import format_csv_profile, load_csv_profile, profile_csv
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "orders.csv"
+    rows = ["OrderDate,State,Revenue,Note"]
+    for row in range(1, 5001):
+        note = "" if row % 10 == 0 else f"note {row}"
+        rows.append(f"2024-01-{row % 28 + 1:02d},{'CA' if row % 3 else 'NY'},{row * 1.5},{note}")
+    path.write_text("\n".join(rows) + "\n")
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def clear_memo():
+    csv_profiler.profile_memo.clear()
+    yield
+    csv_profiler.profile_memo.clear()
+
+
+def test_profile_keeps_a_bounded_sample_but_exact_counts(csv_path):
+    profile = profile_csv(csv_path, sample_rows=500, chunk_size=700)
+    columns = profile["columns"]
+
+    assert profile["rows"] == 5000
+    assert profile["sampled_rows"] == 500
+    assert [columns[name]["type"] for name in columns] == ["datetime", "text", "float", "text"]
+    assert columns["Revenue"]["min"] == "1.5" and columns["Revenue"]["max"] == "7500.0"
+    assert columns["Revenue"]["mean"] == 3750.75
+    assert columns["Note"]["null_rate"] == 0.1
+    assert sorted(columns["State"]["top_values"]) == ["CA", "NY"]
+    assert profile["preview"].splitlines()[1].split()[:2] == ["2024-01-02", "CA"]
+
+
+def test_profile_is_reused_until_the_file_changes(tmp_path, csv_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    first = load_csv_profile(csv_path, cache_dir, sample_rows=100)
+
+    # A fresh process reads the profile from disk instead of the CSV
+    csv_profiler.profile_memo.clear()
+    monkeypatch.setattr(csv_profiler, "profile_csv", lambda *args, **kwargs: pytest.fail("re-profiled"))
+    assert load_csv_profile(csv_path, cache_dir, sample_rows=100) == first
+
+    monkeypatch.undo()
+    with open(csv_path, "a") as file:
+        file.write("2024-02-01,TX,1.0,late\n")
+    os.utime(csv_path, ns=(0, os.stat(csv_path).st_mtime_ns + 1))
+    assert load_csv_profile(csv_path, cache_dir, sample_rows=100)["rows"] == 5001
+
+
+def test_format_lists_every_column_with_its_type(csv_path):
+    text = format_csv_profile(profile_csv(csv_path, sample_rows=200))
+
+    assert text.splitlines()[0] == "5000 rows, 4 columns (stats from a 200-row sample)"
+    assert "Revenue (float): 200 distinct, range 1.5 .. 7500.0, mean 3750.75" in text
+    assert "State (text): 2 distinct, range CA .. NY, values " in text
+    assert "Note (text): " in text and "10% null" in text
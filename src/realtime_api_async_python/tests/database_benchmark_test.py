@@ -0,0 +1,53 @@
+import copy
+import os
+import pytest
+from ..benchmarks import database_benchmark
+from ..benchmarks.database_benchmark import benchmark_cases, compare_results, run_benchmarks
+
+
+def test_run_benchmarks_reports_every_case(tmp_path):
+    report = run_benchmarks(
+        ["sqlite", "duckdb"], [1000], str(tmp_path), seed=1, repeat=1, isolate=False
+    )
+
+    assert len(report["results"]) == 2 * len(benchmark_cases())
+    for result in report["results"]:
+        assert result["wall_time"] > 0
+        assert result["peak_rss_mb"] > 0
+        assert result["rows"] > 0
+    scans = [r for r in report["results"] if r.get("query") == "scan"]
+    assert [r["rows"] for r in scans] == [1000, 1000]
+
+
+def test_compare_results_flags_slowdowns():
+    baseline = {
+        "results": [
+            {"dialect": "duckdb", "scale": 1000, "case": "read_tables", "wall_time": 0.1},
+            {"dialect": "duckdb", "scale": 1000, "case": "execute_sql", "query": "scan", "wall_time": 0.1},
+        ]
+    }
+    current = copy.deepcopy(baseline)
+    current["results"][0]["wall_time"] = 0.11
+    current["results"][1]["wall_time"] = 0.2
+
+    regressions = compare_results(baseline, current, tolerance=0.2)
+
+    assert [r["key"][2] for r in regressions] == ["execute_sql"]
+    assert regressions[0]["ratio"] == 2.0
+
+
+def test_interrupted_generation_is_not_reused(tmp_path, monkeypatch):
+    load_database = database_benchmark.load_database
+
+    def interrupted(sql_dialect, url, rows, seed):
+        load_database(sql_dialect, url, rows // 10, seed)
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(database_benchmark, "load_database", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        database_benchmark.prepare_database("sqlite", None, 1000, 1, str(tmp_path))
+    assert os.listdir(tmp_path) == []
+
+    monkeypatch.setattr(database_benchmark, "load_database", load_database)
+    path = database_benchmark.prepare_database("sqlite", None, 1000, 1, str(tmp_path))
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
@@ -0,0 +1,263 @@
+import os
+import pytest
+import json
+import sqlite3
+import duckdb
+import pandas as pd
+from ..modules.database import (
+    DuckDBDatabase,
+    SQLiteDatabase,
+    FederatedDatabase,
+    PostgresDatabase,
+    parse_federated_url,
+)
+
+
+USERS = [
+    (1, "John", "Springfield"),
+    (2, "Jane", "Metropolis"),
+    (3, "Alice", "Gotham"),
+]
+
+
+@pytest.fixture
+def duckdb_database(tmp_path):
+    db_path = str(tmp_path / "test.duckdb")
+    connection = duckdb.connect(db_path)
+    connection.execute("CREATE TABLE Users (UserID INTEGER, FirstName VARCHAR, City VARCHAR)")
+    connection.executemany("INSERT INTO Users VALUES (?, ?, ?)", USERS)
+    connection.close()
+
+    database = DuckDBDatabase()
+    database.connect(db_path)
+    return database
+
+
+@pytest.fixture
+def sqlite_database(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    connection = sqlite3.connect(db_path)
+    connection.execute("CREATE TABLE Users (UserID INTEGER, FirstName TEXT, City TEXT)")
+    connection.executemany("INSERT INTO Users VALUES (?, ?, ?)", USERS)
+    connection.commit()
+    connection.close()
+
+    database = SQLiteDatabase()
+    database.connect(db_path)
+    return database
+
+
+@pytest.fixture
+def postgres_database():
+    url = os.getenv("POSTGRES_TEST_URL")
+    if not url:
+        pytest.skip("POSTGRES_TEST_URL is not set")
+    database = PostgresDatabase()
+    database.connect(url)
+    cursor = database.connection.cursor()
+    cursor.execute("DROP TABLE IF EXISTS realtime_test_users")
+    cursor.execute("CREATE TABLE realtime_test_users (UserID INTEGER, FirstName VARCHAR, City VARCHAR)")
+    cursor.executemany("INSERT INTO realtime_test_users VALUES (%s, %s, %s)", USERS)
+    database.connection.commit()
+    yield database
+    database.connection.rollback()
+    cursor = database.connection.cursor()
+    cursor.execute("DROP TABLE IF EXISTS realtime_test_users")
+    database.connection.commit()
+    database.connection.close()
+
+
+@pytest.mark.parametrize("database_fixture", ["duckdb_database", "sqlite_database"])
+def test_export_sql_csv(database_fixture, tmp_path, request):
+    database = request.getfixturevalue(database_fixture)
+    file_path = str(tmp_path / "users.csv")
+
+    export = database.export_sql("SELECT * FROM Users ORDER BY UserID;", file_path, ".csv")
+
+    assert export["rows"] == 3
+    assert export["engine"] == (
+        "duckdb_copy" if database_fixture == "duckdb_database" else "pandas"
+    )
+    df = pd.read_csv(file_path)
+    assert list(df.columns) == ["UserID", "FirstName", "City"]
+    assert df["FirstName"].tolist() == ["John", "Jane", "Alice"]
+
+
+@pytest.mark.parametrize("database_fixture", ["duckdb_database", "sqlite_database"])
+def test_export_sql_json_formats(database_fixture, tmp_path, request):
+    database = request.getfixturevalue(database_fixture)
+    jsonl_path = str(tmp_path / "users.jsonl")
+    json_path = str(tmp_path / "users.json")
+
+    database.export_sql("SELECT * FROM Users ORDER BY UserID", jsonl_path, ".jsonl")
+    database.export_sql("SELECT * FROM Users ORDER BY UserID", json_path, ".json")
+
+    with open(jsonl_path) as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    with open(json_path) as f:
+        records = json.load(f)
+
+    assert lines == records
+    assert records[0] == {"UserID": 1, "FirstName": "John", "City": "Springfield"}
+
+
+def test_export_sql_invalid_format(duckdb_database, tmp_path):
+    with pytest.raises(ValueError):
+        duckdb_database.export_sql("SELECT * FROM Users", str(tmp_path / "users.xml"), ".xml")
+
+
+def test_export_sql_multiple_statements_falls_back_to_pandas(duckdb_database, tmp_path):
+    file_path = str(tmp_path / "users.csv")
+
+    export = duckdb_database.export_sql(
+        "SELECT 1; SELECT * FROM Users", file_path, ".csv"
+    )
+
+    assert export["engine"] == "pandas"
+    assert export["rows"] == 3
+
+
+@pytest.mark.parametrize("sql", ["DESCRIBE Users", "PRAGMA table_info('Users')"])
+def test_export_sql_falls_back_when_copy_rejects_the_statement(duckdb_database, tmp_path, sql):
+    # Valid on their own, but a parser error when nested in COPY (...)
+    file_path = str(tmp_path / "columns.csv")
+
+    export = duckdb_database.export_sql(sql, file_path, ".csv")
+
+    assert export["engine"] == "pandas"
+    assert export["rows"] == 3
+    assert len(pd.read_csv(file_path)) == 3
+
+
+def test_explain_duckdb_estimates(duckdb_database):
+    plan = duckdb_database.explain("SELECT * FROM Users a, Users b;")
+
+    assert plan["estimated_rows"] == 9
+    assert plan["estimated_cost"] >= plan["estimated_rows"]
+
+
+def test_explain_sqlite_has_no_estimates(sqlite_database):
+    plan = sqlite_database.explain("SELECT * FROM Users")
+
+    assert "Users" in plan["plan"]
+    assert plan["estimated_rows"] is None
+    assert plan["estimated_cost"] is None
+
+
+@pytest.mark.parametrize("database_fixture", ["duckdb_database", "sqlite_database"])
+def test_explain_invalid_sql_raises(database_fixture, request):
+    database = request.getfixturevalue(database_fixture)
+
+    with pytest.raises(Exception):
+        database.explain("SELECT * FROM Userz")
+
+
+@pytest.mark.parametrize(
+    "database_fixture, sql",
+    [
+        (
+            "duckdb_database",
+            "SELECT count(*) FROM range(100000) a, range(100000) b, range(100) c",
+        ),
+        (
+            "sqlite_database",
+            "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT count(*) FROM c",
+        ),
+    ],
+)
+def test_statement_timeout(database_fixture, sql, request):
+    database = request.getfixturevalue(database_fixture)
+    database.statement_timeout = 0.2
+
+    with pytest.raises(TimeoutError):
+        database.execute_sql(sql)
+
+    # The connection is still usable after the interrupted statement
+    assert len(database.execute_sql("SELECT * FROM Users")) == 3
+
+
+def test_describe_tables_duckdb_foreign_keys(tmp_path):
+    db_path = str(tmp_path / "fk.duckdb")
+    connection = duckdb.connect(db_path)
+    connection.execute("CREATE TABLE Users (UserID INTEGER PRIMARY KEY, City VARCHAR)")
+    connection.execute(
+        "CREATE TABLE Orders (OrderID INTEGER, UserID INTEGER REFERENCES Users(UserID))"
+    )
+    connection.execute("COMMENT ON COLUMN Users.City IS 'City of residence'")
+    connection.close()
+
+    database = DuckDBDatabase()
+    database.connect(db_path)
+    tables = {table["name"]: table for table in database.describe_tables()}
+
+    assert tables["Orders"]["foreign_keys"] == [
+        {"column": "UserID", "references_table": "Users", "references_column": "UserID"}
+    ]
+    assert tables["Users"]["columns"][1]["comment"] == "City of residence"
+    assert database.read_tables() == "".join(
+        table["definition"] for table in tables.values()
+    )
+
+
+def test_parse_federated_url():
+    assert parse_federated_url("lite=./a.db, duck=./b.duckdb,pg=postgresql://localhost/app") == [
+        ("lite", "sqlite", "./a.db"),
+        ("duck", "duckdb", "./b.duckdb"),
+        ("pg", "postgres", "postgresql://localhost/app"),
+    ]
+    with pytest.raises(ValueError):
+        parse_federated_url("./a.db")
+
+
+def test_federated_joins_across_sources(tmp_path):
+    orders_path = str(tmp_path / "orders.duckdb")
+    connection = duckdb.connect(orders_path)
+    connection.execute("CREATE TABLE Orders (OrderID INTEGER, UserID INTEGER, Total DOUBLE)")
+    connection.execute("INSERT INTO Orders VALUES (1, 1, 9.5), (2, 1, 3.0), (3, 3, 1.0)")
+    connection.close()
+    users_path = str(tmp_path / "users.duckdb")
+    connection = duckdb.connect(users_path)
+    connection.execute("CREATE TABLE Users (UserID INTEGER, FirstName VARCHAR, City VARCHAR)")
+    connection.executemany("INSERT INTO Users VALUES (?, ?, ?)", USERS)
+    connection.close()
+
+    database = FederatedDatabase()
+    database.connect(f"crm={users_path},shop={orders_path}")
+
+    assert [table["name"] for table in database.describe_tables()] == ["crm.Users", "shop.Orders"]
+    assert "CREATE TABLE shop.Orders" in database.read_tables()
+    df = database.execute_sql(
+        "SELECT u.FirstName, sum(o.Total) AS Total FROM crm.Users u "
+        "JOIN shop.Orders o USING (UserID) GROUP BY u.FirstName ORDER BY u.FirstName"
+    )
+    assert df.values.tolist() == [["Alice", 1.0], ["John", 12.5]]
+    assert database.data_version().startswith("crm=")
+
+
+def test_federated_attaches_sqlite(sqlite_database, tmp_path):
+    try:
+        duckdb.connect().execute("LOAD sqlite")
+    except duckdb.Error:
+        pytest.skip("DuckDB sqlite extension is not available")
+
+    database = FederatedDatabase()
+    database.connect(f"lite={sqlite_database.url}")
+
+    assert len(database.execute_sql("SELECT * FROM lite.Users")) == 3
+
+
+def test_postgres_copy_export_and_server_side_cursor(postgres_database, tmp_path):
+    postgres_database.itersize = 2
+    file_path = str(tmp_path / "users.csv")
+
+    export = postgres_database.export_sql("SELECT * FROM realtime_test_users ORDER BY UserID;", file_path, ".csv")
+    chunks = list(postgres_database.iter_sql("SELECT * FROM realtime_test_users ORDER BY UserID"))
+
+    assert export == {**export, "engine": "postgres_copy", "rows": 3}
+    assert pd.read_csv(file_path)["firstname"].tolist() == ["John", "Jane", "Alice"]
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert list(postgres_database.execute_sql("SELECT * FROM realtime_test_users WHERE UserID < 0").columns) == [
+        "userid",
+        "firstname",
+        "city",
+    ]
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+import time
+from ..modules.fan_out import FAN_OUT_WORKERS, first_successful, run_blocking
+
+
+async def test_returns_first_successes_and_cancels_stragglers():
+    cancelled = []
+
+    async def attempt(name, delay, result):
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(name)
+            raise
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    results = await first_successful(
+        [
+            attempt("slow", 5, "slow"),
+            attempt("failed", 0.01, None),
+            attempt("raised", 0.01, ValueError("bad diagram")),
+            attempt("second", 0.05, "second"),
+            attempt("first", 0.02, "first"),
+        ],
+        2,
+    )
+
+    assert results == ["first", "second"]
+    assert cancelled == ["slow"]
+
+
+async def test_returns_what_succeeded_when_too_few_do():
+    async def attempt(result):
+        return result
+
+    assert await first_successful([attempt(None), attempt("only"), attempt(None)], 2) == ["only"]
+
+
+async def test_queued_blocking_requests_are_dropped_on_cancel():
+    started = []
+    lock = threading.Lock()
+
+    def request(delay):
+        with lock:
+            started.append(delay)
+        time.sleep(delay)
+        return delay
+
+    results = await first_successful(
+        [run_blocking(request, 0)] + [run_blocking(request, 0.2) for _ in range(FAN_OUT_WORKERS * 2)],
+        1,
+    )
+
+    assert results == [0]
+    # Requests still queued behind the busy workers were never sent
+    assert len(started) <= FAN_OUT_WORKERS + 1
@@ -0,0 +1,92 @@
+from ..modules.html_extract import declared_charset, extract_markdown, quality_problems
+
+PAGE = """<!doctype html><html><head><meta charset="utf-8"><title>Notes &amp; Tips</title></head>
+<body><nav><a href="/">Home</a> <a href="/about">About</a></nav>
+<div class="sidebar"><p>Subscribe to our newsletter for more posts like this one, every week.</p></div>
+<article class="post"><h1>Notes</h1>
+<p>The first paragraph has <a href="/guide">a link</a>, some <strong>bold</strong> text, and commas, several.</p>
+<p>The second paragraph has <em>emphasis</em> and <code>x = 1</code> inline code, and enough text to count.
+<ul><li>First item</li><li>Second item<ol><li>Nested step</li></ol></li></ul>
+<pre>def f():
+    return 1</pre>
+<table><tr><th>Name</th><th>Value</th></tr><tr><td>pipe</td><td>a|b</td></tr></table>
+<blockquote><p>A quotation that is long enough to count as a paragraph.</p></blockquote>
+<img src="chart.png" alt="Chart">
+</article><footer>Copyright</footer><script>track()</script></body></html>"""
+
+
+def test_main_content_is_converted_to_markdown():
+    extracted = extract_markdown(PAGE, "https://example.com/blog/notes")
+
+    assert extracted["title"] == "Notes & Tips"
+    assert extracted["markdown"] == """# Notes
+
+The first paragraph has [a link](https://example.com/guide), some **bold** text, and commas, several.
+
+The second paragraph has *emphasis* and `x = 1` inline code, and enough text to count.
+
+- First item
+- Second item
+  1. Nested step
+
+```
+def f():
+    return 1
+```
+
+| Name | Value |
+| --- | --- |
+| pipe | a\\|b |
+
+> A quotation that is long enough to count as a paragraph.
+
+![Chart](https://example.com/blog/chart.png)"""
+    assert extracted["link_density"] < 0.1
+    assert not extracted["script_required"]
+
+
+def test_quality_check_rejects_thin_link_lists_and_app_shells():
+    article = extract_markdown(PAGE, "https://example.com/")
+    items = "".join(f"<li><a href='/{i}'>Link number {i} to another page</a></li>" for i in range(40))
+    links = extract_markdown(f"<body><ul>{items}</ul></body>", "https://example.com/")
+    shell = extract_markdown(
+        "<body><noscript>Please enable JavaScript to continue.</noscript><div id='app'></div></body>",
+        "https://example.com/",
+    )
+
+    assert quality_problems(article, min_chars=200) == []
+    assert quality_problems(article) == [f"Only {article['text_length']} characters of text (minimum 500)."]
+    assert "Mostly links (link density 1.0)." in quality_problems(links)
+    assert quality_problems(shell)[0] == "Page needs JavaScript to render."
+
+
+def test_declared_charset_is_read_from_meta_tags():
+    assert declared_charset(b'<html><head><meta charset="iso-8859-1">') == "iso-8859-1"
+    assert declared_charset(b'<meta http-equiv="Content-Type" content="text/html; charset=Shift_JIS">') == "Shift_JIS"
+    assert declared_charset(b"<html><head>") is None
+
+
+def test_unclosed_table_cells_and_deep_nesting_stay_shallow():
+    rows = "".join(f"<tr><td>row {i}<td>value, {i}" for i in range(3000))
+    html = f"<html><body><article><p>A short introduction to the table below, with commas.</p><table>{rows}</table></article></body></html>"
+
+    markdown = extract_markdown(html, "https://example.com/")["markdown"]
+
+    assert "| row 0 | value, 0 |\n| --- | --- |\n| row 1 | value, 1 |" in markdown
+    assert markdown.endswith("| row 2999 | value, 2999 |")
+
+    nested = "<div>" * 3000 + "<p>A paragraph buried deep inside nested divs, long enough to count.</p>" + "</div>" * 3000
+    assert "buried deep" in extract_markdown(f"<html><body>{nested}</body></html>", "https://example.com/")["markdown"]
+
+
+def test_ad_hint_only_matches_whole_words():
+    page = (
+        "<body><div class='ad-slot'><p>Buy the premium plan today, now with twenty percent off.</p></div>"
+        "<div class='download-section'><p>Download the installer for your platform, then run it "
+        "and follow the steps on screen to finish the setup.</p></div></body>"
+    )
+
+    extracted = extract_markdown(page, "https://example.com/")
+
+    assert "Download the installer" in extracted["markdown"]
+    assert "premium plan" not in extracted["markdown"]
@@ -0,0 +1,89 @@
+import base64
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from ..modules.mermaid_renderer import PNG_SIGNATURE, MermaidRenderer
+
+
+class StandInRenderer(BaseHTTPRequestHandler):
+    """Answers /img/<base64>?type=png like mermaid.ink, after a fixed delay."""
+
+    protocol_version = "HTTP/1.1"
+    delay = 0.2
+
+    def do_GET(self):
+        self.server.paths.append(self.path)
+        time.sleep(self.delay)
+        encoded = self.path.split("/img/", 1)[1].split("?", 1)[0]
+        graph = base64.urlsafe_b64decode(encoded).decode("utf-8")
+        if graph.startswith("graph"):
+            status, body = 200, PNG_SIGNATURE + graph.encode("utf-8")
+        else:
+            status, body = 400, b"Syntax error in graph"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInRenderer)
+    server.paths = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def renderer(tmp_path, server):
+    renderer = MermaidRenderer(
+        str(tmp_path / "cache"), f"http://127.0.0.1:{server.server_port}/img", concurrency=4
+    )
+    yield renderer
+    renderer.close()
+
+
+async def test_renders_run_concurrently_and_keep_the_raw_png(renderer, server):
+    graphs = [f"graph LR;\n    A --> B{i}" for i in range(4)]
+
+    start_time = time.perf_counter()
+    images = await renderer.render_all(graphs)
+    elapsed = time.perf_counter() - start_time
+
+    assert images == [PNG_SIGNATURE + graph.encode("utf-8") for graph in graphs]
+    assert elapsed < 4 * StandInRenderer.delay
+    assert all(path.endswith("?type=png") for path in server.paths)
+
+
+async def test_rendered_diagrams_are_cached_by_source(tmp_path, renderer, server):
+    first = await renderer.render("graph TD;\n    A --> B")
+    again = await renderer.render("graph TD;\n    A --> B")
+
+    assert first == again
+    assert len(server.paths) == 1
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+
+async def test_rejected_diagrams_are_not_cached(tmp_path, renderer, server):
+    assert await renderer.render("not a diagram") is None
+    assert await renderer.render("not a diagram") is None
+
+    assert len(server.paths) == 2
+    assert not (tmp_path / "cache").exists()
+
+
+async def test_concurrent_renders_of_the_same_graph_share_the_cache(tmp_path, renderer, server):
+    graph = "graph TD;\n    A --> C"
+
+    images = await renderer.render_all([graph] * 4)
+
+    assert images == [PNG_SIGNATURE + graph.encode("utf-8")] * 4
+    assert len(server.paths) == 4
+    assert [path.name.endswith(".tmp") for path in (tmp_path / "cache").iterdir()] == [False]
@@ -0,0 +1,34 @@
+import pytest
+from ..modules.mermaid_syntax import mermaid_problems
+
+
+@pytest.mark.parametrize(
+    "mermaid_code",
+    [
+        "graph LR;\n    A --> B\n    A --> C",
+        "---\ntitle: Flow\n---\n%% comment\nflowchart TD\n    A>flag] --> B{ok?}\n    B -->|yes| C((done))\n    C --> D[(db)]",
+        'pie title Fruits\n    "Apples" : 40\n    "Bananas" : 35.5',
+        "erDiagram\n    CUSTOMER ||--o{ ORDER : places",
+        "stateDiagram-v2\n    [*] --> Still\n    state Moving {\n        Fast --> Slow\n    }",
+        "sequenceDiagram\n    Alice->>Bob: Hello",
+    ],
+)
+def test_valid_diagrams_pass(mermaid_code):
+    assert mermaid_problems(mermaid_code) == []
+
+
+@pytest.mark.parametrize(
+    "mermaid_code, problem",
+    [
+        ("```mermaid\ngraph LR\n    A --> B\n```", "Diagram still contains markdown code fences."),
+        ("%% only a comment\n", "Diagram is empty."),
+        ("grpah LR\n    A --> B", "Unknown diagram type 'grpah'."),
+        ("graph LR", "Diagram has no content after its header."),
+        ("graph XY\n    A --> B", "Unknown flowchart direction 'XY'."),
+        ("graph LR\n    A[Start --> B", "Unbalanced brackets or quotes: A[Start --> B"),
+        ('graph LR\n    A["Start] --> B', 'Unbalanced brackets or quotes: A["Start] --> B'),
+        ('pie\n    "Apples" : many', 'Invalid pie slice: "Apples" : many'),
+    ],
+)
+def test_malformed_diagrams_are_caught_before_rendering(mermaid_code, problem):
+    assert mermaid_problems(mermaid_code) == [problem]
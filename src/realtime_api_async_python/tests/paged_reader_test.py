@@ -0,0 +1,58 @@
+from ..modules.paged_reader import PagedFile, read_file_slice
+
+
+def write_lines(path, count):
+    path.write_text("".join(f"line {number}\n" for number in range(1, count + 1)))
+    return str(path)
+
+
+def test_pages_line_ranges_and_tail(tmp_path):
+    file_path = write_lines(tmp_path / "log.txt", 25)
+
+    with PagedFile(file_path) as paged:
+        assert paged.line_count() == 25
+        page = paged.page(3, page_lines=10)
+        assert (page["page"], page["total_pages"]) == (3, 3)
+        assert page["text"] == "line 21\nline 22\nline 23\nline 24\nline 25\n"
+        assert paged.lines(5, 2)["text"] == "line 5\nline 6\n"
+        tail = paged.tail(2)
+        assert tail["text"] == "line 24\nline 25\n"
+        assert (tail["start_line"], tail["end_line"]) == (24, 25)
+
+    (tmp_path / "unterminated.txt").write_text("a\nb\nc")
+    with PagedFile(str(tmp_path / "unterminated.txt")) as paged:
+        assert paged.line_count() == 3
+        assert paged.tail(2)["text"] == "b\nc"
+
+    (tmp_path / "empty.txt").write_text("")
+    assert read_file_slice(str(tmp_path / "empty.txt"))["content"] == ""
+
+
+def test_search_returns_merged_windows_around_matches(tmp_path):
+    file_path = write_lines(tmp_path / "log.txt", 100)
+
+    with PagedFile(file_path) as paged:
+        windows = paged.search(r"line (10|12|50)$", context=1)
+
+    assert [(w["start_line"], w["end_line"], w["match_lines"]) for w in windows] == [
+        (9, 13, [10, 12]),
+        (49, 51, [50]),
+    ]
+    assert windows[1]["text"] == "line 49\nline 50\nline 51\n"
+    # Not a valid regex, so it's searched for as text
+    assert read_file_slice(file_path, pattern="line 7(")["matches"] == 0
+
+
+def test_large_files_default_to_the_first_page(tmp_path):
+    file_path = write_lines(tmp_path / "big.txt", 1000)
+
+    whole = read_file_slice(file_path, max_bytes=100_000)
+    assert whole["range"] == "whole file"
+
+    first = read_file_slice(file_path, page_lines=200, max_bytes=1000)
+    assert first["range"] == "page 1 of 5 (lines 1-200)"
+    assert first["truncated"] and len(first["content"]) == 1000
+
+    lines = read_file_slice(file_path, start_line=-3)
+    assert lines["content"] == "line 998\nline 999\nline 1000\n"
+    assert lines["range"] == "lines 998-1000 of 1000"
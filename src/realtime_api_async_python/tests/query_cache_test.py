@@ -0,0 +1,122 @@
+import pytest
+import os
+import threading
+import time
+import duckdb
+from ..modules.query_cache import STALE_TEMP_SECONDS, QueryCache, normalize_sql
+
+
+@pytest.fixture
+def query_cache(tmp_path):
+    return QueryCache(str(tmp_path / "cache"), max_bytes=10 * 1024 * 1024)
+
+
+def write_result(path: str, rows: int = 10):
+    duckdb.sql(f"SELECT range AS id FROM range({rows})").write_parquet(path)
+
+
+def test_normalize_sql():
+    assert normalize_sql("SELECT *\n  FROM   Users;") == "select * from users"
+    assert normalize_sql("select * from users") == normalize_sql("SELECT * FROM USERS")
+    # Quoted literals and identifiers keep their case and spacing
+    assert (
+        normalize_sql("SELECT \"First Name\" FROM Users WHERE State = 'CA  x'")
+        == "select \"First Name\" from users where state = 'CA  x'"
+    )
+
+
+def test_miss_then_hit(query_cache):
+    assert query_cache.get("duckdb:test", "SELECT * FROM Users", "v1") is None
+
+    temp_path = query_cache.reserve("duckdb:test", "SELECT * FROM Users", "v1")
+    write_result(temp_path)
+    path = query_cache.put("duckdb:test", "SELECT * FROM Users", "v1", temp_path)
+
+    assert query_cache.get("duckdb:test", "select *   from users;", "v1") == path
+    report = query_cache.report()
+    assert report["hits"] == 1
+    assert report["misses"] == 1
+    assert report["hit_rate"] == 0.5
+    assert report["entries"] == 1
+
+
+def test_data_version_change_misses(query_cache):
+    temp_path = query_cache.reserve("sqlite:test", "SELECT * FROM Users", "v1")
+    write_result(temp_path)
+    query_cache.put("sqlite:test", "SELECT * FROM Users", "v1", temp_path)
+
+    assert query_cache.get("sqlite:test", "SELECT * FROM Users", "v2") is None
+    assert query_cache.get("other:test", "SELECT * FROM Users", "v1") is None
+
+
+def test_no_data_version_requires_ttl(tmp_path):
+    cache = QueryCache(str(tmp_path / "cache"), max_bytes=1024 * 1024)
+    assert cache.reserve("postgres:test", "SELECT 1", None) is None
+
+    ttl_cache = QueryCache(str(tmp_path / "ttl_cache"), max_bytes=1024 * 1024, ttl_seconds=60)
+    temp_path = ttl_cache.reserve("postgres:test", "SELECT 1", None)
+    write_result(temp_path)
+    path = ttl_cache.put("postgres:test", "SELECT 1", None, temp_path)
+    assert ttl_cache.get("postgres:test", "SELECT 1", None) == path
+
+    ttl_cache.ttl_seconds = 0
+    assert ttl_cache.get("postgres:test", "SELECT 1", None) is None
+    assert not os.path.exists(path)
+
+
+def test_lru_eviction(tmp_path):
+    cache = QueryCache(str(tmp_path / "cache"), max_bytes=1)
+    paths = []
+    for i in range(3):
+        temp_path = cache.reserve("duckdb:test", f"SELECT {i}", "v1")
+        write_result(temp_path)
+        paths.append(cache.put("duckdb:test", f"SELECT {i}", "v1", temp_path))
+
+    # Only the most recently written entry may survive a budget smaller than one file
+    assert cache.report()["entries"] <= 1
+    assert not os.path.exists(paths[0])
+    assert not os.path.exists(paths[1])
+
+
+def test_index_persists(tmp_path):
+    cache = QueryCache(str(tmp_path / "cache"), max_bytes=1024 * 1024)
+    temp_path = cache.reserve("duckdb:test", "SELECT 1", "v1")
+    write_result(temp_path)
+    path = cache.put("duckdb:test", "SELECT 1", "v1", temp_path)
+
+    reloaded = QueryCache(str(tmp_path / "cache"), max_bytes=1024 * 1024)
+    assert reloaded.get("duckdb:test", "SELECT 1", "v1") == path
+
+
+def test_failed_and_abandoned_writes_leave_no_files(tmp_path):
+    cache = QueryCache(str(tmp_path / "cache"), max_bytes=1024 * 1024)
+    failed = cache.reserve("duckdb:test", "SELECT 1", "v1")
+    cache.discard(failed)
+    abandoned = cache.reserve("duckdb:test", "SELECT 2", "v1")
+    os.utime(abandoned, (time.time() - STALE_TEMP_SECONDS - 1,) * 2)
+
+    temp_path = cache.reserve("duckdb:test", "SELECT 3", "v1")
+    write_result(temp_path)
+    path = cache.put("duckdb:test", "SELECT 3", "v1", temp_path)
+
+    assert sorted(os.listdir(cache.cache_dir)) == sorted(["index.json", os.path.basename(path)])
+
+
+def test_concurrent_puts_keep_every_entry(tmp_path):
+    cache = QueryCache(str(tmp_path / "cache"), max_bytes=100 * 1024 * 1024)
+
+    temp_paths = []
+    for i in range(16):
+        temp_paths.append(cache.reserve("duckdb:test", f"SELECT {i}", "v1"))
+        write_result(temp_paths[-1])
+
+    def put(i):
+        cache.put("duckdb:test", f"SELECT {i}", "v1", temp_paths[i])
+
+    threads = [threading.Thread(target=put, args=(i,)) for i in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert QueryCache(str(tmp_path / "cache"), max_bytes=1).report()["entries"] == 16
@@ -0,0 +1,88 @@
+import threading
+import pandas as pd
+import pytest
+from ..modules.query_workspace import QueryWorkspace
+
+
+@pytest.fixture
+def users_csv(tmp_path):
+    file_path = str(tmp_path / "users.csv")
+    pd.DataFrame(
+        {
+            "UserID": [1, 2, 3, 4],
+            "City": ["Los Angeles", "San Diego", "Austin", "Los Angeles"],
+            "State": ["CA", "CA", "TX", "CA"],
+        }
+    ).to_csv(file_path, index=False)
+    return file_path
+
+
+def test_results_are_materialized_and_refinable(users_csv):
+    workspace = QueryWorkspace()
+
+    first = workspace.add_file(users_csv, "select all users", "SELECT * FROM Users")
+    second = workspace.add_query(
+        f"SELECT * FROM {first} WHERE State = 'CA';", "now only California"
+    )
+    third = workspace.add_query(
+        f"SELECT City, count(*) AS Users FROM {second} GROUP BY City", "group by city"
+    )
+
+    assert (first, second, third) == ("result_1", "result_2", "result_3")
+    assert workspace.results[second]["rows"] == 3
+    df = workspace.database.execute_sql(f"SELECT * FROM {third} ORDER BY City")
+    assert df.values.tolist() == [["Los Angeles", 2], ["San Diego", 1]]
+    assert workspace.catalog().splitlines()[1] == (
+        "result_2: 3 rows (UserID, City, State) - now only California"
+    )
+    assert "CREATE TEMP TABLE result_3" in workspace.table_definitions()
+
+
+def test_references_only_known_results(users_csv):
+    workspace = QueryWorkspace()
+    workspace.add_file(users_csv, "users", "SELECT * FROM Users")
+
+    assert workspace.references("select * from RESULT_1 where x = 1")
+    assert not workspace.references("SELECT * FROM result_2")
+    assert not workspace.references("SELECT * FROM Users")
+
+
+def test_oldest_results_are_evicted(users_csv, tmp_path):
+    parquet_path = str(tmp_path / "users.parquet")
+    pd.read_csv(users_csv).to_parquet(parquet_path)
+    workspace = QueryWorkspace(max_results=2)
+
+    for _ in range(3):
+        workspace.add_file(parquet_path, "users", "SELECT * FROM Users")
+
+    assert list(workspace.results) == ["result_2", "result_3"]
+    with pytest.raises(Exception):
+        workspace.database.execute_sql("SELECT * FROM result_1")
+
+    workspace.reset()
+    assert workspace.results == {} and workspace.catalog() == ""
+
+
+def test_results_over_the_row_budget_are_skipped(users_csv):
+    workspace = QueryWorkspace(max_rows=3)
+
+    assert workspace.add_file(users_csv, "all users", "SELECT * FROM Users") is None
+    assert workspace.results == {}
+
+    name = workspace.add_query("SELECT 1 AS x UNION ALL SELECT 2", "two rows")
+    assert name == "result_1" and workspace.results[name]["rows"] == 2
+
+
+def test_locked_calls_hold_the_workspace_lock():
+    workspace = QueryWorkspace()
+
+    def acquire_from_another_thread():
+        acquired = []
+        thread = threading.Thread(
+            target=lambda: acquired.append(workspace.lock.acquire(blocking=False))
+        )
+        thread.start()
+        thread.join()
+        return acquired[0]
+
+    assert workspace.locked(acquire_from_another_thread) is False
@@ -0,0 +1,81 @@
+import pytest
+import os
+import sqlite3
+from ..modules.database import SQLiteDatabase
+from ..modules.schema_index import SchemaIndex, load_schema_index, tokenize
+
+
+SCHEMA = """
+CREATE TABLE Users (UserID INTEGER PRIMARY KEY, FirstName TEXT, City TEXT);
+CREATE TABLE Categories (CategoryID INTEGER PRIMARY KEY, CategoryName TEXT);
+CREATE TABLE Products (
+    ProductID INTEGER PRIMARY KEY,
+    ProductName TEXT,
+    Price REAL,
+    CategoryID INTEGER,
+    FOREIGN KEY (CategoryID) REFERENCES Categories(CategoryID)
+);
+CREATE TABLE Orders (
+    OrderID INTEGER PRIMARY KEY,
+    UserID INTEGER,
+    TotalAmount REAL,
+    FOREIGN KEY (UserID) REFERENCES Users(UserID)
+);
+CREATE TABLE Inventory (WarehouseID INTEGER, Shelf TEXT);
+CREATE TABLE AuditLog (EventID INTEGER, Message TEXT);
+"""
+
+
+@pytest.fixture
+def database(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    connection = sqlite3.connect(db_path)
+    connection.executescript(SCHEMA)
+    connection.close()
+
+    database = SQLiteDatabase()
+    database.connect(db_path)
+    return database
+
+
+def test_tokenize():
+    assert tokenize("OrderDetails") == ["order", "detail"]
+    assert tokenize("user_id") == ["user", "id"]
+    assert tokenize("top categories") == ["top", "category"]
+
+
+def test_search_includes_foreign_key_neighbours(database):
+    index = SchemaIndex(database.describe_tables())
+
+    tables = index.search("top orders by total amount", top_k=1)
+
+    assert tables == ["Users", "Orders"]
+
+
+def test_search_without_matches_returns_everything(database):
+    index = SchemaIndex(database.describe_tables())
+
+    assert index.search("hello there", top_k=2) == list(index.tables)
+
+
+def test_table_definitions_for_prompt(database):
+    index = SchemaIndex(database.describe_tables())
+
+    definitions = index.table_definitions_for_prompt("products by price", top_k=2)
+
+    assert "CREATE TABLE Products" in definitions
+    assert "CREATE TABLE Categories" in definitions
+    assert "CREATE TABLE AuditLog" not in definitions
+    assert len(definitions) < len(database.read_tables())
+
+
+def test_load_schema_index_uses_cache(database, tmp_path):
+    cache_dir = str(tmp_path / "schema")
+
+    index = load_schema_index(database, "sqlite:test", cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+
+    # A cached index is served without introspecting the database again
+    database.describe_tables = None
+    cached = load_schema_index(database, "sqlite:test", cache_dir)
+    assert cached.to_dict() == index.to_dict()
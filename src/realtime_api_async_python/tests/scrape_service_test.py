@@ -0,0 +1,159 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from ..modules import scrape_service as scrape_service_module
+from ..modules.scrape_service import ScrapeService, extract_urls, normalize_url
+
+PAGES = {"/a": b"<h1>Page A</h1>", "/b": b"<h1>Page B</h1>", "/slow": b"<h1>Slow</h1>"}
+ARTICLE = (
+    "<html><head><title>Release notes</title></head><body><nav><a href='/'>Home</a></nav><article>"
+    + "".join(
+        f"<p>Paragraph {i} explains a change, why it was made, and what it means for you.</p>"
+        for i in range(12)
+    )
+    + "</article></body></html>"
+).encode("utf-8")
+APP_SHELL = (
+    b"<html><body><noscript>You need to enable JavaScript to run this app.</noscript>"
+    b"<div id='root'></div></body></html>"
+)
+HTML_PAGES = {"/article": ARTICLE, "/app": APP_SHELL}
+
+
+class StandInSite(BaseHTTPRequestHandler):
+    """Static pages with an ETag; conditional requests for the current version get a 304."""
+
+    protocol_version = "HTTP/1.1"
+
+    def send_page(self, with_body):
+        path = self.path.split("?", 1)[0]
+        if path == "/slow":
+            time.sleep(0.2)
+        body = PAGES.get(path) or HTML_PAGES.get(path)
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        etag = f'"{self.server.version}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        if path in HTML_PAGES:
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if with_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self.send_page(with_body=True)
+
+    def do_HEAD(self):
+        self.send_page(with_body=False)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInSite)
+    server.version = 1
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def scrapes():
+    return []
+
+
+@pytest.fixture
+def service(tmp_path, scrapes):
+    def scraper(url):
+        # Stands in for Firecrawl: fetch the page and "convert" it
+        scrapes.append(url)
+        response = requests.get(url, timeout=5)
+        response.raise_for_status()
+        return response.text.replace("<h1>", "# ").replace("</h1>", "")
+
+    service = ScrapeService(str(tmp_path / "scrapes"), ttl_seconds=60, concurrency=4, scraper=scraper)
+    yield service
+    service.close()
+
+
+def test_clipboard_urls_are_extracted_and_deduplicated():
+    text = "See https://Example.com/a?y=2&x=1#intro, and (https://example.com:443/a?x=1&y=2).\nhttp://other.org"
+
+    assert extract_urls(text) == ["https://Example.com/a?y=2&x=1#intro", "http://other.org"]
+    assert normalize_url("HTTPS://Example.com:443") == "https://example.com/"
+
+
+async def test_scrape_many_runs_concurrently_and_reports_failures(site, service):
+    base = f"http://127.0.0.1:{site.server_port}"
+
+    start_time = time.perf_counter()
+    results = await service.scrape_many([f"{base}/slow", f"{base}/a", f"{base}/missing", f"{base}/slow?again=1"])
+    elapsed = time.perf_counter() - start_time
+
+    assert [result.get("content") for result in results] == ["# Slow", "# Page A", None, "# Slow"]
+    assert "404" in results[2]["error"]
+    # Each slow scrape takes 0.4s (HEAD for validators, then the page)
+    assert elapsed < 0.7
+
+
+async def test_cached_pages_are_fresh_then_revalidated_with_their_etag(site, service, scrapes):
+    url = f"http://127.0.0.1:{site.server_port}/b"
+
+    assert (await service.scrape(url))["cache"] == "miss"
+    assert (await service.scrape(f"{url}#section"))["cache"] == "fresh"
+
+    # Past the TTL an unchanged page only costs a 304
+    service.ttl_seconds = 0
+    assert (await service.scrape(url))["cache"] == "revalidated"
+    assert scrapes == [url]
+
+    site.version = 2
+    assert (await service.scrape(url))["cache"] == "miss"
+    assert len(scrapes) == 2
+
+
+async def test_static_pages_are_extracted_locally_and_app_shells_go_to_firecrawl(site, service, scrapes):
+    base = f"http://127.0.0.1:{site.server_port}"
+
+    article, app = await service.scrape_many([f"{base}/article", f"{base}/app"])
+
+    assert article["path"] == "local"
+    assert article["content"].startswith("# Release notes\n\nParagraph 0 explains a change")
+    assert "Home" not in article["content"]
+    assert set(article["timings"]) == {"fetch", "extract"}
+    assert app["path"] == "firecrawl"
+    assert set(app["timings"]) == {"fetch", "extract", "firecrawl"}
+    assert scrapes == [f"{base}/app"]
+
+    stats = service.stats()
+    assert stats["local"]["count"] == 1 and stats["firecrawl"]["count"] == 1
+    assert stats["local"]["median"] <= stats["local"]["max"]
+
+
+async def test_extraction_errors_fall_back_to_firecrawl(site, service, scrapes, monkeypatch):
+    def broken_extract(html, base_url):
+        raise RecursionError("maximum recursion depth exceeded")
+
+    monkeypatch.setattr(scrape_service_module, "extract_markdown", broken_extract)
+    url = f"http://127.0.0.1:{site.server_port}/article"
+
+    result = await service.scrape(url)
+
+    assert result["path"] == "firecrawl"
+    assert scrapes == [url]
@@ -0,0 +1,88 @@
+import os
+import time
+import pandas as pd
+from ..modules.scratchpad_views import ScratchpadDatabase, open_scratchpad, view_name_for_file
+
+
+def write_users(scratch_pad_dir, rows=3):
+    pd.DataFrame(
+        {"UserID": range(1, rows + 1), "City": ["Springfield"] * rows}
+    ).to_csv(os.path.join(scratch_pad_dir, "user analytics.csv"), index=False)
+
+
+def test_view_name_for_file():
+    assert view_name_for_file("user analytics.csv") == "user_analytics"
+    assert view_name_for_file("2024-sales.parquet") == "file_2024_sales"
+
+
+def test_files_are_queryable_as_views(tmp_path):
+    write_users(tmp_path)
+    pd.DataFrame({"UserID": [1, 2], "Total": [9.5, 3.0]}).to_parquet(
+        tmp_path / "orders.parquet"
+    )
+    (tmp_path / "events.jsonl").write_text('{"UserID": 1, "Event": "login"}\n')
+    (tmp_path / "notes.txt").write_text("not tabular")
+
+    database = ScratchpadDatabase(str(tmp_path))
+    database.connect()
+
+    assert set(database.views) == {"user_analytics", "orders", "events"}
+    df = database.execute_sql(
+        "SELECT u.City, sum(o.Total) AS Total FROM user_analytics u "
+        "JOIN orders o USING (UserID) GROUP BY u.City"
+    )
+    assert df["Total"].tolist() == [12.5]
+    tables = {table["name"]: table for table in database.describe_tables()}
+    assert "user analytics.csv" in tables["user_analytics"]["definition"]
+
+
+def test_refresh_follows_file_changes(tmp_path):
+    write_users(tmp_path)
+    database = ScratchpadDatabase(str(tmp_path))
+    database.connect()
+    version = database.data_version()
+
+    assert database.refresh() == {"created": [], "updated": [], "dropped": []}
+
+    time.sleep(0.01)
+    write_users(tmp_path, rows=5)
+    assert database.refresh()["updated"] == ["user_analytics"]
+    assert database.data_version() != version
+    assert len(database.execute_sql("SELECT * FROM user_analytics")) == 5
+
+    os.remove(tmp_path / "user analytics.csv")
+    assert database.refresh()["dropped"] == ["user_analytics"]
+    assert database.views == {}
+
+
+def test_query_version_only_follows_the_views_read(tmp_path):
+    write_users(tmp_path)
+    (tmp_path / "events.jsonl").write_text('{"UserID": 1, "Event": "login"}\n')
+    database = ScratchpadDatabase(str(tmp_path))
+    database.connect()
+    sql = 'SELECT City, count(*) FROM "User_Analytics" GROUP BY City'
+    version = database.query_version(sql)
+
+    # A new result file in the scratchpad doesn't invalidate the query
+    pd.DataFrame({"City": ["Springfield"]}).to_csv(tmp_path / "cities.csv", index=False)
+    database.refresh()
+    assert database.query_version(sql) == version
+    assert database.query_version("SELECT 1") == database.data_version()
+
+    time.sleep(0.01)
+    write_users(tmp_path, rows=5)
+    database.refresh()
+    assert database.query_version(sql) != version
+
+
+async def test_open_scratchpad_reuses_the_session(tmp_path):
+    write_users(tmp_path)
+    session = await open_scratchpad(str(tmp_path))
+    connection = session.database.connection
+
+    (tmp_path / "events.jsonl").write_text('{"UserID": 1, "Event": "login"}\n')
+    again = await open_scratchpad(str(tmp_path))
+
+    assert again is session and again.database.connection is connection
+    assert set(await again.run(again.database.view_files)) == {"user_analytics", "events"}
+    await session.close()
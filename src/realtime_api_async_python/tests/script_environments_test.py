@@ -0,0 +1,86 @@
+import os
+import shutil
+import pytest
+from ..modules.script_environments import (
+    ScriptEnvironmentCache,
+    environment_key,
+    script_metadata,
+)
+
+SCRIPT = """# /// script
+# requires-python = ">=3.8"
+# dependencies = []
+# ///
+import sys
+print(sys.prefix)
+"""
+
+
+def test_script_metadata_parses_the_inline_block():
+    code = '# /// script\n# dependencies = [\n#   "requests<3",\n#   "rich",\n# ]\n# ///\nimport rich\n'
+
+    assert script_metadata(code) == {"dependencies": ["requests<3", "rich"]}
+    assert script_metadata("import rich\n") is None
+
+
+def test_environment_key_ignores_order_and_spelling():
+    key = environment_key({"dependencies": ["Rich", "requests < 3"]})
+
+    assert key == environment_key({"dependencies": ["requests<3", "rich", "rich"]})
+    assert key != environment_key({"dependencies": ["requests<3"]})
+    assert key != environment_key({"dependencies": ["Rich", "requests<3"], "requires-python": ">=3.12"})
+
+
+def test_evict_removes_least_recently_used_environments(tmp_path):
+    cache = ScriptEnvironmentCache(str(tmp_path), max_mb=1)
+    for index, key in enumerate(["old", "recent", "current"]):
+        os.makedirs(cache.environment_path(key))
+        with open(os.path.join(cache.environment_path(key), "payload"), "wb") as f:
+            f.write(b"x" * 400 * 1024)
+        os.utime(cache.environment_path(key), (index, index))
+
+    cache.evict(keep="current")
+
+    assert sorted(os.listdir(cache.environments_dir)) == ["current", "recent"]
+
+
+def test_evict_clears_the_wheel_cache_when_environments_are_not_enough(tmp_path):
+    cache = ScriptEnvironmentCache(str(tmp_path), max_mb=1)
+    os.makedirs(cache.environment_path("current"))
+    os.makedirs(cache.wheel_cache_dir)
+    with open(os.path.join(cache.wheel_cache_dir, "wheel"), "wb") as f:
+        f.write(b"x" * 1100 * 1024)
+    # Hardlinked into the environment, as uv installs it, so it is only counted once
+    os.link(
+        os.path.join(cache.wheel_cache_dir, "wheel"),
+        os.path.join(cache.environment_path("current"), "wheel"),
+    )
+
+    cache.evict(keep="current")
+    assert os.path.isdir(cache.environment_path("current"))
+    assert not os.path.exists(cache.wheel_cache_dir)
+
+
+async def test_malformed_metadata_fails_the_run(tmp_path):
+    cache = ScriptEnvironmentCache(str(tmp_path / "cache"))
+
+    result = await cache.run('# /// script\n# dependencies = [\n# ///\nprint("hi")\n')
+
+    assert not result.success
+    assert "Invalid `# /// script` metadata block" in result.output
+
+
+@pytest.mark.skipif(shutil.which("uv") is None, reason="uv is not installed")
+async def test_environment_is_built_once_and_reused(tmp_path):
+    cache = ScriptEnvironmentCache(str(tmp_path / "cache"))
+
+    first = await cache.run(SCRIPT, cwd=str(tmp_path))
+    assert first.success, first.output
+    key = environment_key(script_metadata(SCRIPT))
+    assert first.stdout.strip() == cache.environment_path(key)
+
+    built_at = os.stat(cache.python_path(key)).st_ino
+    second = await cache.run(SCRIPT.replace("sys.prefix", "'again'"), cwd=str(tmp_path))
+    assert second.stdout == "again\n"
+    assert os.stat(cache.python_path(key)).st_ino == built_at
+    assert os.listdir(cache.environments_dir) == [key]
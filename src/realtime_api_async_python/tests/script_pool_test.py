@@ -0,0 +1,70 @@
+import os
+import pytest
+from ..modules.script_pool import ScriptWorkerPool, declares_dependencies
+
+
+@pytest.fixture
+async def pool():
+    pool = ScriptWorkerPool(size=1, max_runs=3, preload=["json"])
+    yield pool
+    pool.close()
+
+
+async def test_each_run_gets_a_fresh_namespace_and_preloaded_modules(pool):
+    first = await pool.run_code("counter = 1\nprint('ok')")
+    second = await pool.run_code(
+        "import sys\nprint('counter' in globals(), 'json' in sys.modules, __name__)"
+    )
+
+    assert first.success and second.success
+    assert second.stdout == "False True __main__\n"
+    # Both runs were forked from the same warm worker
+    assert len(pool.idle) == 1 and pool.idle[0].runs == 2
+
+
+async def test_runs_in_a_separate_working_directory(pool, tmp_path):
+    default = await pool.run_code("import os\nopen('out.txt', 'w').write('x')\nprint(os.getcwd())")
+    run_dir = default.stdout.strip()
+    assert run_dir != os.getcwd()
+    # The temporary run directory is cleaned up afterwards
+    assert not os.path.exists(run_dir)
+
+    explicit = await pool.run_code("open('out.txt', 'w').write('x')", cwd=str(tmp_path))
+    assert explicit.success
+    assert (tmp_path / "out.txt").read_text() == "x"
+
+
+async def test_failures_report_the_script_traceback(pool):
+    result = await pool.run_code("def f():\n    raise ValueError('boom')\nf()")
+
+    assert result.exit_code == 1
+    assert "ValueError: boom" in result.stderr
+    assert "script_worker.py" not in result.stderr
+
+    exited = await pool.run_code("import sys\nsys.exit(3)")
+    assert exited.exit_code == 3
+
+
+async def test_timeout_kills_the_run_but_keeps_the_worker(pool):
+    result = await pool.run_code("import time\ntime.sleep(60)", timeout=0.5)
+
+    assert result.timed_out
+    assert pool.idle and pool.idle[0].alive()
+    assert (await pool.run_code("print(1)")).stdout == "1\n"
+
+
+async def test_workers_are_recycled_after_max_runs(pool):
+    for _ in range(3):
+        await pool.run_code("print(1)")
+    assert pool.idle == []
+
+    result = await pool.run_code("print(1)")
+    assert result.success
+    assert pool.idle[0].runs == 1
+
+
+def test_declares_dependencies_detects_inline_script_metadata():
+    script = '# /// script\n# dependencies = ["requests"]\n# ///\nimport requests\n'
+
+    assert declares_dependencies(script)
+    assert not declares_dependencies("import pandas\n# /// not metadata\n")
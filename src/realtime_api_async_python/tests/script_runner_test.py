@@ -0,0 +1,103 @@
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+import pytest
+from ..modules.script_runner import run_command, run_uv_script
+
+
+async def test_successful_command_reports_exit_code_and_resources():
+    result = await run_command([sys.executable, "-c", "print('hello')"])
+
+    assert result.success
+    assert result.exit_code == 0
+    assert result.stdout == "hello\n"
+    assert result.duration > 0
+    assert result.peak_memory_mb > 0
+
+
+async def test_failing_command_is_not_successful():
+    result = await run_command([sys.executable, "-c", "import sys; sys.exit('boom')"])
+
+    assert not result.success
+    assert result.exit_code == 1
+    assert "boom" in result.output
+
+
+async def test_wall_clock_timeout_kills_the_process_tree():
+    start = time.perf_counter()
+    # The grandchild holds the pipes open; it must be killed with the group
+    code = "import subprocess, sys; subprocess.run([sys.executable, '-c', 'import time; time.sleep(60)'])"
+    result = await run_command([sys.executable, "-c", code], timeout=0.5)
+
+    assert result.timed_out
+    assert result.exit_code is None
+    assert "timed out" in result.output
+    assert time.perf_counter() - start < 10
+
+
+async def test_cpu_limit_stops_busy_loop():
+    result = await run_command([sys.executable, "-c", "while True: pass"], cpu_seconds=1, timeout=30)
+
+    assert result.cpu_limit_exceeded
+    assert not result.success
+
+
+async def test_memory_limit_fails_large_allocation():
+    code = "x = bytearray(1024 * 1024 * 1024)"
+    result = await run_command([sys.executable, "-c", code], memory_limit_mb=512)
+
+    assert not result.success
+    assert "MemoryError" in result.stderr
+
+
+async def test_limits_are_applied_to_the_script():
+    code = "import resource; print(resource.getrlimit(resource.RLIMIT_CPU)[0], resource.getrlimit(resource.RLIMIT_AS)[0])"
+    result = await run_command([sys.executable, "-c", code], cpu_seconds=7, memory_limit_mb=1024)
+
+    assert result.success, result.output
+    assert result.stdout.split() == ["7", str(1024 * 1024 * 1024)]
+
+
+async def test_output_is_capped_while_the_pipe_is_drained():
+    code = "import sys; sys.stdout.write('x' * 5_000_000); print('done', file=sys.stderr)"
+    result = await run_command([sys.executable, "-c", code], max_output_kb=64)
+
+    assert result.success
+    assert result.truncated
+    assert len(result.stdout) == 64 * 1024
+    assert result.stderr == "done\n"
+
+
+async def test_cancellation_kills_the_process():
+    marker = os.path.join(tempfile.gettempdir(), f"script_runner_{os.getpid()}.pid")
+    code = f"import os, time; open({marker!r}, 'w').write(str(os.getpid())); time.sleep(60)"
+    task = asyncio.create_task(run_command([sys.executable, "-c", code]))
+    while not os.path.exists(marker):
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(0.1)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    with open(marker) as file:
+        pid = int(file.read())
+    os.remove(marker)
+    # The script runs under the launcher, so it's reaped once the killed launcher is gone
+    deadline = time.perf_counter() + 5
+    with pytest.raises(ProcessLookupError):
+        while time.perf_counter() < deadline:
+            os.kill(pid, 0)
+            await asyncio.sleep(0.05)
+
+
+@pytest.mark.skipif(shutil.which("uv") is None, reason="uv is not installed")
+async def test_uv_script_removes_the_temporary_file(tmp_path):
+    result = await run_uv_script("import sys; print(sys.argv[0])", cwd=str(tmp_path))
+
+    assert result.success, result.output
+    script_path = result.stdout.strip()
+    assert script_path.endswith(".py")
+    assert not os.path.exists(script_path)
@@ -0,0 +1,11 @@
+from ..benchmarks.script_startup_benchmark import SCRIPTS, run_benchmarks
+
+
+async def test_run_benchmarks_times_every_script_on_the_pool():
+    report = await run_benchmarks(["pool"], repeat=1, preload=["pandas"])
+
+    assert report["pool_warm_up"] > 0
+    assert [r["script"] for r in report["results"]] == list(SCRIPTS)
+    for result in report["results"]:
+        assert result["runner"] == "pool"
+        assert 0 < result["latency_min"] <= result["latency"]
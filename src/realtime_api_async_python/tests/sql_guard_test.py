@@ -0,0 +1,72 @@
+import pytest
+import duckdb
+from ..modules.database import DuckDBDatabase
+from ..modules.sql_guard import guard_sql, guard_sql_file, SQLValidationError, SQLCostError
+
+
+@pytest.fixture
+def database(tmp_path):
+    db_path = str(tmp_path / "test.duckdb")
+    connection = duckdb.connect(db_path)
+    connection.execute("CREATE TABLE Users AS SELECT range AS UserID FROM range(100)")
+    connection.close()
+
+    database = DuckDBDatabase()
+    database.connect(db_path)
+    return database
+
+
+def test_guard_passes_cheap_query(database):
+    guarded = guard_sql(database, "SELECT * FROM Users", max_estimated_rows=1000)
+
+    assert guarded["action"] == "none"
+    assert guarded["sql"] == "SELECT * FROM Users"
+    assert guarded["estimated_rows"] == 100
+
+
+def test_guard_limits_large_result(database):
+    guarded = guard_sql(database, "SELECT * FROM Users a, Users b;", max_estimated_rows=500)
+
+    assert guarded["action"] == "limited"
+    assert guarded["sql"].endswith("LIMIT 500")
+    assert len(database.execute_sql(guarded["sql"])) == 500
+
+
+def test_guard_rejects_large_result(database):
+    with pytest.raises(SQLCostError):
+        guard_sql(
+            database,
+            "SELECT * FROM Users a, Users b",
+            max_estimated_rows=500,
+            over_limit_action="reject",
+        )
+
+
+def test_guard_rejects_expensive_query(database):
+    with pytest.raises(SQLCostError):
+        guard_sql(
+            database,
+            "SELECT count(*) FROM Users a, Users b, Users c",
+            max_estimated_cost=1000,
+        )
+
+
+def test_guard_reports_invalid_sql(database):
+    with pytest.raises(SQLValidationError) as error:
+        guard_sql(database, "SELEC * FROM Users")
+
+    assert "syntax error" in str(error.value)
+
+
+def test_sql_files_with_several_statements_run_unguarded(database, tmp_path):
+    # Later statements read a table the first one creates, so EXPLAIN can't check the file
+    sql = "CREATE TABLE Doubled AS SELECT UserID * 2 AS Value FROM Users;\nSELECT * FROM Doubled;\n"
+
+    guarded = guard_sql_file(database, sql, max_estimated_rows=10)
+    export = database.export_sql(guarded["sql"], str(tmp_path / "doubled.csv"), ".csv")
+
+    assert guarded == {"sql": sql, "estimated_rows": None, "estimated_cost": None, "action": "none"}
+    assert export["rows"] == 100
+    assert guard_sql_file(database, ";", max_estimated_rows=10)["action"] == "none"
+    assert guard_sql_file(database, "SELECT * FROM Users")["action"] == "none"
+    assert guard_sql_file(database, "SELECT * FROM Users", max_estimated_rows=10)["action"] == "limited"
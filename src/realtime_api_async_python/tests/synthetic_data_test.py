@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+from ..benchmarks.synthetic_data import generate_chunks, load_database, table_sizes
+from ..modules.database import get_database_instance
+
+
+def test_generation_is_deterministic():
+    first = list(generate_chunks(1000, seed=7, chunk_size=250))
+    second = list(generate_chunks(1000, seed=7, chunk_size=250))
+    other_seed = list(generate_chunks(1000, seed=8, chunk_size=250))
+
+    assert [table for table, _ in first] == [table for table, _ in second]
+    for (_, a), (_, b) in zip(first, second):
+        pd.testing.assert_frame_equal(a, b)
+    assert not first[0][1].equals(other_seed[0][1])
+
+
+def test_generated_sizes_and_keys():
+    sizes = table_sizes(1000)
+    tables = {}
+    for table, df in generate_chunks(1000, seed=1, chunk_size=300):
+        tables[table] = pd.concat([tables[table], df]) if table in tables else df
+
+    assert {table: len(df) for table, df in tables.items()} == sizes
+    assert tables["Users"]["Email"].is_unique
+    assert tables["Orders"]["UserID"].between(1, sizes["Users"]).all()
+    assert tables["OrderDetails"]["ProductID"].between(1, sizes["Products"]).all()
+    assert tables["Reviews"]["Rating"].between(1, 5).all()
+
+
+@pytest.mark.parametrize("sql_dialect, file_name", [("sqlite", "bench.db"), ("duckdb", "bench.duckdb")])
+def test_load_database(sql_dialect, file_name, tmp_path):
+    url = str(tmp_path / file_name)
+
+    result = load_database(sql_dialect, url, rows=1000, seed=3, chunk_size=400)
+
+    assert result["tables"] == table_sizes(1000)
+    database = get_database_instance(sql_dialect)
+    database.connect(url)
+    orphans = database.execute_sql(
+        "SELECT count(*) AS n FROM OrderDetails d LEFT JOIN Orders o ON d.OrderID = o.OrderID "
+        "WHERE o.OrderID IS NULL"
+    )
+    assert orphans["n"][0] == 0
+    assert database.execute_sql("SELECT count(*) AS n FROM Users")["n"][0] == 100
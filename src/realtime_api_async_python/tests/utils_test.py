@@ -1,6 +1,6 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from ..modules.utils import scrap_url, scrap_url_clean
+from ..modules.utils import scrap_url, scrap_url_clean, scrap_url_clean_async
 from dotenv import load_dotenv
 import os
 
@@ -46,3 +46,13 @@ def test_scrap_url_clean(url):
     assert isinstance(result, str)
     assert len(result) > 0
     assert "Error:" not in result
+
+
+async def test_scrap_url_clean_async():
+    if not os.getenv("FIRECRAWL_API_KEY"):
+        pytest.skip("FIRECRAWL_API_KEY environment variable not set")
+
+    result = await scrap_url_clean_async("https://aider.chat/")
+
+    assert isinstance(result, str)
+    assert len(result) > 0